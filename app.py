@@ -1,14 +1,31 @@
+import math
+import os
+import threading
+import time
 import cv2
 import numpy as np
 # Importe aus den PySide6-Bibliotheken (für Layout, GUI-Elemente, etc.)
 from PySide6.QtWidgets import QMainWindow, QWidget, QPushButton, QLabel, QComboBox, QStatusBar, QMessageBox, QSlider
 from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QSizePolicy 
-from PySide6.QtGui import QPixmap, QImage , QPainter, QColor, QAction
-from PySide6.QtCore import QTimer, Qt, QRect
+from PySide6.QtGui import QPixmap, QImage , QPainter, QColor, QAction, QPen
+from PySide6.QtCore import QTimer, Qt, QRect, Signal
 # Importe der Manager-Klassen
 from cameramanager import CameraManager
 from classifiermanager import ClassifierManager
 from filemanager import FileManager
+from detectionpool import DetectionPool
+from objecttracker import ObjectTracker
+from motiongate import MotionGate
+from resolutioncontroller import ResolutionController
+from frameprofiler import FrameProfiler
+from displaycompositor import DisplayCompositor
+from multisource import MultiSourceManager
+from detectionlog import DetectionLogWriter
+from mediawriter import ScreenshotEncoder, VideoRecorder
+from startupreport import StartupReport
+from framescheduler import FrameScheduler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # Stylesheets und Bilder liegen neben app.py (unabhängig vom Arbeitsverzeichnis)
 
 # Hauptklasse App für GUI
 class App(QMainWindow):
@@ -18,6 +35,16 @@ class App(QMainWindow):
     Attribute: camera_manager (CameraManager): Instanz des CameraManagers.
                classifier_manager (ClassifierManager): Instanz des ClassifierManagers.
                file_manager (FileManager): Instanz des FileManager.
+               detection_pool (DetectionPool): Worker-Threads für die Objekterkennung im Live- und Video-Modus.
+               object_tracker (ObjectTracker): Verfolgung der Objekte zwischen vollständigen Erkennungen (Tracking-Modus).
+               motion_gate (MotionGate): Erkennung nur in geänderten Bildbereichen (Bewegungsfilter).
+               resolution_controller (ResolutionController): Automatische Wahl der Erkennungsauflösung (adaptive Auflösung).
+               profiler (FrameProfiler): Zeitmessung je Stufe der Frame-Pipeline.
+               display_compositor (DisplayCompositor): Skaliert und annotiert Live-Frames außerhalb des GUI-Threads.
+               multi_source_manager (MultiSourceManager): Aufnahme und Objekterkennung mehrerer Quellen (Modus "multi").
+               detection_log (DetectionLogWriter): Protokoll aller Erkennungen (optional, None = deaktiviert).
+               screenshot_encoder (ScreenshotEncoder): Speichert Screenshots außerhalb des GUI-Threads.
+               video_recorder (VideoRecorder): Aufnahme des annotierten Videostroms.
                central_widget (QWidget): Zentrales Widget der Anwendung.
                status (QStatusBar): Statusleiste der Anwendung.
                
@@ -41,57 +68,97 @@ class App(QMainWindow):
                num_objects (int): Anzahl der erkannten Objekte.
                object_count_label (QLabel): Label zur Anzeige der Anzahl der erkannten Objekte.
                
-               timer (QTimer): Timer für die Aktualisierung der Frames.
-               animation_timer (QTimer): Timer für die Beispielanimation.
+               frame_scheduler (FrameScheduler): Gemeinsame Taktung von Frame-Aktualisierung ("frame") und Beispielanimation ("animation").
                
-               current_frame (np.ndarray): Aktueller Frame.
+               current_frame (np.ndarray): Aktueller Frame (BGR, ohne Rechtecke).
+               current_detections (dict): Erkannte Objekte des aktuellen Frames.
                static_image (np.ndarray): Statisches Bild.
                is_nightmode (bool): Nachtmodus-Status.
     
     Methoden:   __init__()
-                toggle_fullscreen(), toggle_nightmode() 
+                toggle_fullscreen(), toggle_nightmode(), toggle_tracking(checked), toggle_motion_gate(checked), toggle_adaptive_resolution(checked)
+                toggle_video_realtime(checked), toggle_detection_log(checked), toggle_auto_save(checked), toggle_recording(checked),
+                on_screenshot_saved(success, file_path), get_log_parameters(classifier_id), log_detections(sequence, objects, detection_time, context, source), toggle_hud(checked), update_hud(), motion_gate_summary(), export_trace(),
                 show_help(), show_about(), 
-                load_stylesheet(filename),
-                change_mode(text), change_classifier(text), load_predefined_classifier(classifier_id), load_custom_classifier(),
-                refresh_camera_list(), start_camera(), stop_camera(), start_stop_camera(checked), 
-                load_image_from_file(), reset_image(), load_reset_file(checked), 
-                animation(), draw_haar_filter(), 
+                load_stylesheet(filename), paintEvent(event), finish_startup(), changeEvent(event), showEvent(event), hideEvent(event), resizeEvent(event),
+                change_mode(text), change_classifier(text), load_predefined_classifier(classifier_id), load_custom_classifier(), train_classifier(), on_training_finished(classifier_name),
+                start_static_detection(frame, classifier_id, detection_key), on_static_detection_finished(detection_key, objects),
+                refresh_camera_list(force), update_camera_list(available_cameras), start_camera(), stop_camera(), start_stop_camera(checked), 
+                load_image_from_file(), reset_image(), load_reset_file(checked), load_video_from_file(), stop_video(),
+                add_multi_video(), start_multi(), stop_multi(), update_multi_frame(), enable_start_button(),
+                animation(), draw_haar_filter(), is_animation_visible(), is_frame_needed(), 
+                detect_objects(frame, classifier_id, use_tracker, sequence, gate_mode, regions), draw_detections(frame, detections), draw_overlay(pixmap, detections, scale),
+                fit_to_display(width, height), show_pixmap(pixmap, detections), closeEvent(event),
                 update_frame().
     """
+    cameras_detected = Signal(list) # Ergebnis der Kamerasuche (aus dem Such-Thread in den GUI-Thread)
+    screenshot_saved = Signal(bool, str) # Ergebnis eines Screenshots (aus dem Encoder-Thread in den GUI-Thread)
+    training_finished = Signal(str) # Ergebnis des Trainings (aus dem Trainings-Thread in den GUI-Thread)
+    static_detection_finished = Signal(object, object) # Ergebnis der Erkennung im statischen Bild (aus dem Erkennungs-Thread in den GUI-Thread)
+
     # Initialisiert die GUI und die Manager-Instanzen.
-    def __init__(self):
+    def __init__(self, startup_report=None):
         """
         Initialisiert die GUI Elemente und Manager Instanzen.
+        Aufwendige Schritte (Vorladen der Klassifizierer, Kamerasuche, Animation) starten erst nach dem ersten Zeichnen (finish_startup).
+
+        Parameter: startup_report (StartupReport): Zeitmessung des Programmstarts (Standard: Messung ab Erstellung des Fensters).
         """
         super().__init__()
+        self.startup_report = startup_report or StartupReport()
+        self.startup_finished = False # finish_startup() bereits ausgeführt
+        self.stylesheets = {} # Dateiname -> Inhalt (jedes Stylesheet wird nur einmal gelesen)
         
+        self.profiler = FrameProfiler() # Zeitmessung je Stufe der Frame-Pipeline
+        self.is_hud = False # Performance-Anzeige in der Statusleiste (deaktiviert)
+        self.hud_last_update = 0.0 # Zeitpunkt der letzten Aktualisierung der Performance-Anzeige
+
         # Manager Instanzen
         self.camera_manager = CameraManager()
-        self.classifier_manager = ClassifierManager()
+        self.camera_manager.profiler = self.profiler # Lesedauer der Kamera im Aufnahme-Thread messen
+        self.classifier_manager = ClassifierManager(preload=False) # Vorladen erst nach dem ersten Zeichnen (finish_startup)
         self.file_manager = FileManager()
+        self.detection_pool = DetectionPool(self.detect_objects, num_workers=2, max_in_flight=2) # Objekterkennung außerhalb des GUI-Threads
+        self.object_tracker = ObjectTracker(self.classifier_manager, keyframe_interval=10, padding=0.5) # Vollständige Erkennung nur alle 10 Frames
+        self.is_tracking = False # Tracking-Modus (deaktiviert)
+        self.motion_gate = MotionGate(self.classifier_manager) # Unveränderte Frames bzw. Bereiche nicht erneut durchsuchen
+        self.is_motion_gate = True # Bewegungsfilter (aktiviert)
+        self.detection_sequence = 0 # Fortlaufende Nummer der Erkennungsaufträge für Tracker und Bewegungsfilter (wird nie zurückgesetzt)
+        self.resolution_controller = ResolutionController(target_fps=25, min_scale=0.25) # Ziel: Erkennung mit 25 FPS
+        self.is_adaptive_resolution = False # Adaptive Auflösung (deaktiviert)
+        self.display_compositor = DisplayCompositor(self.get_detection_color, self.profiler) # Anzeigefertige Bilder außerhalb des GUI-Threads
+        self.multi_source_manager = None # Wird beim Start des Modus "multi" erstellt
+        self.multi_compositors = {} # source_id -> DisplayCompositor (eine Kachel je Quelle)
+        self.multi_displayed = {} # source_id -> Nummer des zuletzt angezeigten Frames
+        self.multi_video_paths = [] # Zusätzliche Videodateien für den Modus "multi"
+        self.detection_log = None # Erkennungs-Log (deaktiviert)
+        self.detection_pool.result_callback = self.log_detections # Jedes Ergebnis protokollieren (im Worker-Thread)
+        self.screenshot_encoder = ScreenshotEncoder() # PNG/JPEG-Kodierung außerhalb des GUI-Threads
+        self.screenshot_directory = None # Verzeichnis für automatisch gespeicherte Screenshots (None = Dialog)
+        self.video_recorder = VideoRecorder(self.draw_detections) # Aufnahme des annotierten Videostroms
+        self.training_thread = None # Thread des laufenden Klassifizierer-Trainings
+
+        # Gemeinsamer Takt für die Aktualisierung der Frames und die Beispielanimation (vor dem ersten Fenster-Ereignis)
+        self.frame_scheduler = FrameScheduler(self)
+        self.frame_scheduler.add_task("frame", self.update_frame, 10, condition=self.is_frame_needed)
+        self.frame_scheduler.add_task("animation", self.animation, 50, condition=self.is_animation_visible) # Start in finish_startup()
 
         self.setWindowTitle("Objekterkennung mit Haarcascades")   # Fenstertitel
         self.setGeometry(100, 100, 1000, 700)  # Start-Fenstergröße festlegen
 
-        # Versuche Stylesheet zu laden (Sicherstellen das Programm im richtigen Verzeichnis gestartet wird)
+        # Stylesheet und Bild der Animation laden (Pfade relativ zu app.py)
         try:    
-            try:
-                self.load_stylesheet("style_sheet.css") # Um Fehlermeldung zu vermeiden
-                self.load_stylesheet("b2-1_haarcascades/style_sheet.css") 
-            except:
-                pass
-            self.i2 = cv2.imread("face_animation.jpg")
-            self.i1 = cv2.imread("b2-1_haarcascades/face_animation.jpg")
+            self.load_stylesheet("style_sheet.css")
+            self.i1 = cv2.imread(os.path.join(BASE_DIR, "face_animation.jpg"))
 
         # Fehlerbehandlung beim Laden des Stylesheets
         except Exception as e: # Fehlerbehandlung 
-            print("Fehler beim Laden des Stylesheets, stelle sicher das du im richtigen Verzeichnis ../b2-1_haarcascades/main.py startest")
+            self.i1 = None
+            print("Fehler beim Laden des Stylesheets")
         
         # Sicherstellen, dass App nicht abstürzt, wenn Bild nicht geladen werden kann
         if type(self.i1) != type(None):     
             self.image = QImage(self.i1.data, self.i1.shape[1], self.i1.shape[0], QImage.Format.Format_RGB888)
-        elif type(self.i2) != type(None):    
-            self.image = QImage(self.i2.data, self.i2.shape[1], self.i2.shape[0], QImage.Format.Format_RGB888)
         else: 
             self.image = QImage(250,250) # leeres Bild
         
@@ -111,6 +178,50 @@ class App(QMainWindow):
         self.nightmode_action.triggered.connect(self.toggle_nightmode)
         view_menu.addAction(self.nightmode_action)
 
+        detection_menu = menu_bar.addMenu("Erkennung")
+        self.tracking_action = QAction("Tracking-Modus", self)
+        self.tracking_action.setCheckable(True)
+        self.tracking_action.toggled.connect(self.toggle_tracking)
+        detection_menu.addAction(self.tracking_action)
+        self.motion_gate_action = QAction("Bewegungsfilter", self)
+        self.motion_gate_action.setCheckable(True)
+        self.motion_gate_action.setChecked(True)
+        self.motion_gate_action.toggled.connect(self.toggle_motion_gate)
+        detection_menu.addAction(self.motion_gate_action)
+        self.adaptive_resolution_action = QAction("Adaptive Auflösung", self)
+        self.adaptive_resolution_action.setCheckable(True)
+        self.adaptive_resolution_action.toggled.connect(self.toggle_adaptive_resolution)
+        detection_menu.addAction(self.adaptive_resolution_action)
+        self.is_video_realtime = True # Videos in Echtzeit abspielen (sonst jeden Frame so schnell wie möglich)
+        self.video_realtime_action = QAction("Video in Echtzeit abspielen", self)
+        self.video_realtime_action.setCheckable(True)
+        self.video_realtime_action.setChecked(True)
+        self.video_realtime_action.toggled.connect(self.toggle_video_realtime)
+        detection_menu.addAction(self.video_realtime_action)
+        self.detection_log_action = QAction("Erkennungen protokollieren", self)
+        self.detection_log_action.setCheckable(True)
+        self.detection_log_action.toggled.connect(self.toggle_detection_log)
+        detection_menu.addAction(self.detection_log_action)
+
+        record_menu = menu_bar.addMenu("Aufnahme")
+        self.auto_save_action = QAction("Screenshots automatisch speichern", self)
+        self.auto_save_action.setCheckable(True)
+        self.auto_save_action.toggled.connect(self.toggle_auto_save)
+        record_menu.addAction(self.auto_save_action)
+        self.record_action = QAction("Video aufnehmen", self)
+        self.record_action.setCheckable(True)
+        self.record_action.toggled.connect(self.toggle_recording)
+        record_menu.addAction(self.record_action)
+        self.screenshot_saved.connect(self.on_screenshot_saved)
+
+        self.hud_action = QAction("Performance-Anzeige", self)
+        self.hud_action.setCheckable(True)
+        self.hud_action.toggled.connect(self.toggle_hud)
+        view_menu.addAction(self.hud_action)
+        export_trace_action = QAction("Timing exportieren (Chrome Trace)", self)
+        export_trace_action.triggered.connect(self.export_trace)
+        view_menu.addAction(export_trace_action)
+
         help_menu = menu_bar.addMenu("Info")
         help_action = QAction("Kurzanleitung",self)
         help_action.triggered.connect(self.show_help)
@@ -162,7 +273,9 @@ class App(QMainWindow):
         camera_layout.addWidget(self.camera_selector)
 
         self.btn_refresh_cameras = QPushButton("Kameras Aktualisieren")
-        self.btn_refresh_cameras.clicked.connect(self.refresh_camera_list) # Klick-Event für Button
+        self.btn_refresh_cameras.clicked.connect(lambda: self.refresh_camera_list(force=True)) # Klick-Event für Button
+        self.available_cameras = [] # Indizes der gefundenen Kameras (Reihenfolge wie im Dropdown-Menü)
+        self.cameras_detected.connect(self.update_camera_list) # Dropdown-Menü aktualisieren, sobald die Suche fertig ist
         control_panel.addWidget(self.btn_refresh_cameras)
         control_panel.addLayout(camera_layout) # Kamera Dropdown zu Kontrollbereich hinzufügen
 
@@ -170,7 +283,7 @@ class App(QMainWindow):
         mode_layout = QHBoxLayout()
         self.mode_selector = QComboBox()
         self.mode_selector.setEnabled(True)
-        self.mode_selector.addItems(["live", "file"])
+        self.mode_selector.addItems(["live", "file", "video", "multi"])
         self.mode_selector.currentTextChanged.connect(self.change_mode) # Event für Auswahländerung
         mode_layout.addWidget(QLabel("Modus:"))
         mode_layout.addWidget(self.mode_selector)
@@ -197,7 +310,7 @@ class App(QMainWindow):
         classifier_layout = QHBoxLayout()
         self.classifier_selector = QComboBox()
         self.classifier_selector.setEnabled(True)
-        self.classifier_selector.addItems(["face", "eye", "smile", "upperbody", "fullbody", "profileface", "Eigener Klassifizierer"])
+        self.classifier_selector.addItems(["face", "eye", "smile", "upperbody", "fullbody", "profileface", "face + eye + smile", "Eigener Klassifizierer"])
         self.classifier_selector.setCurrentText("face")
         self.classifier_selector.currentTextChanged.connect(self.change_classifier)
         classifier_layout.addWidget(QLabel("Klassifizierer:"))
@@ -269,7 +382,8 @@ class App(QMainWindow):
 
         self.btn_train_classifier = QPushButton("Klassifizierer Trainieren")
         self.btn_train_classifier.setEnabled(False)
-        #self.btn_train_classifier.clicked.connect(self.classifier_manager.train_classifier)
+        self.btn_train_classifier.clicked.connect(self.train_classifier)
+        self.training_finished.connect(self.on_training_finished)
         buttons_layout.addWidget(self.btn_train_classifier)
 
         self.btn_screenshot = QPushButton("Screenshot")
@@ -293,21 +407,23 @@ class App(QMainWindow):
 
         main_layout.addLayout(control_panel) # Kontrollbereich zu Hauptlayout hinzufügen
 
-        # Timer für die Aktualisierung der Frames
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame) 
-
-        # Timer für Beispielanimation
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.animation)
-        self.animation_timer.start(50)  # Animationsgeschwindigkeit in ms
-
         # Variablen
-        self.current_frame = None # Aktueller Frame
+        self.current_frame = None # Aktueller Frame (BGR, ohne Rechtecke)
+        self.current_detections = {} # Erkannte Objekte des aktuellen Frames {classifier_id: Boxen}
+        self.last_frame_sequence = 0 # Nummer des zuletzt angezeigten Kamera-Frames
+        self.last_display_sequence = 0 # Nummer des zuletzt angezeigten aufbereiteten Frames
+        self.video_completed_last = 0 # Abgeschlossene Erkennungen bei der letzten Statusanzeige (Video-Modus)
+        self.live_objects = {} # Zuletzt im Live-Modus erkannte Objekte {classifier_id: Boxen}
         self.static_image = None # Statisches Bild
-
-        # Kameraliste bei Programmstart aktualisieren
-        self.btn_refresh_cameras.click() # Simuliert Klick des Kameras aktualisieren Buttons
+        self.static_image_key = None # Hash des statischen Bildes
+        self.static_pixmap = None # Zwischengespeicherte Pixmap des statischen Bildes (ohne Rechtecke)
+        self.static_render_key = None # Schlüssel der zuletzt angezeigten Darstellung
+        self.static_objects = {} # Zuletzt angezeigte Objekte des statischen Bildes (bis ein neues Ergebnis vorliegt)
+        self.static_detection_thread = None # Thread der laufenden Erkennung im statischen Bild
+        self.static_detection_result = None # Tupel (detection_key, objects) des letzten Ergebnisses (auch fehlgeschlagene Erkennungen)
+        self.static_detection_finished.connect(self.on_static_detection_finished)
+
+        self.startup_report.mark("Fenster aufgebaut")
         #self.change_mode(self.mode_selector.currentText()) # Modus basierend auf Auswahl initialisieren
 
     # Animiert die Haar Cascade Features
@@ -373,6 +489,25 @@ class App(QMainWindow):
             self.animation_label.setPixmap(overlay_pixmap) # Overlay-Bild setzen
         except Exception as e:
             print(f"Fehler beim Anzeigen der Haar-Features: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Gibt zurück, ob die Animation gezeichnet werden soll.
+    def is_animation_visible(self):
+        """
+        Gibt zurück, ob die Animation gezeichnet werden soll: Fenster sichtbar und nicht minimiert, Animation nicht
+        verdeckt und keine Kamera bzw. kein Video aktiv (die Rechenzeit wird dann für die Erkennung gebraucht).
+        """
+        if not self.isVisible() or self.isMinimized() or self.animation_label.visibleRegion().isEmpty():
+            return False
+        return not self.camera_manager.is_capturing() and self.multi_source_manager is None
+
+
+    # Gibt zurück, ob Frames verarbeitet werden sollen.
+    def is_frame_needed(self):
+        """
+        Gibt zurück, ob Frames verarbeitet werden sollen: bei minimiertem Fenster nur, wenn aufgenommen oder protokolliert wird.
+        """
+        return not self.isMinimized() or self.video_recorder.recording or self.detection_log is not None
             
 
     # Schaltet zwischen Vollbildmodus und Fenstermodus um.
@@ -393,26 +528,208 @@ class App(QMainWindow):
         # Versuche Stylesheet zu laden
         if self.is_nightmode:
             try:
-                    self.load_stylesheet("style_sheet.css") # Um Fehlermeldung zu vermeiden
-                    self.load_stylesheet("b2-1_haarcascades/style_sheet.css")
+                    self.load_stylesheet("style_sheet.css")
                     self.status.showMessage("Nachtmodus deaktiviert.")
             # Fehlerbehandlung beim Laden des Stylesheets
             except Exception as e: # Fehlerbehandlung 
-                print("Fehler beim Laden des Stylesheets, stelle sicher das du im richtigen Verzeichnis ../b2-1_haarcascades/main.py startest")
+                print("Fehler beim Laden des Stylesheets")
             self.nightmode_action.setText("Nachtmodus")
         else:
             try:  
-                    self.load_stylesheet("night_mode.css") # Um Fehlermeldung zu vermeiden
-                    self.load_stylesheet("b2-1_haarcascades/night_mode.css")
+                    self.load_stylesheet("night_mode.css")
                     self.status.showMessage("Nachtmodus aktiviert.")               
             # Fehlerbehandlung beim Laden des Stylesheets
             except Exception as e: # Fehlerbehandlung 
-                print("Fehler beim Laden des Stylesheets, stelle sicher das du im richtigen Verzeichnis ../b2-1_haarcascades/main.py startest")
+                print("Fehler beim Laden des Stylesheets")
             self.nightmode_action.setText("Tagmodus")
         
         self.is_nightmode = not self.is_nightmode  # Nachtmodus-Status umschalten 
         
     
+    # Schaltet den Tracking-Modus ein oder aus.
+    def toggle_tracking(self, checked):
+        """
+        Schaltet den Tracking-Modus ein oder aus. Im Tracking-Modus wird das ganze Bild nur in Keyframes durchsucht,
+        dazwischen werden die bekannten Objekte in einem Fenster um ihre letzte Position verfolgt.
+
+        Parameter: checked (bool): True = Tracking-Modus aktiv.
+        """
+        self.object_tracker.reset(self.detection_sequence)
+        self.is_tracking = checked
+        if checked:
+            self.status.showMessage(f"Tracking-Modus aktiviert (Keyframe alle {self.object_tracker.keyframe_interval} Frames).")
+        else:
+            self.status.showMessage("Tracking-Modus deaktiviert.")
+
+
+    # Schaltet den Bewegungsfilter ein oder aus.
+    def toggle_motion_gate(self, checked):
+        """
+        Schaltet den Bewegungsfilter ein oder aus. Mit Bewegungsfilter wird nur erkannt, wenn bzw. wo sich der Frame
+        seit der letzten Erkennung geändert hat, sonst werden die bisherigen Boxen weiterverwendet.
+
+        Parameter: checked (bool): True = Bewegungsfilter aktiv.
+        """
+        self.motion_gate.reset(self.detection_sequence)
+        self.is_motion_gate = checked
+        if checked:
+            self.status.showMessage(f"Bewegungsfilter aktiviert (vollständige Erkennung spätestens alle {self.motion_gate.refresh_interval} Frames).")
+        else:
+            self.status.showMessage("Bewegungsfilter deaktiviert.")
+
+
+    # Schaltet die adaptive Erkennungsauflösung ein oder aus.
+    def toggle_adaptive_resolution(self, checked):
+        """
+        Schaltet die adaptive Erkennungsauflösung ein oder aus. Die Erkennung läuft dann auf einem verkleinerten
+        Graustufenbild, dessen Größe anhand der gemessenen Erkennungszeit an die Ziel-FPS angepasst wird.
+
+        Parameter: checked (bool): True = adaptive Auflösung aktiv.
+        """
+        self.resolution_controller.reset()
+        self.is_adaptive_resolution = checked
+        if checked:
+            self.status.showMessage(f"Adaptive Auflösung aktiviert (Ziel: {self.resolution_controller.target_fps} FPS).")
+        else:
+            self.status.showMessage("Adaptive Auflösung deaktiviert.")
+
+
+    # Schaltet zwischen Echtzeit-Wiedergabe und Analyse so schnell wie möglich um (Video-Modus).
+    def toggle_video_realtime(self, checked):
+        """
+        Schaltet zwischen Echtzeit-Wiedergabe (verspätete Frames werden übersprungen) und Analyse jedes Frames
+        so schnell wie möglich um.
+
+        Parameter: checked (bool): True = Echtzeit-Wiedergabe.
+        """
+        self.is_video_realtime = checked
+        self.camera_manager.set_video_realtime(checked)
+        if checked:
+            self.status.showMessage("Video: Echtzeit-Wiedergabe.")
+        else:
+            self.status.showMessage("Video: Analyse so schnell wie möglich.")
+
+
+    # Schaltet das Erkennungs-Log ein oder aus.
+    def toggle_detection_log(self, checked):
+        """
+        Schaltet das Erkennungs-Log ein oder aus (Dateiauswahl über System-Dialog).
+        Format anhand der Dateiendung: .jsonl (eine Zeile je Frame) oder .npy (kompaktes Binärformat für hohe Bildraten).
+
+        Parameter: checked (bool): True = Log aktiv.
+        """
+        try:
+            if checked:
+                file_path = self.file_manager.save_file_dialog("Erkennungs-Log speichern", ".jsonl",
+                                                               [("JSON Lines", "*.jsonl"), ("NumPy (binär)", "*.npy"), ("Alle Dateien", "*.*")])
+                if not file_path:
+                    self.detection_log_action.setChecked(False)
+                    return
+                self.detection_log = DetectionLogWriter(file_path)
+                self.status.showMessage(f"Erkennungs-Log aktiviert: {file_path}")
+            elif self.detection_log is not None:
+                detection_log, self.detection_log = self.detection_log, None
+                detection_log.close() # Restliche Einträge schreiben
+                self.status.showMessage(f"Erkennungs-Log beendet ({detection_log.written} Frames).")
+        except Exception as e:
+            print(f"Fehler beim Umschalten des Erkennungs-Logs: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Liefert die aktuellen Parameter der Klassifizierer für das Erkennungs-Log.
+    def get_log_parameters(self, classifier_id):
+        """
+        Liefert eine Momentaufnahme der Parameter für das Erkennungs-Log (Aufruf beim Übergeben des Frames, im GUI-Thread).
+
+        Parameter: classifier_id (str): ID des Klassifizierers oder "multi".
+        Rückgabe: Dictionary {classifier_id: {"scaleFactor", "minNeighbors", "minSize"}}.
+        """
+        classifiers = self.classifier_manager.classifiers
+        classifier_ids = self.classifier_manager.multi_classifiers if classifier_id == "multi" else [classifier_id]
+        return {child_id: {key: classifiers[child_id][key] for key in ("scaleFactor", "minNeighbors", "minSize")}
+                for child_id in classifier_ids if child_id in classifiers}
+
+
+    # Protokolliert das Ergebnis einer Erkennung im Erkennungs-Log.
+    def log_detections(self, sequence, objects, detection_time, context=None, source=0):
+        """
+        Protokolliert das Ergebnis einer Erkennung (Aufruf im Worker-Thread, blockiert nicht).
+
+        Parameter: sequence (int): Nummer des Frames.
+                   objects (dict): Dictionary {classifier_id: Boxen}.
+                   detection_time (float): Dauer der Erkennung in Sekunden.
+                   context (dict): Daten aus dem Erkennungsauftrag: "timestamp" (Aufnahmezeitpunkt) und "parameters"
+                                   (Parameter beim Übergeben des Frames, siehe get_log_parameters).
+                   source (int): ID der Quelle.
+        """
+        detection_log = self.detection_log
+        if detection_log is None or not isinstance(objects, dict) or context is None: # Frame wurde vor dem Start des Logs übergeben
+            return
+        detection_log.log(sequence, objects, context["parameters"], timestamp=context.get("timestamp"), source=source)
+
+
+    # Schaltet die Performance-Anzeige (FPS und Zeiten je Stufe) in der Statusleiste ein oder aus.
+    def toggle_hud(self, checked):
+        """
+        Schaltet die Performance-Anzeige (FPS und p50/p99 je Stufe) in der Statusleiste ein oder aus.
+
+        Parameter: checked (bool): True = Anzeige aktiv.
+        """
+        self.is_hud = checked
+        self.profiler.reset()
+        if not checked:
+            self.status.showMessage("Performance-Anzeige deaktiviert.")
+
+
+    # Aktualisiert die Performance-Anzeige (höchstens zweimal pro Sekunde).
+    def update_hud(self):
+        """
+        Aktualisiert die Performance-Anzeige in der Statusleiste (höchstens zweimal pro Sekunde).
+        """
+        now = time.perf_counter()
+        if now - self.hud_last_update < 0.5:
+            return
+        if self.is_hud:
+            self.status.showMessage(self.profiler.summary_text(
+                ["camera_read", "video_decode", "capture", "submit", "detect", "composite", "qpixmap", "display"])
+                + " | " + self.frame_scheduler.summary_text() # Takt und Auslastung des GUI-Threads
+                + (" | " + self.motion_gate_summary() if self.is_motion_gate else ""))
+        elif self.mode_selector.currentText() == "video":
+            # Verarbeitungsrate (abgeschlossene Erkennungen) im Vergleich zur Bildrate der Videodatei
+            completed = self.detection_pool.completed
+            processing_fps = max(0, completed - self.video_completed_last) / (now - self.hud_last_update)
+            self.video_completed_last = completed
+            stats = self.camera_manager.get_video_stats()
+            position = f"{int(stats['position'] // 60):02d}:{int(stats['position'] % 60):02d}"
+            duration = f"{int(stats['duration'] // 60):02d}:{int(stats['duration'] % 60):02d}"
+            self.status.showMessage(f"Video {position}/{duration} | Verarbeitung {processing_fps:.1f} FPS / Quelle {stats['source_fps']:.1f} FPS"
+                                    f" | {stats['skipped']} übersprungen | Puffer {stats['buffered']}")
+        self.hud_last_update = now
+
+
+    # Liefert die Statistik des Bewegungsfilters als Text.
+    def motion_gate_summary(self):
+        """
+        Liefert die Statistik des Bewegungsfilters als Text (übersprungene, teilweise und vollständige Erkennungen
+        sowie Anteil der durchsuchten Pixel).
+        """
+        stats = self.motion_gate.get_stats()
+        return (f"Bewegungsfilter: {stats['skipped']} übersprungen, {stats['partial']} Bereiche, {stats['full']} vollständig, "
+                f"{stats['searched']:.0%} durchsucht")
+
+
+    # Exportiert die gemessenen Zeiten im Chrome Trace-Event-Format.
+    def export_trace(self):
+        """
+        Exportiert die gemessenen Zeiten im Chrome Trace-Event-Format (Dateiauswahl über System-Dialog).
+        """
+        try:
+            file_path = self.file_manager.save_file_dialog("Trace speichern", ".json", [("JSON-Dateien", "*.json"), ("Alle Dateien", "*.*")])
+            if file_path and self.profiler.export_chrome_trace(file_path):
+                self.status.showMessage(f"Trace gespeichert: {file_path}")
+        except Exception as e:
+            print(f"Fehler beim Exportieren des Traces: {str(e)}") # Debug-Ausgabe in Konsole
+
+
     # Zeigt ein Dialogfeld mit einer Kurzanleitung an (erreichbar über Menü->Info->Kurzanleitung)
     def show_help(self):
         QMessageBox.about(self, "Kurzanleitung",  "Kamera und Modus auswählen und auf Live-Kamera Starten klicken.\n\nAlternativ Modus auf 'file' setzen und Bild Laden.\n\nObjekte werden automatisch erkannt, markiert und gezählt.\n\nVortrainierte als auch eigene Klassifizierer können geladen werden.\n\nDazu einfach den entsprechenden Button klicken und die XML-Datei auswählen.\n\nViel Spaß!")
@@ -425,15 +742,90 @@ class App(QMainWindow):
     def load_stylesheet(self, filename):
         """
         Lädt ein Stylesheet aus einer Datei und wendet es auf die Anwendung an.
+        Die Datei wird nur beim ersten Mal gelesen (z. B. beim Umschalten des Nachtmodus).
 
-        Parameter: filename (str): Dateiname des Stylesheets.
+        Parameter: filename (str): Dateiname des Stylesheets (relativ zu app.py).
         """
         try:
-            with open(filename, "r") as file:
-                self.setStyleSheet(file.read())
+            if filename not in self.stylesheets:
+                with open(os.path.join(BASE_DIR, filename), "r") as file:
+                    self.stylesheets[filename] = file.read()
+            self.setStyleSheet(self.stylesheets[filename])
         except FileNotFoundError:
             print(f"Error: Stylesheet file '{filename}' not found.")
 
+
+    # Markiert das erste Zeichnen des Fensters.
+    def paintEvent(self, event):
+        """
+        Zeichnet das Fenster. Nach dem ersten Zeichnen werden die zurückgestellten Startschritte ausgeführt.
+        """
+        super().paintEvent(event)
+        if not self.startup_finished:
+            self.startup_finished = True
+            self.startup_report.mark("Fenster gezeichnet")
+            QTimer.singleShot(0, self.finish_startup) # Nach dem Zeichnen, nicht innerhalb von paintEvent
+
+
+    # Führt die zurückgestellten Startschritte aus.
+    def finish_startup(self):
+        """
+        Führt die zurückgestellten Startschritte aus, sobald das Fenster sichtbar ist:
+        Animation starten, Klassifizierer im Hintergrund vorladen, Kameras im Hintergrund suchen.
+        """
+        try:
+            self.frame_scheduler.start("animation", 50)  # Animationsgeschwindigkeit in ms
+            self.startup_report.begin_task("Klassifizierer geladen")
+            self.startup_report.begin_task("Kamerasuche fertig")
+
+            # Klassifizierer vorladen (im Hintergrund, die Erkennung lädt einen fehlenden Klassifizierer selbst)
+            def preload():
+                self.classifier_manager.preload_classifiers(background=False)
+                self.startup_report.end_task("Klassifizierer geladen")
+            threading.Thread(target=preload, name="CascadePreload", daemon=True).start()
+
+            # Kameraliste aktualisieren (im Hintergrund, der Start wartet nicht auf die Kamerasuche)
+            self.refresh_camera_list()
+        except Exception as e:
+            print(f"Fehler beim Abschließen des Programmstarts: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Prüft nach Minimieren/Wiederherstellen, welche Aufgaben laufen sollen.
+    def changeEvent(self, event):
+        """
+        Prüft nach Minimieren/Wiederherstellen des Fensters sofort, welche Aufgaben des Schedulers laufen sollen.
+        """
+        super().changeEvent(event)
+        self.frame_scheduler.update()
+
+
+    # Prüft nach dem Anzeigen des Fensters, welche Aufgaben laufen sollen.
+    def showEvent(self, event):
+        """
+        Prüft nach dem Anzeigen des Fensters sofort, welche Aufgaben des Schedulers laufen sollen.
+        """
+        super().showEvent(event)
+        self.frame_scheduler.update()
+
+
+    # Prüft nach dem Verbergen des Fensters, welche Aufgaben laufen sollen.
+    def hideEvent(self, event):
+        """
+        Prüft nach dem Verbergen des Fensters sofort, welche Aufgaben des Schedulers laufen sollen.
+        """
+        super().hideEvent(event)
+        self.frame_scheduler.update()
+
+
+    # Zeichnet ein statisches Bild nach einer Größenänderung neu.
+    def resizeEvent(self, event):
+        """
+        Weckt die Frame-Aktualisierung nach einer Größenänderung (ein statisches Bild wird in der neuen Größe gezeichnet).
+        """
+        super().resizeEvent(event)
+        self.frame_scheduler.wake("frame")
+
+
     # Ändert den Modus basierend auf der Auswahl im Dropdown-Menü.
     def change_mode(self, text):
         """
@@ -442,21 +834,15 @@ class App(QMainWindow):
         Parameter: text (str): Text des ausgewählten Modus.
         """
         try:
+            if text != "multi":
+                self.btn_start_camera.setText("Live-Kamera Starten")
             if text == "live":
-                available_cameras = self.camera_manager.detect_cameras()
-                if available_cameras:
-                    self.btn_start_camera.setEnabled(True)
-                    self.btn_start_camera.setProperty("status","start")
-                    self.btn_start_camera.style().unpolish(self.btn_start_camera) 
-                    self.btn_start_camera.style().polish(self.btn_start_camera)    
-                    self.btn_load_image.setEnabled(False)
-                    self.btn_load_image.setProperty("status","unavailable")
-                    self.btn_load_image.style().unpolish(self.btn_load_image)
-                    self.btn_load_image.style().polish(self.btn_load_image)
-                    self.status.showMessage("Modus auf Live-Kamera geändert.")
-                else:
-                    self.status.showMessage("Keine Kamera erkannt.")
-                    print("Keine Kamera erkannt.")
+                self.btn_load_image.setEnabled(False)
+                self.btn_load_image.setProperty("status","unavailable")
+                self.btn_load_image.style().unpolish(self.btn_load_image)
+                self.btn_load_image.style().polish(self.btn_load_image)
+                self.status.showMessage("Modus auf Live-Kamera geändert.")
+                self.refresh_camera_list(force=False) # Kamera-Button wird nach der (ggf. zwischengespeicherten) Kamerasuche freigegeben
 
             elif text == "file":
                 self.btn_start_camera.setEnabled(False)
@@ -467,7 +853,28 @@ class App(QMainWindow):
                 self.btn_load_image.setProperty("status","start")
                 self.btn_load_image.style().unpolish(self.btn_load_image)
                 self.btn_load_image.style().polish(self.btn_load_image)
+                self.btn_load_image.setText("Bild Laden")
                 self.status.showMessage("Modus auf Bild laden geändert.")
+            elif text == "video":
+                self.btn_start_camera.setEnabled(False)
+                self.btn_start_camera.setProperty("status", "unavailable")
+                self.btn_start_camera.style().unpolish(self.btn_start_camera)
+                self.btn_start_camera.style().polish(self.btn_start_camera)
+                self.btn_load_image.setEnabled(True)
+                self.btn_load_image.setProperty("status","start")
+                self.btn_load_image.style().unpolish(self.btn_load_image)
+                self.btn_load_image.style().polish(self.btn_load_image)
+                self.btn_load_image.setText("Video Laden")
+                self.status.showMessage("Modus auf Video geändert.")
+            elif text == "multi":
+                self.btn_start_camera.setText("Multi-Start")
+                self.btn_load_image.setEnabled(True)
+                self.btn_load_image.setProperty("status","start")
+                self.btn_load_image.style().unpolish(self.btn_load_image)
+                self.btn_load_image.style().polish(self.btn_load_image)
+                self.btn_load_image.setText("Video hinzufügen")
+                self.status.showMessage("Modus auf Multi-Kamera geändert (alle Kameras und hinzugefügten Videos).")
+                self.refresh_camera_list(force=False) # Start-Button wird nach der (ggf. zwischengespeicherten) Kamerasuche freigegeben
             else:
                 self.btn_start_camera.setEnabled(False)
                 self.btn_load_image.setEnabled(False)
@@ -485,6 +892,7 @@ class App(QMainWindow):
         """
         try:
             self.btn_choose_classifier.setEnabled(False)
+            self.btn_train_classifier.setEnabled(False)
             self.slider_custom_scaleFactor.setEnabled(False)
             self.slider_custom_minNeighbors.setEnabled(False)
             self.slider_custom_minSize.setEnabled(False)
@@ -501,9 +909,13 @@ class App(QMainWindow):
                 self.load_predefined_classifier("fullbody")
             elif text == "profileface":
                 self.load_predefined_classifier("profileface")
+            elif text == "face + eye + smile":
+                self.classifier_manager.current_classifier = "multi" # Mehrfach-Modus (Augen und Lächeln nur innerhalb der Gesichter)
+                self.status.showMessage("Mehrfach-Klassifizierer face + eye + smile geladen.")
             elif text == "Eigener Klassifizierer":
                 self.classifier_manager.current_classifier ="custom"
                 self.btn_choose_classifier.setEnabled(True)
+                self.btn_train_classifier.setEnabled(self.training_thread is None)
                 self.slider_custom_scaleFactor.setEnabled(True)
                 self.slider_custom_minNeighbors.setEnabled(True)
                 self.slider_custom_minSize.setEnabled(True)
@@ -513,6 +925,7 @@ class App(QMainWindow):
         except Exception as e:
             print(f"Fehler beim Ändern des Klassifizierers: {str(e)}") # Debug-Ausgabe in Konsole
             self.status.showMessage(f"Fehler beim Ändern des Klassifizierers: {str(e)}") # Statusnachricht in Statusleiste
+        self.frame_scheduler.wake("frame") # Statisches Bild mit neuem Klassifizierer zeichnen
             
 
     # Lädt vordefinierte Klassifizierer mit den entsprechenden Parametern.
@@ -548,58 +961,175 @@ class App(QMainWindow):
             classifier_name = self.classifier_manager.load_custom_classifier()
             self.custom_classifier_label.setText(classifier_name)
             self.status.showMessage(f"Benutzerdefinierter Klassifizierer {classifier_name} geladen.")
+            self.frame_scheduler.wake("frame")
         except Exception as e:
             print(f"Fehler beim Laden des benutzerdefinierten Klassifizierers: {str(e)}") # Debug-Ausgabe in Konsole
             self.status.showMessage(f"Fehler beim Laden des benutzerdefinierten Klassifizierers: {str(e)}") # Statusnachricht in Statusleiste
             
 
+    # Trainiert einen eigenen Klassifizierer im Hintergrund.
+    def train_classifier(self):
+        """
+        Fragt die Verzeichnisse der Trainingsbilder und den Speicherort ab und startet das Training in einem eigenen Thread.
+        Das Ergebnis kommt über das Signal training_finished.
+        """
+        try:
+            positive_dir = self.file_manager.open_directory("Verzeichnis mit Objektbildern auswählen")
+            negative_dir = self.file_manager.open_directory("Verzeichnis mit Hintergrundbildern auswählen") if positive_dir else None
+            output_path = self.file_manager.choose_classifier_path() if negative_dir else None
+            if not output_path:
+                self.status.showMessage("Training abgebrochen.")
+                return
+            self.btn_train_classifier.setEnabled(False)
+            self.status.showMessage("Klassifizierer wird trainiert (Fortschritt in der Konsole)...")
+            self.training_thread = threading.Thread(
+                target=lambda: self.training_finished.emit(self.classifier_manager.train_classifier(positive_dir, negative_dir, output_path)),
+                name="ClassifierTraining", daemon=True)
+            self.training_thread.start()
+        except Exception as e:
+            print(f"Fehler beim Starten des Trainings: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Übernimmt das Ergebnis des Trainings.
+    def on_training_finished(self, classifier_name):
+        """
+        Übernimmt das Ergebnis des Trainings (im GUI-Thread).
+
+        Parameter: classifier_name (str): Name des trainierten Klassifizierers oder Fehlermeldung.
+        """
+        self.training_thread = None
+        self.btn_train_classifier.setEnabled(self.classifier_manager.current_classifier == "custom")
+        self.custom_classifier_label.setText(classifier_name)
+        self.status.showMessage(f"Training beendet: {classifier_name}")
+        self.frame_scheduler.wake("frame")
+
+
+    # Startet die Erkennung im statischen Bild in einem Hintergrund-Thread.
+    def start_static_detection(self, frame, classifier_id, detection_key):
+        """
+        Startet die Erkennung im statischen Bild in einem Hintergrund-Thread (große Bilder in Kacheln, kann Sekunden dauern).
+        Es läuft höchstens eine Erkennung; das Ergebnis kommt über das Signal static_detection_finished.
+
+        Parameter: frame (np.ndarray): Statisches Bild im BGR-Format.
+                   classifier_id (str): ID des Klassifizierers oder "multi".
+                   detection_key (tuple): Bild-Hash und Klassifizierer-Schlüssel, für die das Ergebnis gilt.
+        """
+        if self.static_detection_thread is not None: # Nach dem Ende wird mit den dann aktuellen Parametern neu gestartet
+            return
+        image_key = detection_key[0]
+        self.static_detection_thread = threading.Thread(
+            target=lambda: self.static_detection_finished.emit(
+                detection_key, self.classifier_manager.detect_objects_cached(frame, classifier_id, image_key)),
+            name="StaticDetection", daemon=True)
+        self.static_detection_thread.start()
+        self.status.showMessage("Objekterkennung läuft...")
+
+
+    # Übernimmt das Ergebnis der Erkennung im statischen Bild.
+    def on_static_detection_finished(self, detection_key, objects):
+        """
+        Übernimmt das Ergebnis der Erkennung im statischen Bild (im GUI-Thread) und zeichnet das Bild neu.
+
+        Parameter: detection_key (tuple): Bild-Hash und Klassifizierer-Schlüssel der Erkennung.
+                   objects (dict): Dictionary {classifier_id: erkannte Objekte}.
+        """
+        self.static_detection_thread = None
+        self.static_detection_result = (detection_key, objects)
+        if detection_key[0] == self.static_image_key:
+            self.status.showMessage("Objekterkennung abgeschlossen.")
+        self.frame_scheduler.wake("frame")
+
+
     # Aktualisiert die Liste der verfügbaren Kameras.
-    def refresh_camera_list(self):
+    def refresh_camera_list(self, force=True):
         """
-        Aktualisiert die Liste der verfügbaren Kameras.
+        Aktualisiert die Liste der verfügbaren Kameras. Die Suche läuft im Hintergrund,
+        das Dropdown-Menü wird über das Signal cameras_detected aktualisiert.
+
+        Parameter: force (bool): True = neu suchen, False = gültiges Ergebnis aus dem Cache verwenden.
         """
         try:
-            available_cameras = self.camera_manager.detect_cameras()
+            if force or self.camera_manager.get_cached_cameras() is None:
+                self.btn_refresh_cameras.setEnabled(False)
+                self.status.showMessage("Kameras werden gesucht...")
+            self.camera_manager.detect_cameras_async(self.cameras_detected.emit, force=force)
+        except Exception as e:
+            print(f"Fehler beim Aktualisieren der Kamera-Liste: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Übernimmt das Ergebnis der Kamerasuche in das Dropdown-Menü.
+    def update_camera_list(self, available_cameras):
+        """
+        Übernimmt das Ergebnis der Kamerasuche in das Dropdown-Menü (im GUI-Thread).
+
+        Parameter: available_cameras (list): Indizes der gefundenen Kameras.
+        """
+        try:
+            self.startup_report.end_task("Kamerasuche fertig")
+            if self.camera_manager.is_capturing() or self.multi_source_manager is not None: # Während der Aufnahme bleibt die Auswahl unverändert
+                return
+            self.btn_refresh_cameras.setEnabled(True)
+            self.available_cameras = list(available_cameras)
             self.camera_selector.clear()
+            mode = self.mode_selector.currentText()
+            live = mode == "live" or (mode == "multi" and not self.multi_video_paths)
+            if (mode == "live" and available_cameras) or (mode == "multi" and (available_cameras or self.multi_video_paths)):
+                self.enable_start_button()
             if available_cameras:
                 camera_names = [f"Kamera {index}" for index in available_cameras]
                 self.camera_selector.addItems(camera_names)
                 self.status.showMessage(f"Kameras gefunden: {camera_names}")
-                self.btn_start_camera.setEnabled(True)
-                self.btn_start_camera.setProperty("status","start")
-                self.btn_start_camera.style().unpolish(self.btn_start_camera) # Zurücksetzen des Styles 
-                self.btn_start_camera.style().polish(self.btn_start_camera) # Neuanwenden des Styles
             else:
                 self.camera_selector.addItem("Keine Kamera erkannt")
                 self.status.showMessage("Keine Kameras gefunden.")
-                self.btn_start_camera.setEnabled(False) # Bug: setEnable ändert Button-Style nicht automatisch"
-                self.btn_start_camera.setProperty("status", "unavailable") # Ändert Style des Buttons durch Property (Style Sheet)
-                self.btn_start_camera.style().unpolish(self.btn_start_camera) # Zurücksetzen des Styles 
-                self.btn_start_camera.style().polish(self.btn_start_camera) # Neuanwenden des Styles
+                if live:
+                    self.btn_start_camera.setEnabled(False) # Bug: setEnable ändert Button-Style nicht automatisch"
+                    self.btn_start_camera.setProperty("status", "unavailable") # Ändert Style des Buttons durch Property (Style Sheet)
+                    self.btn_start_camera.style().unpolish(self.btn_start_camera) # Zurücksetzen des Styles 
+                    self.btn_start_camera.style().polish(self.btn_start_camera) # Neuanwenden des Styles
         except Exception as e:
             print(f"Fehler beim Aktualisieren der Kamera-Liste: {str(e)}") # Debug-Ausgabe in Konsole
             
 
+    # Gibt den Start-Button frei.
+    def enable_start_button(self):
+        """
+        Gibt den Start-Button frei (Live- bzw. Multi-Modus).
+        """
+        self.btn_start_camera.setEnabled(True)
+        self.btn_start_camera.setProperty("status","start")
+        self.btn_start_camera.style().unpolish(self.btn_start_camera) # Zurücksetzen des Styles 
+        self.btn_start_camera.style().polish(self.btn_start_camera) # Neuanwenden des Styles
+
+
     # Startet die Kamera.   
     def start_camera(self):
         """
         Startet die Kamera basierend auf dem ausgewählten Kamera-Index.
         """
         camera_index = self.camera_selector.currentIndex()  # Kamera-Index auswählen
+        if 0 <= camera_index < len(self.available_cameras):
+            camera_index = self.available_cameras[camera_index] # Eintrag im Dropdown-Menü -> Index der Kamera
         try:
             self.btn_refresh_cameras.setEnabled(False)
             self.camera_selector.setEnabled(False)
             self.mode_selector.setEnabled(False)
-            self.classifier_selector.setEnabled(False)
             self.btn_screenshot.setEnabled(True)
             self.btn_start_camera.setProperty("status","stop")
             self.btn_start_camera.style().unpolish(self.btn_start_camera)  # Reset style
             self.btn_start_camera.style().polish(self.btn_start_camera)    # Reapply style
             self.btn_start_camera.setText("Live-Kamera Stoppen")
-            self.camera_manager.start_camera(camera_index)
+            self.camera_manager.start_camera(camera_index, threaded=True) # Frames werden im Hintergrund gelesen
+            self.last_frame_sequence = 0 # Nummer des zuletzt angezeigten Frames
+            self.last_display_sequence = 0 # Nummer des zuletzt angezeigten aufbereiteten Frames
+            self.live_objects = {}
+            self.detection_pool.reset()
+            self.display_compositor.reset()
+            self.object_tracker.reset(self.detection_sequence)
+            self.motion_gate.reset(self.detection_sequence)
             print(f"Kamera {camera_index} erfolgreich gestartet.")
             self.status.showMessage(f"Kamera {camera_index} erfolgreich gestartet.")
-            self.timer.start(10)  # Update alle 10 ms
+            self.frame_scheduler.start("frame", 10)  # Takt passt sich der Bildrate der Kamera an
         except Exception as e:
             self.animation_label.setText(f"Kamera konnte nicht gestartet werden: {str(e)}") 
             self.status.showMessage(f"Kamera-Fehler: {str(e)}")
@@ -615,7 +1145,6 @@ class App(QMainWindow):
             self.btn_refresh_cameras.setEnabled(True)
             self.camera_selector.setEnabled(True)
             self.mode_selector.setEnabled(True)
-            self.classifier_selector.setEnabled(True)
             self.btn_screenshot.setEnabled(False)
             self.btn_start_camera.setProperty("status","start") # Setzt Property für Style zurück
             self.btn_start_camera.style().unpolish(self.btn_start_camera) # Zurücksetzen des Styles 
@@ -623,7 +1152,7 @@ class App(QMainWindow):
             self.btn_start_camera.setText("Live-Kamera Starten")
             self.status.showMessage("Kamera wird gestoppt...") # Statusnachricht in Statusleiste
             self.camera_manager.stop_camera() # Kamera stoppen aus CameraManager ausführen
-            self.timer.stop() # Timer stoppen(keine Frames mehr aktualisieren)
+            self.frame_scheduler.stop("frame") # Keine Frames mehr aktualisieren
             self.num_objects = 0 # Anzahl der erkannten Objekte auf 0 zurücksetzen
             self.object_count_label.setText(f"<a style=\"text-decoration:none;\" href=\"http://www.easteregg.com\"> {self.num_objects} </a>")
             self.current_frame = None # Bild löschen
@@ -642,7 +1171,12 @@ class App(QMainWindow):
 
         Parameter: checked (bool): Status des Buttons (True = Start, False = Stop).
         """
-        if checked:                 
+        if self.mode_selector.currentText() == "multi":
+            if checked:
+                self.start_multi()
+            else:
+                self.stop_multi()
+        elif checked:                 
             self.start_camera()
             print("Kamera gestartet") # Debug-Ausgabe in Konsole
         else:
@@ -659,7 +1193,6 @@ class App(QMainWindow):
             self.btn_refresh_cameras.setEnabled(False)
             self.camera_selector.setEnabled(False)
             self.mode_selector.setEnabled(False)
-            self.classifier_selector.setEnabled(False)
             self.btn_load_image.setProperty("status","stop") # Setzt Property für Style zurück
             self.btn_load_image.style().unpolish(self.btn_load_image) # Zurücksetzen des Styles
             self.btn_load_image.style().polish(self.btn_load_image) # Neuanwenden des Styles 
@@ -667,10 +1200,13 @@ class App(QMainWindow):
             self.status.showMessage("Bild wird geladen...") # Statusnachricht in Statusleiste
             file_path = self.file_manager.open_file_picture() # Aufruf der Methode zum Öffnen einer Datei aus dem FileManager
             if file_path:
-                self.static_image = self.file_manager.load_image(file_path) # Aufruf der Methode zum Laden eines Bildes aus dem FileManager
-                self.static_image = cv2.cvtColor(self.static_image, cv2.COLOR_BGR2RGB) # OpenCV (standard) BGR, Umwandlung in RGB
+                self.static_image = self.file_manager.load_image(file_path) # Aufruf der Methode zum Laden eines Bildes aus dem FileManager (BGR)
+                self.static_image_key = self.classifier_manager.image_hash(self.static_image) # Hash einmalig beim Laden berechnen
+                self.static_pixmap = None
+                self.static_render_key = None
+                self.static_objects = {}
                 self.btn_start_camera.setEnabled(False)
-                self.timer.start(50) # Update alle 50 ms
+                self.frame_scheduler.start("frame", 50, pause_when_idle=True) # Ruht, sobald das Bild gezeichnet ist
                 self.status.showMessage(f"Bild {file_path} erfolgreich geladen.") # Statusnachricht in Statusleiste
                 print(f"Bild {file_path} erfolgreich geladen.") # Debug-Ausgabe in Konsole
 
@@ -687,7 +1223,6 @@ class App(QMainWindow):
         try:
             self.btn_refresh_cameras.setEnabled(True)
             self.camera_selector.setEnabled(True)
-            self.classifier_selector.setEnabled(True)
             self.mode_selector.setEnabled(True)
             
             self.btn_load_image.setProperty("status","start")
@@ -696,7 +1231,11 @@ class App(QMainWindow):
             self.btn_load_image.setText("Bild Laden")
             self.status.showMessage("Bild wird zurückgesetzt...")
             self.static_image = None # Bild löschen
-            self.timer.stop() # Timer stoppen (keine Frames mehr aktualisieren)
+            self.static_image_key = None
+            self.static_pixmap = None
+            self.static_render_key = None
+            self.static_objects = {}
+            self.frame_scheduler.stop("frame") # Keine Frames mehr aktualisieren
             self.btn_screenshot.setEnabled(False)
             self.image_display.clear() # Bildanzeige leeren
             self.image_display.setText("Anzeigebereich für Bilder/Kamera")
@@ -712,12 +1251,20 @@ class App(QMainWindow):
     # Lädt ein Bild aus einer Datei und setzt den Button zurück.
     def load_reset_file(self, checked):
         """
-        Läd ein Bild aus einer Datei und setzt den Button zurück.
+        Läd ein Bild (bzw. im Video-Modus ein Video) aus einer Datei und setzt den Button zurück.
 
         Parameter: checked (bool): Status des Buttons (True = Laden, False = Zurücksetzen).
         """
         try:
-            if checked:
+            if self.mode_selector.currentText() == "multi":
+                self.btn_load_image.setChecked(False) # Button dient nur zum Hinzufügen
+                self.add_multi_video()
+            elif self.mode_selector.currentText() == "video":
+                if checked:
+                    self.load_video_from_file()
+                else:
+                    self.stop_video()
+            elif checked:
                 self.load_image_from_file()
                 print("Bild laden...")
             else:
@@ -727,6 +1274,223 @@ class App(QMainWindow):
             print(f"Fehler beim Laden/Zurücksetzen des Bildes: {str(e)}") # Debug-Ausgabe in Konsole
         
 
+    # Öffnet ein Video aus einer Datei.
+    def load_video_from_file(self):
+        """
+        Öffnet ein Video aus einer Datei (Dateiauswahl über System-Dialog) und spielt es mit Objekterkennung ab.
+        Die Frames werden im CameraManager vorab dekodiert und wie Kamera-Frames verarbeitet.
+        """
+        try:
+            self.status.showMessage("Video wird geladen...") # Statusnachricht in Statusleiste
+            file_path = self.file_manager.open_file_video() # Aufruf der Methode zum Öffnen einer Datei aus dem FileManager
+            if not file_path or self.camera_manager.start_video(file_path, realtime=self.is_video_realtime) is None:
+                self.btn_load_image.setChecked(False)
+                self.status.showMessage("Video konnte nicht geladen werden.")
+                return
+            self.btn_refresh_cameras.setEnabled(False)
+            self.camera_selector.setEnabled(False)
+            self.mode_selector.setEnabled(False)
+            self.btn_screenshot.setEnabled(True)
+            self.btn_load_image.setProperty("status","stop") # Setzt Property für Style zurück
+            self.btn_load_image.style().unpolish(self.btn_load_image) # Zurücksetzen des Styles
+            self.btn_load_image.style().polish(self.btn_load_image) # Neuanwenden des Styles 
+            self.btn_load_image.setText("Video Stoppen")
+            self.last_frame_sequence = 0
+            self.last_display_sequence = 0
+            self.video_completed_last = 0
+            self.live_objects = {}
+            self.detection_pool.reset()
+            self.display_compositor.reset()
+            self.object_tracker.reset(self.detection_sequence)
+            self.motion_gate.reset(self.detection_sequence)
+            self.frame_scheduler.start("frame", 5) # Takt passt sich der Bildrate des Videos bzw. der Erkennung an
+            self.status.showMessage(f"Video {file_path} erfolgreich geladen.") # Statusnachricht in Statusleiste
+            print(f"Video {file_path} erfolgreich geladen.") # Debug-Ausgabe in Konsole
+        except Exception as e: # Fehlerbehandlung
+            self.status.showMessage(f"Fehler beim Laden des Videos: {str(e)}")
+            print(f"Fehler beim Laden des Videos: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Stoppt die Wiedergabe des Videos.
+    def stop_video(self):
+        """
+        Stoppt die Wiedergabe des Videos und gibt Ressourcen frei.
+        """
+        try:
+            self.btn_refresh_cameras.setEnabled(True)
+            self.camera_selector.setEnabled(True)
+            self.mode_selector.setEnabled(True)
+            self.btn_screenshot.setEnabled(False)
+            self.btn_load_image.setProperty("status","start")
+            self.btn_load_image.style().unpolish(self.btn_load_image)  
+            self.btn_load_image.style().polish(self.btn_load_image)   
+            self.btn_load_image.setText("Video Laden")
+            self.camera_manager.stop_camera() # Dekodier-Thread beenden und Datei schließen
+            self.frame_scheduler.stop("frame") # Keine Frames mehr aktualisieren
+            self.num_objects = 0 # Anzahl der erkannten Objekte auf 0 zurücksetzen
+            self.object_count_label.setText(f"<a style=\"text-decoration:none;\" href=\"http://www.easteregg.com\"> {self.num_objects} </a>")
+            self.current_frame = None # Bild löschen
+            self.image_display.clear()  # Bildanzeige leeren
+            self.image_display.setText("Anzeigebereich für Bilder/Kamera")
+            self.status.showMessage("Video gestoppt.") # Statusnachricht in Statusleiste
+        except Exception as e: # Fehlerbehandlung
+            print(f"Fehler beim Stoppen des Videos: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Fügt eine Videodatei als Quelle für den Modus "multi" hinzu.
+    def add_multi_video(self):
+        """
+        Fügt eine Videodatei als Quelle für den Modus "multi" hinzu (Dateiauswahl über System-Dialog).
+        Läuft der Modus bereits, wird das Video sofort geöffnet.
+        """
+        try:
+            file_path = self.file_manager.open_file_video()
+            if not file_path:
+                return
+            self.multi_video_paths.append(file_path)
+            if self.multi_source_manager is not None: # Modus läuft bereits
+                source_id = self.multi_source_manager.add_video(file_path, realtime=self.is_video_realtime)
+                if source_id is not None:
+                    self.multi_compositors[source_id] = DisplayCompositor(self.get_detection_color, self.profiler)
+            self.enable_start_button()
+            self.status.showMessage(f"Videos für Multi-Modus: {len(self.multi_video_paths)}")
+        except Exception as e: # Fehlerbehandlung
+            print(f"Fehler beim Hinzufügen des Videos: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Startet alle Quellen des Modus "multi".
+    def start_multi(self):
+        """
+        Startet alle gefundenen Kameras und hinzugefügten Videos gleichzeitig. Die Frames aller Quellen werden
+        von einem gemeinsamen Detection-Pool reihum bearbeitet und als Kacheln angezeigt.
+        """
+        try:
+            self.multi_source_manager = MultiSourceManager(self.detect_objects)
+            self.multi_source_manager.profiler = self.profiler
+            self.multi_source_manager.result_callback = lambda source_id, sequence, objects, detection_time, context: \
+                self.log_detections(sequence, objects, detection_time, context, source_id)
+            for camera_id in self.available_cameras:
+                self.multi_source_manager.add_camera(camera_id)
+            for file_path in self.multi_video_paths:
+                self.multi_source_manager.add_video(file_path, realtime=self.is_video_realtime)
+            if not self.multi_source_manager.sources:
+                self.multi_source_manager.stop_all()
+                self.multi_source_manager = None
+                self.btn_start_camera.setChecked(False)
+                self.status.showMessage("Keine Quelle konnte geöffnet werden.")
+                return
+
+            self.multi_compositors = {source_id: DisplayCompositor(self.get_detection_color, self.profiler)
+                                      for source_id in self.multi_source_manager.sources}
+            self.multi_displayed = {}
+            self.btn_refresh_cameras.setEnabled(False)
+            self.camera_selector.setEnabled(False)
+            self.mode_selector.setEnabled(False)
+            self.btn_screenshot.setEnabled(False) # Screenshots nur im Einzelmodus
+            self.btn_start_camera.setProperty("status","stop")
+            self.btn_start_camera.style().unpolish(self.btn_start_camera)
+            self.btn_start_camera.style().polish(self.btn_start_camera)
+            self.btn_start_camera.setText("Multi-Stopp")
+            self.frame_scheduler.start("frame", 10) # Takt passt sich der Bildrate aller Quellen an
+            self.status.showMessage(f"{len(self.multi_source_manager.sources)} Quellen gestartet.")
+        except Exception as e: # Fehlerbehandlung
+            self.status.showMessage(f"Fehler beim Starten der Quellen: {str(e)}")
+            print(f"Fehler beim Starten der Quellen: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Stoppt alle Quellen des Modus "multi".
+    def stop_multi(self):
+        """
+        Stoppt alle Quellen des Modus "multi" und gibt Ressourcen frei.
+        """
+        try:
+            self.frame_scheduler.stop("frame")
+            if self.multi_source_manager is not None:
+                self.multi_source_manager.stop_all()
+                self.multi_source_manager = None
+            for compositor in self.multi_compositors.values():
+                compositor.shutdown()
+            self.multi_compositors = {}
+            self.btn_refresh_cameras.setEnabled(True)
+            self.camera_selector.setEnabled(True)
+            self.mode_selector.setEnabled(True)
+            self.btn_start_camera.setProperty("status","start")
+            self.btn_start_camera.style().unpolish(self.btn_start_camera)
+            self.btn_start_camera.style().polish(self.btn_start_camera)
+            self.btn_start_camera.setText("Multi-Start")
+            self.num_objects = 0
+            self.object_count_label.setText(f"<a style=\"text-decoration:none;\" href=\"http://www.easteregg.com\"> {self.num_objects} </a>")
+            self.image_display.clear()
+            self.image_display.setText("Anzeigebereich für Bilder/Kamera")
+            self.status.showMessage("Quellen gestoppt.")
+        except Exception as e: # Fehlerbehandlung
+            print(f"Fehler beim Stoppen der Quellen: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Aktualisiert die Kachelansicht des Modus "multi".
+    def update_multi_frame(self):
+        """
+        Holt die neuesten Frames aller Quellen, übergibt sie der Objekterkennung und zeigt die aufbereiteten
+        Kacheln mit Bildrate und Anzahl der Objekte je Quelle an.
+        Rückgabe: False, wenn keine neue Kachel angezeigt wurde.
+        """
+        manager = self.multi_source_manager
+        # detect_objects ohne Tracker: der Tracker hat Zustand und gehört zu genau einem Videostrom
+        classifier_id = self.classifier_manager.current_classifier
+        context = {"parameters": self.get_log_parameters(classifier_id)} if self.detection_log is not None else None # Parameter zum Zeitpunkt der Aufnahme
+        updates = manager.poll(classifier_id, False, context=context)
+        for source_id in list(self.multi_compositors):
+            if source_id not in manager.sources: # Quelle liefert keine Frames mehr (z. B. Videoende)
+                self.multi_compositors.pop(source_id).shutdown()
+                self.multi_displayed.pop(source_id, None)
+        if not manager.sources:
+            self.btn_start_camera.setChecked(False)
+            self.stop_multi()
+            self.status.showMessage("Alle Quellen beendet.")
+            return
+
+        # Kachelraster (möglichst quadratisch)
+        source_ids = sorted(manager.sources)
+        columns = math.ceil(math.sqrt(len(source_ids)))
+        rows = math.ceil(len(source_ids) / columns)
+        width, height = self.image_display.width(), self.image_display.height()
+        tile_w, tile_h = width // columns, height // rows
+        if updates:
+            self.frame_scheduler.observe_source("frame")
+        for source_id, frame, sequence, objects in updates:
+            self.multi_compositors[source_id].submit(frame, objects, sequence, (tile_w, tile_h))
+
+        results = {source_id: self.multi_compositors[source_id].get_latest_result() for source_id in source_ids}
+        if all(results[source_id] is None or results[source_id][0] == self.multi_displayed.get(source_id) for source_id in source_ids):
+            return False # Keine neue Kachel
+
+        with self.profiler.stage("display"):
+            canvas = QPixmap(width, height)
+            canvas.fill(QColor(0, 0, 0))
+            painter = QPainter(canvas)
+            total = 0
+            for index, source_id in enumerate(source_ids):
+                x, y = (index % columns) * tile_w, (index // columns) * tile_h
+                result = results[source_id]
+                if result is not None:
+                    q_image = result[1]
+                    painter.drawImage(x + (tile_w - q_image.width()) // 2, y + (tile_h - q_image.height()) // 2, q_image)
+                    self.multi_displayed[source_id] = result[0]
+                stats = manager.get_source_stats(source_id)
+                total += stats["count"]
+                text = f"{stats['name']} | {stats['detection_fps']:.1f} FPS | {stats['count']} Objekte"
+                painter.fillRect(x + 4, y + 4, painter.fontMetrics().horizontalAdvance(text) + 8, painter.fontMetrics().height() + 4, QColor(0, 0, 0, 160))
+                painter.setPen(QColor(255, 255, 255))
+                painter.drawText(x + 8, y + 6 + painter.fontMetrics().ascent(), text)
+            painter.end()
+            self.image_display.setPixmap(canvas)
+        self.num_objects = total
+        self.object_count_label.setText(f"<a style=\"text-decoration:none;\" href=\"http://www.easteregg.com\"> {self.num_objects} </a>")
+        self.profiler.mark_frame()
+        self.update_hud()
+        return True
+
+
     # Erstellt einen Screenshot des aktuellen Frames.
     def save_screenshot(self):
         """
@@ -734,20 +1498,98 @@ class App(QMainWindow):
         """
         try:
             self.status.showMessage("Screenshot wird gespeichert...")
+            if self.current_frame is None:
+                return
+
+            # Screenshot-Frame erst jetzt erstellen: Kopie des Frames mit Rechtecken
+            with self.profiler.stage("screenshot_frame"):
+                screenshot = self.current_frame.copy()
+                self.draw_detections(screenshot, self.current_detections)
             
-            if self.file_manager.save_screenshot(self.current_frame): # Aufruf der Methode zum Speichern eines Screenshots aus dem FileManager
-                self.status.showMessage("Screenshot erfolgreich gespeichert.")
+            if self.screenshot_directory is not None: # Automatisch speichern, ohne Dialog
+                file_path = self.file_manager.make_auto_save_path(self.screenshot_directory)
             else:
+                file_path = self.file_manager.choose_screenshot_path() # Aufruf der Methode zur Auswahl des Speicherorts aus dem FileManager
+            if not file_path:
+                self.status.showMessage("Speichern abgebrochen.")
+                return
+            # Kodieren und Schreiben im Encoder-Thread, das Ergebnis kommt über das Signal screenshot_saved
+            if not self.screenshot_encoder.save(screenshot, file_path, self.screenshot_saved.emit):
                 self.status.showMessage("Fehler: Screenshot konnte nicht gespeichert werden.")
         except Exception as e: # Fehlerbehandlung
             print(f"Fehler beim Speichern des Screenshots: {str(e)}") # Debug-Ausgabe in Konsole
             
         
+    # Zeigt das Ergebnis eines Screenshots in der Statusleiste an.
+    def on_screenshot_saved(self, success, file_path):
+        """
+        Zeigt das Ergebnis eines Screenshots in der Statusleiste an (im GUI-Thread).
+
+        Parameter: success (bool): True, wenn der Screenshot gespeichert wurde.
+                   file_path (str): Pfad des Screenshots.
+        """
+        if success:
+            self.status.showMessage(f"Screenshot erfolgreich gespeichert: {file_path}")
+        else:
+            self.status.showMessage("Fehler: Screenshot konnte nicht gespeichert werden.")
+
+
+    # Schaltet das automatische Speichern von Screenshots ein oder aus.
+    def toggle_auto_save(self, checked):
+        """
+        Schaltet das automatische Speichern von Screenshots in ein Verzeichnis (ohne Dialog) ein oder aus.
+
+        Parameter: checked (bool): True = automatisch speichern.
+        """
+        try:
+            if checked:
+                directory = self.file_manager.open_directory("Verzeichnis für Screenshots auswählen")
+                if not directory:
+                    self.auto_save_action.setChecked(False)
+                    return
+                self.screenshot_directory = directory
+                self.status.showMessage(f"Screenshots werden automatisch gespeichert in: {directory}")
+            else:
+                self.screenshot_directory = None
+                self.status.showMessage("Automatisches Speichern deaktiviert.")
+        except Exception as e:
+            print(f"Fehler beim Umschalten des automatischen Speicherns: {str(e)}") # Debug-Ausgabe in Konsole
+
+
+    # Startet oder beendet die Aufnahme des annotierten Videostroms.
+    def toggle_recording(self, checked):
+        """
+        Startet oder beendet die Aufnahme des annotierten Videostroms (Live- und Video-Modus) in eine Videodatei.
+
+        Parameter: checked (bool): True = Aufnahme starten.
+        """
+        try:
+            if checked:
+                file_path = self.file_manager.save_file_dialog("Aufnahme speichern", ".mp4",
+                                                               [("MP4-Videos", "*.mp4"), ("AVI-Videos", "*.avi"), ("Alle Dateien", "*.*")])
+                if not file_path:
+                    self.record_action.setChecked(False)
+                    return
+                fps = 25.0
+                if self.camera_manager.source == "video":
+                    fps = self.camera_manager.video_fps
+                elif self.camera_manager.cap is not None and self.camera_manager.cap.isOpened():
+                    fps = self.camera_manager.cap.get(cv2.CAP_PROP_FPS) or fps
+                self.video_recorder.start(file_path, fps)
+                self.status.showMessage(f"Aufnahme gestartet: {file_path}")
+            else:
+                self.video_recorder.stop()
+                self.status.showMessage(f"Aufnahme beendet ({self.video_recorder.written} Frames, {self.video_recorder.dropped} verworfen).")
+        except Exception as e:
+            print(f"Fehler beim Umschalten der Aufnahme: {str(e)}") # Debug-Ausgabe in Konsole
+
+
     # Aktualisiert den scaleFactor des Klassifizierers basierend auf dem Slider-Wert.
     def update_scaleFactor(self, value):
         try:
             self.classifier_manager.update_scaleFactor(value/10)
             self.label_custom_scaleFactor.setText(f"scaleFactor: {value/10}")
+            self.frame_scheduler.wake("frame")
         except Exception as e:
             print(f"Fehler beim Aktualisieren von scaleFactor: {str(e)}") # Debug-Ausgabe in Konsole    
             
@@ -757,6 +1599,7 @@ class App(QMainWindow):
         try:
             self.classifier_manager.update_minNeighbors(value)
             self.label_custom_minNeighbors.setText(f"minNeighbors: {value}")
+            self.frame_scheduler.wake("frame")
         except Exception as e: # Fehlerbehandlung
             print(f"Fehler beim Aktualisieren von minNeighbors: {str(e)}") # Debug-Ausgabe in Konsole
             
@@ -766,86 +1609,270 @@ class App(QMainWindow):
         try:
             self.classifier_manager.update_minSize(value)
             self.label_custom_minSize.setText(f"minSize: {value}")
+            self.frame_scheduler.wake("frame")
         except Exception as e: # Fehlerbehandlung
             print(f"Fehler beim Aktualisieren von minSize: {str(e)}") # Debug-Ausgabe in Konsole    
             
 
+    # Führt die Objekterkennung in einem Worker-Thread des Detection-Pools aus.
+    def detect_objects(self, frame, classifier_id, use_tracker=True, sequence=None, gate_mode=None, regions=None):
+        """
+        Führt die Objekterkennung in einem Worker-Thread des Detection-Pools aus.
+
+        Parameter: frame (np.ndarray): Frame im BGR-Format.
+                   classifier_id (str): ID des Klassifizierers oder "multi".
+                   use_tracker (bool): False = Tracking-Modus nicht verwenden (z. B. bei mehreren Quellen).
+                   sequence (int): Fortlaufende Nummer des Auftrags (Ergebnisse älterer Aufträge überschreiben keine neueren).
+                   gate_mode (str): "full" oder "partial", wenn der Bewegungsfilter den Frame in update_frame freigegeben hat.
+                   regions (list): Zu durchsuchende Bereiche bei gate_mode "partial".
+        Rückgabe: Dictionary {classifier_id: erkannte Objekte} oder None, falls das Ergebnis überholt ist.
+        """
+        is_adaptive = self.is_adaptive_resolution
+        scale = self.resolution_controller.get_scale() if is_adaptive else 1.0 # Verkleinerung für die Erkennung
+        start = time.perf_counter()
+        if gate_mode is not None: # Auftrag des Bewegungsfilters: nur geänderte Bereiche bzw. ganzes Bild durchsuchen
+            detect = None
+            if self.is_tracking and use_tracker: # Vollständige Erkennung über den Tracker
+                detect = lambda frame, classifier_id, scale: self.object_tracker.update(frame, classifier_id, scale, sequence)
+            detections = self.motion_gate.detect(frame, classifier_id, sequence, gate_mode, regions, scale, detect)
+            is_adaptive = is_adaptive and gate_mode == "full" # Nur vollständige Erkennungen sind für den Regler aussagekräftig
+        elif self.is_tracking and use_tracker:
+            detections = self.object_tracker.update(frame, classifier_id, scale, sequence) # Vollständige Erkennung nur in Keyframes
+        else:
+            detections = self.classifier_manager.detect_objects(frame, classifier_id, scale) # Klassifizierer-Instanz wird aus der Registry ausgeliehen
+        end = time.perf_counter()
+        self.profiler.record("detect", start, end) # Messung im Worker-Thread
+        if is_adaptive:
+            self.resolution_controller.update(end - start, scale) # Skalierung an gemessene Zeit anpassen
+        return detections
+
+
+    # Liefert die Farbe (BGR) für die Rechtecke eines Klassifizierers.
+    def get_detection_color(self, classifier_id, detections):
+        """
+        Liefert die Farbe (BGR) für die Rechtecke eines Klassifizierers.
+        Im Mehrfach-Modus erhält jeder Klassifizierer eine eigene Farbe, sonst wird grün gezeichnet.
+        """
+        if len(detections) > 1:
+            return self.classifier_manager.classifier_colors.get(classifier_id, (0, 255, 0))
+        return (0, 255, 0)
+
+
+    # Zeichnet die erkannten Objekte als Rechtecke in einen Frame.
+    def draw_detections(self, frame, detections):
+        """
+        Zeichnet die erkannten Objekte als Rechtecke in einen Frame (BGR), z. B. für Screenshots.
+
+        Parameter: frame (np.ndarray): Frame im BGR-Format, in den gezeichnet wird.
+                   detections (dict): Dictionary {classifier_id: Boxen}.
+        Rückgabe: Anzahl der gezeichneten Objekte.
+        """
+        count = 0
+        for classifier_id, objects in detections.items():
+            if objects is None:
+                continue
+            color = self.get_detection_color(classifier_id, detections)
+            for (x, y, w, h) in objects:
+                cv2.rectangle(frame, (int(x), int(y)), (int(x + w), int(y + h)), color, 2) # Zeichne Rechteck um Objekt
+                count += 1
+        return count
+
+
+    # Zeichnet die erkannten Objekte als Overlay auf eine (skalierte) Pixmap.
+    def draw_overlay(self, pixmap, detections, scale):
+        """
+        Zeichnet die erkannten Objekte mit QPainter als Overlay auf eine (skalierte) Pixmap.
+        Die Pixeldaten des Frames bleiben unverändert.
+
+        Parameter: pixmap (QPixmap): Pixmap in Anzeigegröße.
+                   detections (dict): Dictionary {classifier_id: Boxen} in Frame-Koordinaten.
+                   scale (float): Verhältnis Anzeigegröße / Framegröße.
+        Rückgabe: Anzahl der gezeichneten Objekte.
+        """
+        count = 0
+        painter = QPainter(pixmap)
+        for classifier_id, objects in detections.items():
+            if objects is None:
+                continue
+            b, g, r = self.get_detection_color(classifier_id, detections)
+            painter.setPen(QPen(QColor(r, g, b), 2))
+            for (x, y, w, h) in objects:
+                painter.drawRect(int(x * scale), int(y * scale), int(w * scale), int(h * scale))
+                count += 1
+        painter.end()
+        return count
+
+
+    # Berechnet die Anzeigegröße eines Frames unter Beibehaltung des Seitenverhältnisses.
+    def fit_to_display(self, width, height):
+        """
+        Berechnet die Anzeigegröße eines Frames unter Beibehaltung des Seitenverhältnisses.
+
+        Parameter: width (int), height (int): Größe des Frames.
+        Rückgabe: Tupel (Breite, Höhe) in der Anzeige.
+        """
+        i_h = self.image_display.height() # Höhe des QLabel(image_display)
+        w_asp = int(i_h * (width/height)) # Berechne Breite des Bildes basierend auf Höhe und Seitenverhältnis
+        if(w_asp <= self.image_display.width()): 
+            i_w = w_asp 
+        else:
+            i_w = self.image_display.width()
+            i_h = int(i_w * height/width)
+        return i_w, i_h
+
+
+    # Zeigt eine Pixmap in Anzeigegröße mit den erkannten Objekten als Overlay an.
+    def show_pixmap(self, pixmap, detections):
+        """
+        Skaliert eine Pixmap auf die Anzeigegröße, zeichnet die erkannten Objekte als Overlay und zeigt sie an.
+
+        Parameter: pixmap (QPixmap): Pixmap in Framegröße.
+                   detections (dict): Dictionary {classifier_id: Boxen} in Frame-Koordinaten.
+        Rückgabe: Anzahl der erkannten Objekte.
+        """
+        with self.profiler.stage("scale"):
+            i_w, i_h = self.fit_to_display(pixmap.width(), pixmap.height())
+            scaled_pixmap = pixmap.scaled(i_w,i_h) 
+        with self.profiler.stage("draw"):
+            count = self.draw_overlay(scaled_pixmap, detections, i_w / pixmap.width()) # Rechtecke nur in Anzeigegröße zeichnen
+        with self.profiler.stage("display"):
+            self.image_display.setPixmap(scaled_pixmap) # Setze Pixmap in QLabel(image_display)
+        return count
+
+
+    # Beendet Kamera und Worker-Threads beim Schließen des Fensters.
+    def closeEvent(self, event):
+        """
+        Beendet Kamera und Worker-Threads beim Schließen des Fensters.
+        """
+        try:
+            self.camera_manager.stop_camera()
+            self.detection_pool.shutdown()
+            self.display_compositor.shutdown()
+            if self.detection_log is not None:
+                self.detection_log.close()
+            self.video_recorder.stop()
+            self.screenshot_encoder.shutdown()
+            if self.multi_source_manager is not None:
+                self.multi_source_manager.stop_all()
+            for compositor in self.multi_compositors.values():
+                compositor.shutdown()
+        except Exception as e:
+            print(f"Fehler beim Beenden der Anwendung: {str(e)}") # Debug-Ausgabe in Konsole
+        super().closeEvent(event)
+
+
     # Holt ein Frame von der Kamera und zeigt es in der GUI an. 
     def update_frame(self):
         """
-        Lädt den aktuellen Frame, auf grundlage das Aktuellen Modus(live/file) und erkennt Objekte und zeigt Sie in der GUI an.
+        Lädt den aktuellen Frame, auf grundlage das Aktuellen Modus(live/file/video) und erkennt Objekte und zeigt Sie in der GUI an.
+        Frames bleiben im BGR-Format der Kamera, die Rechtecke werden nur als Overlay in Anzeigegröße gezeichnet.
+        Rückgabe: False, wenn es nichts zu tun gab (kein neuer Frame bzw. statisches Bild unverändert).
         """
         try:
-            if self.mode_selector.currentText() == "live": # Abfrage des aktuellen Modus, wenn Modus "live", dann
-                frame, ret = self.camera_manager.get_frame() # Frame von Kamera holen mit Aufruf aus CameraManager
-                if not ret: # Wenn Kamera keine Frames mehr liefert/disconnected, stoppe Kamera und aktualisiere Kamera-Liste
+            mode = self.mode_selector.currentText()
+            if mode == "multi": # Abfrage des aktuellen Modus, wenn Modus "multi", dann Kachelansicht aller Quellen
+                if self.multi_source_manager is not None:
+                    return self.update_multi_frame()
+                return False
+            if mode in ("live", "video"): # Abfrage des aktuellen Modus, wenn Modus "live" oder "video", dann
+                # Analyse so schnell wie möglich: nächsten Video-Frame erst holen, wenn die Erkennung ihn annimmt (kein Frame wird verworfen)
+                if mode == "video" and not self.is_video_realtime and (not self.detection_pool.has_capacity()
+                                                                       or (self.is_motion_gate and self.motion_gate.is_full_pending())):
+                    frame, sequence = None, 0
+                else:
+                    with self.profiler.stage("capture"):
+                        frame, timestamp, sequence = self.camera_manager.get_latest_frame() # Neuesten Frame aus dem Aufnahme-Thread holen (blockiert nicht)
+                if not self.camera_manager.is_capturing():
+                    if mode == "video": # Video vollständig abgespielt
+                        self.btn_load_image.setChecked(False)
+                        self.stop_video()
+                        self.status.showMessage("Video beendet.")
+                        return
+                    # Wenn Kamera keine Frames mehr liefert/disconnected, stoppe Kamera und aktualisiere Kamera-Liste
                     self.stop_camera()
                     self.refresh_camera_list()
                     self.btn_start_camera.setChecked(False)
                     return  
+                if frame is not None and sequence != self.last_frame_sequence: # Neuer Frame vorhanden
+                    self.last_frame_sequence = sequence
+                    self.frame_scheduler.observe_source("frame") # Takt folgt der Bildrate der Quelle
                 
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) # OpenCV (standard) BGR, Umwandlung in RGB
-                self.current_frame = frame
-
-                # Objekterkennung
-                objects = self.classifier_manager.detect_faces(frame, self.classifier_manager.current_classifier) # Aufruf der Methode zur Objekterkennung aus dem ClassifierManager
-                self.num_objects = len(objects) # Anzahl der erkannten Objekte
+                    # Objekterkennung asynchron im Detection-Pool (Frame wird verworfen, falls alle Worker ausgelastet sind)
+                    with self.profiler.stage("submit"):
+                        classifier_id = self.classifier_manager.current_classifier
+                        context = None
+                        if self.detection_log is not None: # Aufnahmezeitpunkt und Parameter gehören zum Frame, nicht zum Ende der Erkennung
+                            context = {"timestamp": self.camera_manager.get_capture_time(timestamp),
+                                       "parameters": self.get_log_parameters(classifier_id)}
+                        self.detection_sequence += 1 # Auftragsnummer (Lücken durch verworfene Frames sind unkritisch)
+                        if not self.is_motion_gate:
+                            self.detection_pool.submit(frame, sequence, classifier_id, True, self.detection_sequence, context=context)
+                        elif self.detection_pool.has_capacity(): # Sonst rückte das Referenzbild ohne Erkennung vor
+                            # Bewegungsfilter in Frame-Reihenfolge vor dem Pool; unveränderte Frames erreichen den Pool nicht
+                            gate_mode, regions = self.motion_gate.update(frame, classifier_id, self.detection_sequence)
+                            if gate_mode != "skipped":
+                                self.detection_pool.submit(frame, sequence, classifier_id, True, self.detection_sequence,
+                                                           gate_mode, regions, context=context)
+                        result = self.detection_pool.get_latest_result() # Neuestes vorliegendes Ergebnis (kann einige Frames alt sein)
+                    if result is not None:
+                        self.live_objects = result[1]
+
+                    # Frame und Objekte für Screenshots merken (der Screenshot-Frame wird erst beim Speichern erstellt)
+                    self.current_frame = frame
+                    self.current_detections = self.live_objects
+
+                    if self.video_recorder.recording: # Aufnahme (Einzeichnen und Kodieren im Recorder-Thread)
+                        self.video_recorder.write(frame, self.live_objects)
+
+                    # Skalieren und Einzeichnen übernimmt der Compositor-Thread (Anzeigegröße wird hier im GUI-Thread gelesen)
+                    self.display_compositor.submit(frame, self.live_objects, sequence,
+                                                   (self.image_display.width(), self.image_display.height()))
+
+                composed = self.display_compositor.get_latest_result() # Neuestes anzeigefertiges Bild (in der Regel vom vorherigen Tick)
+                if composed is None or composed[0] == self.last_display_sequence:
+                    return False
+                self.last_display_sequence, q_image, self.num_objects, buffer = composed
+                with self.profiler.stage("qpixmap"):
+                    pixmap = QPixmap.fromImage(q_image) # Bild hat bereits Anzeigegröße
+                with self.profiler.stage("display"):
+                    self.image_display.setPixmap(pixmap) # Setze Pixmap in QLabel(image_display)
                 self.object_count_label.setText(f"<a style=\"text-decoration:none;\" href=\"http://www.easteregg.com\"> {self.num_objects} </a>")
-                    
-                # Zeichne grüne Rechtecke um erkannte Gesichter
-                for (x, y, w, h) in objects:
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2) # Zeichne grünes Rechteck um Objekt
-                
-                # Anzeige des Frames im Anzeigebereich
-                height, width, channel = frame.shape # Größe des Frames
-                aspect_ratio = height/width # Seitenverhältnis
-                bytes_per_line = 3 * width  # 3 Kanäle pro Pixel (RGB)
-
-                q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888) # Erstelle QImage aus Frame 
-                pixmap = QPixmap.fromImage(q_image) # Erstelle Pixmap aus QImage
-
-                # Logik für das Skalieren des Bildes
-                i_h = self.image_display.height() # Höhe des QLabel(image_display)
-                w_asp = int(i_h * (width/height)) # Berechne Breite des Bildes basierend auf Höhe und Seitenverhältnis
-                if(w_asp <= self.image_display.width()): 
-                    i_w = w_asp 
-                else:
-                    i_w = self.image_display.width()
-                    i_h = int(i_w * aspect_ratio)
-                scaled_pixmap = pixmap.scaled(i_w,i_h) 
-                self.image_display.setPixmap(scaled_pixmap) # Setze Pixmap in QLabel(image_display)
+                self.profiler.mark_frame()
+                self.update_hud()
                 
-            elif self.mode_selector.currentText() == "file": # Abfrage des aktuellen Modus, wenn Modus "live", dann
+            elif mode == "file": # Abfrage des aktuellen Modus, wenn Modus "file", dann
                 
                 frame = self.static_image 
+                classifier_id = self.classifier_manager.current_classifier
+                classifier_key = self.classifier_manager.get_classifier_key(classifier_id)
+                render_key = (self.static_image_key, classifier_key, self.image_display.width(), self.image_display.height())
+                if render_key == self.static_render_key: # Bild, Klassifizierer, Parameter und Anzeigegröße unverändert
+                    return False # Scheduler lässt die Aufgabe bis zur nächsten Änderung ruhen
+
+                # Objekterkennung (Ergebnis wird im ClassifierManager zwischengespeichert); fehlt es, läuft sie im Hintergrund
+                detection_key = (self.static_image_key,) + classifier_key
+                objects = self.classifier_manager.detect_objects_cached(frame, classifier_id, self.static_image_key, cached_only=True)
+                if objects is None and self.static_detection_result is not None and self.static_detection_result[0] == detection_key:
+                    objects = self.static_detection_result[1] # Fehlgeschlagene Erkennung (nicht im Cache) nicht wiederholen
+                pending = objects is None
+                if pending:
+                    self.start_static_detection(frame, classifier_id, detection_key)
+                    objects = self.static_objects # Bisherige Rechtecke bleiben bis zum Ergebnis sichtbar
+                self.static_objects = objects
                 self.current_frame = frame
+                self.current_detections = objects
+
+                if self.static_pixmap is None:
+                    height, width, channel = frame.shape # Größe des Frames
+                    with self.profiler.stage("qpixmap"):
+                        q_image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_BGR888) # Erstelle QImage aus Frame 
+                        self.static_pixmap = QPixmap.fromImage(q_image) # Pixmap (ohne Rechtecke) für weitere Aktualisierungen zwischenspeichern
 
-                # Objekterkennung
-                objects = self.classifier_manager.detect_faces(frame, self.classifier_manager.current_classifier)
-                self.num_objects = len(objects) # Anzahl der erkannten Objekte
+                self.num_objects = self.show_pixmap(self.static_pixmap, objects) # Anzahl der erkannten Objekte
                 self.object_count_label.setText(f"<a style=\"text-decoration:none;\" href=\"http://www.easteregg.com\"> {self.num_objects} </a>")
-                    
-                # Zeichne grüne Rechtecke um erkannte Gesichter
-                for (x, y, w, h) in objects:
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2) # Zeichne grünes Rechteck um Objekt
-
-                height, width, channel = frame.shape # Größe des Frames
-                aspect_ratio = height/width # Seitenverhältnis
-                bytes_per_line = 3 * width  # 3 Kanäle pro Pixel (RGB)
-
-                q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888) # Erstelle QImage aus Frame 
-                pixmap = QPixmap.fromImage(q_image) # Erstelle Pixmap aus QImage
-
-                # Logik für das Skalieren des Bildes
-                i_h = self.image_display.height() # Höhe des QLabel(image_display)
-                w_asp = int(i_h * (width/height)) # Berechne Breite des Bildes basierend auf Höhe und Seitenverhältnis
-                if(w_asp <= self.image_display.width()): 
-                    i_w = w_asp 
-                else:
-                    i_w = self.image_display.width()
-                    i_h = int(i_w * aspect_ratio)
-                scaled_pixmap = pixmap.scaled(i_w,i_h) 
-                self.image_display.setPixmap(scaled_pixmap) # Setze Pixmap in QLabel(image_display)         
+                if not pending:
+                    self.static_render_key = render_key
                 
 
             # Screenshot-Button aktivieren, wenn Frame vorhanden
@@ -853,10 +1880,8 @@ class App(QMainWindow):
                 self.btn_screenshot.setEnabled(True)
             else:
                 self.btn_screenshot.setEnabled(False)
-            self.current_frame = cv2.cvtColor(self.current_frame, cv2.COLOR_RGB2BGR) # OpenCV (standard) BGR, Umwandlung in RGB
-            # Zeichne grüne Rechtecke um erkannte Gesichter
-            for (x, y, w, h) in objects:
-                cv2.rectangle(self.current_frame, (x, y), (x + w, y + h), (0, 255, 0), 2) # Zeichne grünes Rechteck um Objekt
+            if mode == "file" and pending:
+                return False # Ruht bis zum Ergebnis (on_static_detection_finished weckt die Aufgabe)
         except Exception as e: # Fehlerbehandlung
             print(f"Fehler beim Aktualisieren des Frames: {str(e)}") # Debug-Ausgabe in Konsole
             
@@ -0,0 +1,324 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import cv2
+from batchdetect import create_classifier_manager
+from classifiermanager import PRESETS_FILE
+
+# Automatische Wahl von scaleFactor, minNeighbors und minSize anhand eines kleinen gelabelten Bildsatzes.
+# Alle Parameterkombinationen werden parallel (ein Prozess je Kern) auf den Bildern gemessen: Qualität
+# (Precision, Recall, F1 gegen die Label-Boxen) und Latenz je Bild. Ausgegeben werden die Pareto-Front
+# (Qualität gegen Latenz) und die schnellste Kombination, die das Recall-Ziel erreicht.
+#
+# Labels als JSON ({"bild.jpg": [[x, y, w, h], ...]} oder [{"image": "bild.jpg", "boxes": [[x, y, w, h], ...]}, ...])
+# oder CSV (Zeilen "bild.jpg,x,y,w,h", Bilder ohne Objekte als "bild.jpg,,,,"). Bildpfade relativ zur Label-Datei.
+#
+# Beispiele:
+#   python autotune.py labels.json --classifier face
+#   python autotune.py labels.csv --classifier eye --recall 0.85 --save-preset
+#   python autotune.py labels.json --scale-factors 1.05 1.1 1.2 --min-neighbors 3 5 --min-sizes 24 30 --output tuning.json
+
+SCALE_FACTORS = [1.05, 1.1, 1.15, 1.2, 1.3]
+MIN_NEIGHBORS = [1, 2, 3, 4, 5, 6, 8]
+MIN_SIZES = [20, 30, 40, 60]
+
+# Zustand je Worker-Prozess (wird im Initializer gesetzt)
+worker_classifier_manager = None
+worker_classifier_id = None
+worker_images = None # Liste von Tupeln (Graustufenbild, Label-Boxen)
+worker_repeats = 1
+
+
+# Liest die Label-Datei.
+def load_labels(label_path):
+    """
+    Liest die Label-Datei (JSON oder CSV).
+    :param label_path: Pfad zur Label-Datei.
+    :return: Dictionary {Bildpfad: Liste der Boxen (x, y, w, h)}.
+    """
+    base_dir = os.path.dirname(os.path.abspath(label_path))
+    labels = {}
+    if label_path.lower().endswith(".csv"):
+        with open(label_path, newline="", encoding="utf-8") as file:
+            for row in csv.reader(file):
+                if not row or row[0].strip().lower() in ("image", "bild", "path"): # Kopfzeile
+                    continue
+                boxes = labels.setdefault(row[0].strip(), [])
+                values = [v.strip() for v in row[1:5]]
+                if len(values) == 4 and all(values):
+                    boxes.append(tuple(int(float(v)) for v in values))
+    else:
+        with open(label_path, encoding="utf-8") as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            data = [{"image": image, "boxes": boxes} for image, boxes in data.items()]
+        for entry in data:
+            labels[entry["image"]] = [tuple(int(v) for v in box) for box in entry.get("boxes", [])]
+    return {os.path.join(base_dir, image): boxes for image, boxes in labels.items()}
+
+
+# Berechnet die Überlappung (Intersection over Union) zweier Boxen.
+def iou(a, b):
+    """
+    Berechnet die Überlappung (Intersection over Union) zweier Boxen (x, y, w, h).
+    :return: Wert zwischen 0 und 1.
+    """
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    intersection = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a[2] * a[3] + b[2] * b[3] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+# Ordnet erkannte Boxen den Label-Boxen zu.
+def match_boxes(detected, truth, threshold=0.5):
+    """
+    Ordnet erkannte Boxen den Label-Boxen zu (gierig nach absteigender Überlappung, jede Box höchstens einmal).
+    :param detected: Liste der erkannten Boxen.
+    :param truth: Liste der Label-Boxen.
+    :param threshold: Mindest-IoU für einen Treffer.
+    :return: Tupel (richtig positiv, falsch positiv, falsch negativ).
+    """
+    pairs = sorted(((iou(d, t), i, j) for i, d in enumerate(detected) for j, t in enumerate(truth)), reverse=True)
+    used_detected, used_truth = set(), set()
+    for overlap, i, j in pairs:
+        if overlap < threshold:
+            break
+        if i not in used_detected and j not in used_truth:
+            used_detected.add(i)
+            used_truth.add(j)
+    tp = len(used_truth)
+    return tp, len(detected) - tp, len(truth) - tp
+
+
+# Liest die gelabelten Bilder ein.
+def load_images(labels):
+    """
+    Liest die gelabelten Bilder in Graustufen ein.
+    :param labels: Dictionary {Bildpfad: Liste der Boxen} aus load_labels().
+    :return: Tupel (Liste von Tupeln (Graustufenbild, Label-Boxen), Liste der nicht lesbaren Bildpfade).
+    """
+    images, missing = [], []
+    for path, boxes in labels.items():
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            missing.append(path)
+        else:
+            images.append((image, boxes))
+    return images, missing
+
+
+# Initialisiert einen Worker-Prozess.
+def init_worker(classifier, images, repeats):
+    """
+    Initialisiert einen Worker-Prozess: Klassifizierer laden und die vorab eingelesenen Bilder übernehmen.
+    Jeder Prozess nutzt nur einen OpenCV-Thread, damit die Latenzen der parallel gemessenen Kombinationen vergleichbar sind.
+    """
+    global worker_classifier_manager, worker_classifier_id, worker_images, worker_repeats
+    sys.stdout = open(os.devnull, "w") # Statusausgaben der Manager unterdrücken
+    cv2.setNumThreads(1)
+    worker_classifier_manager, worker_classifier_id = create_classifier_manager(classifier)
+    worker_images = images
+    worker_repeats = max(1, repeats)
+
+
+# Misst eine Parameterkombination auf allen Bildern.
+def evaluate(params):
+    """
+    Misst eine Parameterkombination auf allen Bildern (im Worker-Prozess).
+    :param params: Tupel (scaleFactor, minNeighbors, minSize).
+    :return: Dictionary mit Parametern, Qualität und Latenz.
+    """
+    scale_factor, min_neighbors, min_size = params
+    classifier_info = worker_classifier_manager.classifiers[worker_classifier_id]
+    classifier_info.update({"scaleFactor": scale_factor, "minNeighbors": min_neighbors, "minSize": (min_size, min_size)})
+    cascade_path = worker_classifier_manager.get_classifier_path(worker_classifier_id)
+
+    tp = fp = fn = 0
+    times = []
+    for gray, truth in worker_images:
+        best = None
+        for _ in range(worker_repeats): # Minimum mehrerer Durchläufe ist robuster gegen Störungen
+            start = time.perf_counter()
+            objects = worker_classifier_manager.detect_gray(gray, worker_classifier_id, cascade_path)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best)
+        detected = [tuple(int(v) for v in box) for box in objects] if objects is not None else []
+        counts = match_boxes(detected, truth)
+        tp, fp, fn = tp + counts[0], fp + counts[1], fn + counts[2]
+
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    times.sort()
+    return {
+        "scaleFactor": scale_factor,
+        "minNeighbors": min_neighbors,
+        "minSize": [min_size, min_size],
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "tp": tp, "fp": fp, "fn": fn,
+        "mean_ms": round(sum(times) / len(times), 3),
+        "p95_ms": round(times[int(0.95 * (len(times) - 1))], 3)
+    }
+
+
+# Berechnet die Pareto-Front aus Qualität und Latenz.
+def pareto_frontier(results, quality="f1"):
+    """
+    Berechnet die Pareto-Front: Kombinationen, zu denen es keine andere gibt, die mindestens genauso gut
+    und mindestens genauso schnell und in einem der beiden Punkte besser ist.
+    :param results: Ergebnisse aus evaluate().
+    :param quality: Kennzahl für die Qualität ("f1", "recall" oder "precision").
+    :return: Liste der Ergebnisse auf der Front, aufsteigend nach Latenz.
+    """
+    frontier = []
+    best_quality = -1.0
+    for result in sorted(results, key=lambda r: (r["mean_ms"], -r[quality])):
+        if result[quality] > best_quality: # Schneller als alle besseren, besser als alle schnelleren
+            frontier.append(result)
+            best_quality = result[quality]
+    return frontier
+
+
+# Wählt die schnellste Kombination, die das Recall-Ziel erreicht.
+def fastest_meeting_recall(results, recall_target):
+    """
+    Wählt die schnellste Kombination, die das Recall-Ziel erreicht (bei gleicher Latenz die mit höherer Precision).
+    :param results: Ergebnisse aus evaluate().
+    :param recall_target: Mindest-Recall (z. B. 0.9).
+    :return: Ergebnis oder None, falls keine Kombination das Ziel erreicht.
+    """
+    candidates = [r for r in results if r["recall"] >= recall_target]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: (r["mean_ms"], -r["precision"]))
+
+
+# Speichert eine Kombination als Preset.
+def save_preset(classifier_id, result, presets_path=PRESETS_FILE):
+    """
+    Speichert eine Kombination als Preset eines Klassifizierers (wird vom ClassifierManager beim Start geladen).
+    :param classifier_id: ID des Klassifizierers.
+    :param result: Ergebnis aus evaluate().
+    :param presets_path: Pfad der Preset-Datei.
+    """
+    presets = {}
+    if os.path.exists(presets_path):
+        with open(presets_path, encoding="utf-8") as file:
+            presets = json.load(file)
+    presets[classifier_id] = {key: result[key] for key in ("scaleFactor", "minNeighbors", "minSize")}
+    with open(presets_path, "w", encoding="utf-8") as file:
+        json.dump(presets, file, indent=2)
+
+
+# Führt die Parametersuche aus.
+def run_autotune(label_path, classifier="face", scale_factors=None, min_neighbors=None, min_sizes=None,
+                 repeats=1, workers=None, quality="f1", recall_target=0.9):
+    """
+    Führt die Parametersuche aus: alle Kombinationen parallel messen, Pareto-Front und Empfehlung berechnen.
+    Nicht lesbare Bilder werden samt ihrer Label-Boxen übersprungen und gemeldet.
+    :return: Dictionary mit Metadaten, allen Ergebnissen, Pareto-Front und Empfehlung (JSON-serialisierbar).
+    :raises ValueError: Wenn keines der Bilder gelesen werden kann.
+    """
+    labels = load_labels(label_path)
+    images, missing = load_images(labels)
+    for path in missing:
+        print(f"Bild kann nicht gelesen werden und wird übersprungen: {path}", file=sys.stderr)
+    if not images:
+        raise ValueError(f"Keines der {len(labels)} Bilder aus '{label_path}' kann gelesen werden")
+    with contextlib.redirect_stdout(sys.stderr):
+        create_classifier_manager(classifier) # Klassifizierer vorab prüfen (Fehler im Initializer würden Worker endlos neu starten)
+    grid = list(itertools.product(scale_factors or SCALE_FACTORS, min_neighbors or MIN_NEIGHBORS, min_sizes or MIN_SIZES))
+    print(f"{len(grid)} Kombinationen auf {len(images)} Bildern", file=sys.stderr)
+
+    results = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes=workers, initializer=init_worker, initargs=(classifier, images, repeats)) as pool:
+        for result in pool.imap_unordered(evaluate, grid):
+            results.append(result)
+            print(f"scaleFactor {result['scaleFactor']:.2f}  minNeighbors {result['minNeighbors']:2d}  minSize {result['minSize'][0]:3d}  "
+                  f"P {result['precision']:.3f}  R {result['recall']:.3f}  F1 {result['f1']:.3f}  {result['mean_ms']:8.2f} ms", file=sys.stderr)
+    results.sort(key=lambda r: (r["scaleFactor"], r["minNeighbors"], r["minSize"][0]))
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "labels": os.path.abspath(label_path),
+            "images": len(images),
+            "missing_images": missing,
+            "classifier": classifier,
+            "opencv": cv2.__version__,
+            "cpu_count": os.cpu_count(),
+            "quality": quality,
+            "recall_target": recall_target,
+            "duration_s": round(time.perf_counter() - start, 1)
+        },
+        "results": results,
+        "pareto": pareto_frontier(results, quality),
+        "recommended": fastest_meeting_recall(results, recall_target)
+    }
+
+
+# Liest die Kommandozeilenparameter.
+def parse_args(argv=None):
+    """
+    Liest die Kommandozeilenparameter.
+    :param argv: Argumentliste (Standard: sys.argv).
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Automatische Wahl der Parameter eines Haar-Cascade Klassifizierers anhand gelabelter Bilder.")
+    parser.add_argument("labels", help="Label-Datei (.json oder .csv)")
+    parser.add_argument("--classifier", default="face", help="ID eines vordefinierten Klassifizierers (z. B. face, eye) oder Pfad zu einer XML-Datei")
+    parser.add_argument("--scale-factors", nargs="+", type=float, default=None, help=f"Werte für scaleFactor (Standard: {SCALE_FACTORS})")
+    parser.add_argument("--min-neighbors", nargs="+", type=int, default=None, help=f"Werte für minNeighbors (Standard: {MIN_NEIGHBORS})")
+    parser.add_argument("--min-sizes", nargs="+", type=int, default=None, help=f"Werte für minSize (quadratisch, Standard: {MIN_SIZES})")
+    parser.add_argument("--repeats", type=int, default=1, help="Durchläufe je Bild (Minimum zählt)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Anzahl der Worker-Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--quality", choices=["f1", "recall", "precision"], default="f1", help="Qualitätskennzahl der Pareto-Front")
+    parser.add_argument("--recall", type=float, default=0.9, help="Recall-Ziel für die Empfehlung")
+    parser.add_argument("--output", "-o", default=None, help="Ergebnisdatei (JSON), Standard: Standardausgabe")
+    parser.add_argument("--save-preset", action="store_true", help=f"Empfehlung als Preset speichern ({os.path.basename(PRESETS_FILE)})")
+    return parser.parse_args(argv)
+
+
+# Hauptprogramm
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        report = run_autotune(args.labels, args.classifier, args.scale_factors, args.min_neighbors, args.min_sizes,
+                              args.repeats, args.workers, args.quality, args.recall)
+    except ValueError as e: # Fehlerbehandlung
+        print(f"Fehler: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print("\nPareto-Front:", file=sys.stderr)
+    for result in report["pareto"]:
+        print(f"  {result['mean_ms']:8.2f} ms  {args.quality} {result[args.quality]:.3f}  scaleFactor {result['scaleFactor']}  "
+              f"minNeighbors {result['minNeighbors']}  minSize {result['minSize'][0]}", file=sys.stderr)
+    recommended = report["recommended"]
+    if recommended is None:
+        print(f"Keine Kombination erreicht Recall {args.recall}", file=sys.stderr)
+    else:
+        print(f"Empfehlung (schnellste mit Recall >= {args.recall}): scaleFactor {recommended['scaleFactor']}, "
+              f"minNeighbors {recommended['minNeighbors']}, minSize {recommended['minSize'][0]} "
+              f"({recommended['mean_ms']:.2f} ms, Recall {recommended['recall']:.3f}, Precision {recommended['precision']:.3f})", file=sys.stderr)
+        if args.save_preset:
+            classifier_id = "custom" if os.path.isfile(args.classifier) else args.classifier
+            save_preset(classifier_id, recommended)
+            print(f"Preset für '{classifier_id}' gespeichert: {PRESETS_FILE}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+        print(f"Ergebnisse gespeichert: {args.output}", file=sys.stderr)
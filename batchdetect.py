@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from classifiermanager import ClassifierManager
+from filemanager import FileManager
+
+# Headless Stapelverarbeitung: Objekterkennung über viele Bilder ohne GUI, verteilt auf mehrere Prozesse.
+#
+# Beispiele:
+#   python batchdetect.py archiv/ --classifier face --output ergebnisse.jsonl
+#   python batchdetect.py "archiv/**/*.jpg" --classifier meine_cascade.xml --min-neighbors 5 --output ergebnisse.csv
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+# Zustand je Worker-Prozess (wird im Initializer gesetzt)
+worker_classifier_manager = None
+worker_file_manager = None
+worker_classifier_id = None
+worker_scale = 1.0
+
+
+# Sammelt alle Bilddateien aus Verzeichnissen und Glob-Mustern.
+def collect_images(inputs, recursive=True):
+    """
+    Sammelt alle Bilddateien aus Verzeichnissen und Glob-Mustern.
+    :param inputs: Liste von Verzeichnissen, Dateien oder Glob-Mustern.
+    :param recursive: Wenn True, werden Verzeichnisse rekursiv durchsucht.
+    :return: Generator über Dateipfade.
+    """
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, dirs, files in os.walk(entry):
+                dirs.sort() # Reproduzierbare Reihenfolge
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        yield os.path.join(root, name)
+                if not recursive:
+                    break
+        elif os.path.isfile(entry):
+            yield entry
+        else:
+            for path in sorted(glob.iglob(entry, recursive=True)):
+                if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                    yield path
+
+
+# Konfiguriert einen ClassifierManager anhand der Kommandozeilenparameter.
+def create_classifier_manager(classifier, scale_factor=None, min_neighbors=None, min_size=None):
+    """
+    Konfiguriert einen ClassifierManager anhand der Kommandozeilenparameter.
+    :param classifier: ID eines vordefinierten Klassifizierers (z. B. "face") oder Pfad zu einer XML-Datei.
+    :param scale_factor: Überschreibt scaleFactor (optional).
+    :param min_neighbors: Überschreibt minNeighbors (optional).
+    :param min_size: Überschreibt minSize (optional, quadratisch).
+    :return: Tupel (ClassifierManager, classifier_id).
+    """
+    classifier_manager = ClassifierManager(preload=False)
+    if classifier in classifier_manager.classifiers and classifier != "custom":
+        classifier_id = classifier
+        classifier_manager.load_classifier(classifier_id)
+    elif os.path.isfile(classifier):
+        classifier_id = "custom"
+        classifier_manager.cascade_path = classifier
+        classifier_manager.current_classifier = classifier_id
+    else:
+        raise ValueError(f"Unbekannter Klassifizierer: '{classifier}'")
+
+    classifier_info = classifier_manager.classifiers[classifier_id]
+    if scale_factor is not None:
+        classifier_info["scaleFactor"] = scale_factor
+    if min_neighbors is not None:
+        classifier_info["minNeighbors"] = min_neighbors
+    if min_size is not None:
+        classifier_info["minSize"] = (min_size, min_size)
+    return classifier_manager, classifier_id
+
+
+# Initialisiert einen Worker-Prozess.
+def init_worker(classifier, scale_factor, min_neighbors, min_size, scale, quiet):
+    """
+    Initialisiert einen Worker-Prozess: Klassifizierer einmal je Prozess laden.
+    """
+    global worker_classifier_manager, worker_file_manager, worker_classifier_id, worker_scale
+    if quiet:
+        sys.stdout = open(os.devnull, "w") # Statusausgaben der Manager je Bild unterdrücken
+    worker_classifier_manager, worker_classifier_id = create_classifier_manager(classifier, scale_factor, min_neighbors, min_size)
+    worker_file_manager = FileManager()
+    worker_scale = scale
+
+
+# Verarbeitet ein einzelnes Bild im Worker-Prozess.
+def process_image(task):
+    """
+    Lädt ein Bild und erkennt Objekte darin.
+    :param task: Tupel (Index, Dateipfad).
+    :return: Dictionary mit Ergebnis und Zeiten.
+    """
+    index, path = task
+    result = {"index": index, "path": path, "width": None, "height": None, "count": 0, "objects": [],
+              "load_ms": None, "detect_ms": None, "error": None}
+    try:
+        start = time.perf_counter()
+        image = worker_file_manager.load_image(path)
+        result["load_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if image is None:
+            result["error"] = "Bild konnte nicht geladen werden"
+            return result
+        result["height"], result["width"] = image.shape[:2]
+
+        start = time.perf_counter()
+        objects = worker_classifier_manager.detect_faces(image, worker_classifier_id, scale=worker_scale)
+        result["detect_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if objects is None:
+            result["error"] = "Fehler bei der Objekterkennung"
+            return result
+        result["objects"] = [[int(v) for v in box] for box in objects]
+        result["count"] = len(result["objects"])
+    except Exception as e: # Fehlerbehandlung
+        result["error"] = str(e)
+    return result
+
+
+# Schreibt Ergebnisse zeilenweise als JSONL oder CSV.
+class ResultWriter:
+    """
+    Schreibt Ergebnisse zeilenweise als JSONL oder CSV.
+    """
+
+    # Öffnet die Ausgabe.
+    def __init__(self, output, output_format=None):
+        """
+        Öffnet die Ausgabe.
+        :param output: Dateipfad oder "-" für die Standardausgabe.
+        :param output_format: "jsonl" oder "csv" (Standard: anhand der Dateiendung).
+        """
+        if output_format is None:
+            output_format = "csv" if output.lower().endswith(".csv") else "jsonl"
+        self.output_format = output_format
+        self.file = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+        self.csv_writer = None
+        if output_format == "csv":
+            self.csv_writer = csv.writer(self.file)
+            self.csv_writer.writerow(["index", "path", "width", "height", "count", "objects", "load_ms", "detect_ms", "error"])
+
+
+    # Schreibt ein Ergebnis.
+    def write(self, result):
+        """
+        Schreibt ein Ergebnis.
+        :param result: Dictionary aus process_image().
+        """
+        if self.csv_writer is not None:
+            objects = ";".join(" ".join(str(v) for v in box) for box in result["objects"]) # "x y w h;x y w h"
+            self.csv_writer.writerow([result["index"], result["path"], result["width"], result["height"], result["count"],
+                                      objects, result["load_ms"], result["detect_ms"], result["error"] or ""])
+        else:
+            self.file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+    # Schließt die Ausgabe.
+    def close(self):
+        """
+        Schließt die Ausgabe.
+        """
+        self.file.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+# Führt die Stapelverarbeitung aus.
+def run_batch(args):
+    """
+    Führt die Stapelverarbeitung aus und gibt den Fortschritt auf stderr aus.
+    :param args: Argumente aus parse_args().
+    :return: Anzahl der verarbeiteten Bilder.
+    """
+    with contextlib.redirect_stdout(sys.stderr): # Statusausgaben nicht in die Ergebnisse (Standardausgabe) schreiben
+        create_classifier_manager(args.classifier) # Klassifizierer vorab prüfen (Fehler im Initializer würden Worker endlos neu starten)
+    tasks = enumerate(collect_images(args.inputs, recursive=not args.no_recursive))
+    writer = ResultWriter(args.output, args.format)
+    processed = 0
+    errors = 0
+    start = time.perf_counter()
+    last_report = start
+    quiet = args.output == "-" or not args.verbose
+
+    # maxtasksperchild startet Worker regelmäßig neu und begrenzt so den Speicherverbrauch bei langen Läufen
+    with multiprocessing.Pool(processes=args.workers, initializer=init_worker,
+                              initargs=(args.classifier, args.scale_factor, args.min_neighbors, args.min_size, args.detection_scale, quiet),
+                              maxtasksperchild=args.max_tasks_per_child) as pool:
+        mapper = pool.imap if args.ordered else pool.imap_unordered
+        try:
+            for result in mapper(process_image, tasks, chunksize=args.chunksize):
+                writer.write(result)
+                processed += 1
+                errors += result["error"] is not None
+                now = time.perf_counter()
+                if now - last_report >= args.report_interval:
+                    print(f"{processed} Bilder, {processed / (now - start):.1f} Bilder/s, {errors} Fehler", file=sys.stderr)
+                    last_report = now
+        finally:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"Fertig: {processed} Bilder in {elapsed:.1f} s ({rate:.1f} Bilder/s), {errors} Fehler", file=sys.stderr)
+    return processed
+
+
+# Liest die Kommandozeilenparameter.
+def parse_args(argv=None):
+    """
+    Liest die Kommandozeilenparameter.
+    :param argv: Argumentliste (Standard: sys.argv).
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Objekterkennung mit Haar-Cascades über viele Bilder ohne GUI.")
+    parser.add_argument("inputs", nargs="+", help="Verzeichnisse, Bilddateien oder Glob-Muster (z. B. \"archiv/**/*.jpg\")")
+    parser.add_argument("--classifier", default="face", help="ID eines vordefinierten Klassifizierers (z. B. face, eye) oder Pfad zu einer XML-Datei")
+    parser.add_argument("--scale-factor", type=float, default=None, help="Überschreibt scaleFactor")
+    parser.add_argument("--min-neighbors", type=int, default=None, help="Überschreibt minNeighbors")
+    parser.add_argument("--min-size", type=int, default=None, help="Überschreibt minSize (quadratisch, in Pixeln)")
+    parser.add_argument("--detection-scale", type=float, default=1.0, help="Erkennung auf verkleinertem Bild (z. B. 0.5)")
+    parser.add_argument("--output", "-o", default="-", help="Ausgabedatei (.jsonl oder .csv), Standard: Standardausgabe")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None, help="Ausgabeformat (Standard: anhand der Dateiendung)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Anzahl der Worker-Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--chunksize", type=int, default=8, help="Anzahl Bilder je Auftrag an einen Worker")
+    parser.add_argument("--max-tasks-per-child", type=int, default=1000, help="Worker nach so vielen Aufträgen neu starten (Speicher)")
+    parser.add_argument("--ordered", action="store_true", help="Ergebnisse in Eingabereihenfolge ausgeben (sonst sobald fertig)")
+    parser.add_argument("--no-recursive", action="store_true", help="Verzeichnisse nicht rekursiv durchsuchen")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Sekunden zwischen Fortschrittsmeldungen")
+    parser.add_argument("--verbose", action="store_true", help="Statusausgaben der Worker anzeigen")
+    return parser.parse_args(argv)
+
+
+# Hauptprogramm
+if __name__ == "__main__":
+    run_batch(parse_args())
@@ -0,0 +1,360 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+from classifiermanager import ClassifierManager
+
+# Reproduzierbarer Benchmark für Klassifizierer, Parameter und Bildgrößen.
+#
+# Beispiele:
+#   python benchmark.py --output lauf_neu.json
+#   python benchmark.py --classifiers face eye --resolutions 480p 1080p --repeats 30 --output lauf_neu.json
+#   python benchmark.py --all-cascades --resolutions 720p --threads 1 --output alle_cascades.json
+#   python benchmark.py --classifiers face --resolutions 20MP --repeats 3 --tiled --output kacheln.json
+#   python benchmark.py --compare lauf_alt.json lauf_neu.json --threshold 0.10
+
+# Auflösungen der synthetischen Testbilder (Breite, Höhe)
+RESOLUTIONS = {
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+    "20MP": (5472, 3648) # Nur auf Anfrage (z. B. mit --tiled), nicht im Standardlauf
+}
+DEFAULT_RESOLUTIONS = ["480p", "720p", "1080p", "4K"]
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Liefert den Spitzenwert des Speicherverbrauchs des Prozesses in MB.
+def peak_memory_mb():
+    """
+    Liefert den Spitzenwert des Speicherverbrauchs (Resident Set Size) des Prozesses in MB.
+    Erfasst auch Speicher, den OpenCV außerhalb von Python belegt.
+    :return: Speicher in MB oder None, falls nicht ermittelbar (z. B. unter Windows).
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1) # macOS: Bytes, Linux: KB
+    except (ImportError, OSError):
+        return None
+
+
+# Liest einen Speicherwert des Prozesses aus /proc/self/status in MB.
+def _status_memory_mb(field):
+    """
+    Liest einen Speicherwert des Prozesses aus /proc/self/status (nur Linux).
+    :param field: Name des Feldes (z. B. "VmRSS" oder "VmHWM").
+    :return: Speicher in MB oder None, falls nicht ermittelbar.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as file:
+            for line in file:
+                if line.startswith(field + ":"):
+                    return round(int(line.split()[1]) / 1024, 1) # Angabe in KB
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+# Setzt den Spitzenwert des Speicherverbrauchs zurück.
+def reset_peak_memory():
+    """
+    Setzt den Spitzenwert des Speicherverbrauchs (VmHWM) auf den aktuellen Wert zurück (nur Linux), damit der
+    Speicherbedarf einer einzelnen Messung ermittelt werden kann.
+    :return: Aktueller Speicherverbrauch (Resident Set Size) in MB oder None, falls nicht möglich.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as file:
+            file.write("5")
+    except OSError:
+        return None
+    return _status_memory_mb("VmRSS")
+
+
+# Erstellt ein Testbild der gewünschten Größe.
+def make_image(resolution, source=None):
+    """
+    Erstellt ein Testbild der gewünschten Größe, indem das Quellbild gekachelt wird.
+    Ohne Quellbild wird ein reproduzierbares Rauschbild verwendet.
+    :param resolution: Name aus RESOLUTIONS oder Tupel (Breite, Höhe).
+    :param source: Quellbild (BGR) oder None.
+    :return: BGR-Bild als NumPy-Array.
+    """
+    width, height = RESOLUTIONS[resolution] if isinstance(resolution, str) else resolution
+    if source is None:
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    reps_y = -(-height // source.shape[0]) # Aufrunden
+    reps_x = -(-width // source.shape[1])
+    return np.ascontiguousarray(np.tile(source, (reps_y, reps_x, 1))[:height, :width])
+
+
+# Berechnet ein Perzentil einer sortierten Liste.
+def percentile(sorted_values, p):
+    """
+    Berechnet ein Perzentil (lineare Interpolation) einer sortierten Liste.
+    :param sorted_values: Aufsteigend sortierte Messwerte.
+    :param p: Perzentil zwischen 0 und 100.
+    :return: Wert des Perzentils.
+    """
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+# Misst die Ladezeit eines Klassifizierers.
+def measure_load_time(cascade_path, repeats=3):
+    """
+    Misst die Ladezeit (Parsen der XML-Datei) eines Klassifizierers.
+    :param cascade_path: Pfad zur XML-Datei.
+    :param repeats: Anzahl der Messungen (Minimum wird verwendet).
+    :return: Ladezeit in ms.
+    :raises ValueError: Wenn der Klassifizierer nicht geladen werden kann.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        try:
+            cascade = cv2.CascadeClassifier(cascade_path)
+        except (cv2.error, SystemError) as e: # Ungültige Datei
+            raise ValueError(f"Klassifizierer '{cascade_path}' konnte nicht geladen werden: {e}") from e
+        times.append((time.perf_counter() - start) * 1000)
+        if cascade.empty():
+            raise ValueError(f"Klassifizierer '{cascade_path}' konnte nicht geladen werden")
+    return round(min(times), 3)
+
+
+# Führt den Benchmark für eine Kombination aus Klassifizierer, Preset und Bild aus.
+def run_case(classifier_manager, classifier_id, image, repeats, warmup, tiled=False):
+    """
+    Führt detect_faces wiederholt aus und berechnet Latenz-Statistiken.
+    :param classifier_manager: Konfigurierter ClassifierManager.
+    :param classifier_id: ID des Klassifizierers.
+    :param image: Testbild (BGR).
+    :param repeats: Anzahl gemessener Durchläufe.
+    :param warmup: Anzahl ungemessener Durchläufe vorab.
+    :param tiled: Wenn True, Kachel-Erkennung für große Bilder (siehe ClassifierManager.detect_tiled).
+    :return: Dictionary mit Latenzen (ms), Durchsatz und Anzahl erkannter Objekte.
+    """
+    for _ in range(warmup):
+        classifier_manager.detect_faces(image, classifier_id, tiled=tiled)
+
+    times = []
+    count = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        objects = classifier_manager.detect_faces(image, classifier_id, tiled=tiled)
+        times.append((time.perf_counter() - start) * 1000)
+        count = len(objects) if objects is not None else 0
+    times.sort()
+    mean = sum(times) / len(times)
+    return {
+        "p50_ms": round(percentile(times, 50), 3),
+        "p95_ms": round(percentile(times, 95), 3),
+        "p99_ms": round(percentile(times, 99), 3),
+        "mean_ms": round(mean, 3),
+        "min_ms": round(times[0], 3),
+        "throughput_fps": round(1000 / mean, 2) if mean > 0 else None,
+        "objects": count
+    }
+
+
+# Führt den gesamten Benchmark aus.
+def run_benchmark(classifier_ids=None, resolutions=None, presets=None, repeats=20, warmup=2, source_image=None, threads=None, tiled=False):
+    """
+    Führt den Benchmark für alle Kombinationen aus Klassifizierer, Preset und Auflösung aus.
+    :param classifier_ids: IDs der Klassifizierer oder Pfade zu XML-Dateien (Standard: alle vordefinierten).
+    :param resolutions: Namen der Auflösungen (Standard: DEFAULT_RESOLUTIONS).
+    :param presets: Zusätzliche Parametersätze {Name: {"scaleFactor": ..., "minNeighbors": ..., "minSize": ...}}.
+                    Das Preset "default" (Werte aus ClassifierManager.classifiers) wird immer gemessen.
+    :param repeats: Anzahl gemessener Durchläufe je Kombination.
+    :param warmup: Anzahl ungemessener Durchläufe je Kombination.
+    :param source_image: Pfad des Quellbildes (Standard: face_animation.jpg, sonst Rauschbild).
+    :param threads: Anzahl der OpenCV-Threads (Standard: OpenCV-Vorgabe).
+    :param tiled: Wenn True, Kachel-Erkennung für große Bilder (ein Thread je Kern).
+    :return: Dictionary mit Metadaten und Ergebnissen (JSON-serialisierbar).
+    """
+    if threads is not None:
+        cv2.setNumThreads(threads)
+    classifier_manager = ClassifierManager(preload=False)
+    classifier_ids = classifier_ids or [c for c in classifier_manager.classifiers if c != "custom"]
+    resolutions = resolutions or DEFAULT_RESOLUTIONS
+    presets = presets or {}
+
+    source_path = source_image or os.path.join(BENCHMARK_DIR, "face_animation.jpg")
+    source = cv2.imread(source_path) if os.path.exists(source_path) else None
+    images = {resolution: make_image(resolution, source) for resolution in resolutions}
+
+    # Einträge (Name, classifier_id, Pfad): vordefinierte IDs oder XML-Dateien (mit den Parametern von "custom")
+    entries = []
+    for classifier in classifier_ids:
+        if classifier in classifier_manager.classifiers and classifier != "custom":
+            entries.append((classifier, classifier, classifier_manager.get_classifier_path(classifier)))
+        elif os.path.isfile(classifier):
+            entries.append((os.path.basename(classifier), "custom", classifier))
+        else:
+            raise ValueError(f"Unbekannter Klassifizierer: '{classifier}'")
+
+    results = []
+    for name, classifier_id, cascade_path in entries:
+        try:
+            load_ms = measure_load_time(cascade_path)
+        except ValueError as e: # Fehlerbehandlung: Eintrag vermerken, übrige Klassifizierer weiter messen
+            print(f"{name:12s} Fehler: {e}", file=sys.stderr)
+            results.append({"classifier": name, "file": os.path.basename(cascade_path), "error": str(e)})
+            continue
+        classifier_manager.cascade_path = cascade_path
+        classifier_manager.current_classifier = classifier_id
+        default_params = dict(classifier_manager.classifiers[classifier_id])
+        for preset_name, params in [("default", {})] + list(presets.items()):
+            classifier_manager.classifiers[classifier_id] = dict(default_params, **params)
+            info = classifier_manager.classifiers[classifier_id]
+            for resolution, image in images.items():
+                gc.collect()
+                memory_before = reset_peak_memory()
+                case = run_case(classifier_manager, classifier_id, image, repeats, warmup, tiled)
+                memory_peak = _status_memory_mb("VmHWM") if memory_before is not None else None
+                case.update({
+                    "classifier": name,
+                    "file": os.path.basename(cascade_path),
+                    "preset": preset_name,
+                    "scaleFactor": info["scaleFactor"],
+                    "minNeighbors": info["minNeighbors"],
+                    "minSize": list(info["minSize"]),
+                    "resolution": resolution,
+                    "width": image.shape[1],
+                    "height": image.shape[0],
+                    "load_ms": load_ms,
+                    "memory_delta_mb": round(memory_peak - memory_before, 1) if memory_peak is not None else None # Zusätzlicher Spitzenbedarf dieser Messung
+                })
+                results.append(case)
+                print(f"{name:12s} {preset_name:10s} {resolution:6s} p50 {case['p50_ms']:9.2f} ms  p99 {case['p99_ms']:9.2f} ms  "
+                      f"{case['throughput_fps']:7.2f} FPS", file=sys.stderr)
+        classifier_manager.classifiers[classifier_id] = default_params
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "opencv_threads": cv2.getNumThreads(),
+            "tiled": tiled,
+            "source_image": source_path if source is not None else None,
+            "repeats": repeats,
+            "warmup": warmup,
+            "peak_memory_mb": peak_memory_mb() # Höchststand des gesamten Laufs
+        },
+        "results": results
+    }
+
+
+# Vergleicht zwei Benchmark-Läufe.
+def compare_runs(baseline, candidate, threshold=0.10, metric="p50_ms"):
+    """
+    Vergleicht zwei Benchmark-Läufe und markiert Verschlechterungen oberhalb der Schwelle.
+    :param baseline: Ergebnis-Dictionary des Referenzlaufs.
+    :param candidate: Ergebnis-Dictionary des neuen Laufs.
+    :param threshold: Relative Schwelle (0.10 = 10 % langsamer).
+    :param metric: Verglichene Kennzahl (z. B. "p50_ms", "p95_ms", "load_ms").
+    :return: Liste von Dictionaries je gemeinsamer Kombination mit Feld "regression".
+    """
+    def key(case):
+        return (case["classifier"], case["preset"], case["resolution"])
+
+    baseline_cases = {key(case): case for case in baseline["results"] if "error" not in case}
+    comparison = []
+    for case in candidate["results"]:
+        if "error" in case: # Klassifizierer konnte nicht geladen werden
+            continue
+        old = baseline_cases.get(key(case))
+        if old is None or not old.get(metric):
+            continue
+        change = (case[metric] - old[metric]) / old[metric]
+        comparison.append({
+            "classifier": case["classifier"],
+            "preset": case["preset"],
+            "resolution": case["resolution"],
+            "metric": metric,
+            "baseline": old[metric],
+            "candidate": case[metric],
+            "change": round(change, 4),
+            "regression": change > threshold
+        })
+    return comparison
+
+
+# Liest die Kommandozeilenparameter.
+def parse_args(argv=None):
+    """
+    Liest die Kommandozeilenparameter.
+    :param argv: Argumentliste (Standard: sys.argv).
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Benchmark für Haar-Cascade Klassifizierer, Parameter und Bildgrößen.")
+    parser.add_argument("--classifiers", nargs="+", default=None, help="IDs der Klassifizierer oder Pfade zu XML-Dateien (Standard: alle vordefinierten)")
+    parser.add_argument("--all-cascades", action="store_true", help="Zusätzlich alle XML-Dateien aus classifier/ messen (Parameter von \"custom\")")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), default=None, help="Auflösungen (Standard: alle außer 20MP)")
+    parser.add_argument("--presets", default=None, help="JSON-Datei mit zusätzlichen Parametersätzen {Name: {scaleFactor, minNeighbors, minSize}}")
+    parser.add_argument("--repeats", type=int, default=20, help="Gemessene Durchläufe je Kombination")
+    parser.add_argument("--warmup", type=int, default=2, help="Ungemessene Durchläufe je Kombination")
+    parser.add_argument("--image", default=None, help="Quellbild für die gekachelten Testbilder (Standard: face_animation.jpg)")
+    parser.add_argument("--threads", type=int, default=None, help="Anzahl der OpenCV-Threads (für reproduzierbare Messungen z. B. 1)")
+    parser.add_argument("--tiled", action="store_true", help="Große Bilder in Kacheln parallel erkennen (Skalierung mit der Anzahl der Kerne)")
+    parser.add_argument("--output", "-o", default=None, help="Ergebnisdatei (JSON), Standard: Standardausgabe")
+    parser.add_argument("--compare", nargs=2, metavar=("ALT", "NEU"), default=None, help="Zwei Ergebnisdateien vergleichen statt messen")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Schwelle für Verschlechterungen beim Vergleich (0.10 = 10 %%)")
+    parser.add_argument("--metric", default="p50_ms", help="Kennzahl für den Vergleich (p50_ms, p95_ms, p99_ms, load_ms)")
+    return parser.parse_args(argv)
+
+
+# Hauptprogramm
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.compare[1], encoding="utf-8") as file:
+            candidate = json.load(file)
+        comparison = compare_runs(baseline, candidate, args.threshold, args.metric)
+        for entry in comparison:
+            marker = "VERSCHLECHTERUNG" if entry["regression"] else ""
+            print(f"{entry['classifier']:12s} {entry['preset']:10s} {entry['resolution']:6s} {entry['baseline']:9.2f} -> "
+                  f"{entry['candidate']:9.2f} {entry['metric']} ({entry['change'] * 100:+.1f} %) {marker}")
+        sys.exit(1 if any(entry["regression"] for entry in comparison) else 0)
+
+    presets = None
+    if args.presets:
+        with open(args.presets, encoding="utf-8") as file:
+            presets = {name: dict(params, minSize=tuple(params["minSize"])) if "minSize" in params else params
+                       for name, params in json.load(file).items()}
+
+    classifiers = args.classifiers
+    if args.all_cascades:
+        cascade_dir = os.path.join(BENCHMARK_DIR, "classifier")
+        classifiers = (classifiers or [c for c in ClassifierManager(preload=False).classifiers if c != "custom"]) + \
+            sorted(os.path.join(cascade_dir, name) for name in os.listdir(cascade_dir) if name.endswith(".xml"))
+
+    with contextlib.redirect_stdout(sys.stderr): # Statusausgaben nicht in die JSON-Ausgabe schreiben
+        report = run_benchmark(classifiers, args.resolutions, presets, args.repeats, args.warmup, args.image, args.threads, args.tiled)
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+        print(f"Ergebnisse gespeichert: {args.output}", file=sys.stderr)
@@ -1,49 +1,194 @@
+import queue
+import threading
+import time
+from collections import deque
 import cv2
 
 # Kamera-Manager-Klasse zum Verwalten von Kameraoperationen.
 class CameraManager:
 
     # Initialisiert den Kamera-Manager.
-    def __init__(self):
+    def __init__(self, buffer_size=1, probe_range=3, probe_timeout=3.0, probe_ttl=60.0):
         """
         Initialisiert den Kamera-Manager.
+        :param buffer_size: Anzahl der Frames im Puffer des Aufnahme-Threads (Standard: 1, nur neuester Frame).
+        :param probe_range: Anzahl der Kamera-Indizes, die bei der Kamerasuche getestet werden (0 bis probe_range - 1).
+        :param probe_timeout: Maximale Wartezeit in Sekunden je Kamerasuche (gilt für alle parallel getesteten Indizes).
+        :param probe_ttl: Gültigkeitsdauer des Suchergebnisses in Sekunden.
         """        
         try:
             self.cap = None # Kamera-Objekt
+            self.camera_id = None # Index der geöffneten Kamera
+
+            # Variablen für die Kamerasuche
+            self.probe_range = max(1, probe_range)
+            self.probe_timeout = probe_timeout
+            self.probe_ttl = probe_ttl
+            self.probe_lock = threading.Lock() # Schützt Cache und laufende Suche
+            self.camera_cache = None # Tupel (Zeitpunkt, Liste der Indizes) der letzten Suche
+            self.probe_thread = None # Thread der laufenden Suche
+            self.probe_callbacks = [] # Callbacks, die nach der laufenden Suche aufgerufen werden
+
+            # Variablen für den Aufnahme-Thread
+            self.capture_thread = None # Thread, der fortlaufend Frames liest (gibt seine Kamera beim Beenden selbst frei)
+            self.capture_stop = None # Event zum Beenden des aktuellen Aufnahme-Threads (je Thread ein eigenes)
+            self.capture_running = False # Status des Aufnahme-Threads
+            self.frame_lock = threading.Lock() # Schützt den Frame-Puffer
+            self.frame_buffer = deque(maxlen=max(1, buffer_size)) # Begrenzter Puffer, alte Frames werden verworfen
+            self.frame_sequence = 0 # Fortlaufende Nummer des zuletzt gelesenen Frames
+            self.dropped_frames = 0 # Anzahl verworfener (nie abgeholter) Frames
+            self.delivered_sequence = 0 # Nummer des zuletzt abgeholten Frames
+            self.profiler = None # Optionaler FrameProfiler für die Lesedauer der Kamera
+
+            # Variablen für die Wiedergabe von Videodateien
+            self.source = "camera" # Quelle: "camera" oder "video"
+            self.video_queue = None # Begrenzte Warteschlange mit vorab dekodierten Frames
+            self.video_realtime = True # True: Wiedergabe in Echtzeit (Frames werden übersprungen), False: jeder Frame so schnell wie möglich
+            self.video_fps = 0.0 # Bildrate der Videodatei
+            self.video_frame_count = 0 # Anzahl der Frames der Videodatei (0, falls unbekannt)
+            self.video_finished = False # Dekodierer hat das Ende der Datei erreicht
+            self.video_clock_start = None # Zeitpunkt (time.monotonic), der Position 0 des Videos entspricht
+            self.video_next = None # Bereits entnommener, aber noch nicht fälliger Frame (Echtzeit-Wiedergabe)
+            self.video_current = None # Zuletzt ausgelieferter Frame (frame, position, sequence)
+            self.video_skipped = 0 # Anzahl übersprungener Frames (Echtzeit-Wiedergabe)
         except Exception as e: # Fehlerbehandlung
             print("Fehler beim Initialalisiern des Kamera-Managers")
     
     
-    # Erkennt verfügbare Kameras und gibt eine Liste der Indizes zurück.
-    # Testet nur die ersten drei Kameras
-    def detect_cameras(self):
+    # Testet, ob sich die Kamera mit dem angegebenen Index öffnen lässt.
+    def _probe_camera(self, camera_id, results):
+        """
+        Testet, ob sich die Kamera mit dem angegebenen Index öffnen lässt (läuft in einem eigenen Thread).
+        :param camera_id: Index der Kamera.
+        :param results: Dictionary, in das das Ergebnis {camera_id: bool} geschrieben wird.
+        """
+        try:
+            cap = cv2.VideoCapture(camera_id) # Eigenes Objekt, die geöffnete Kamera (self.cap) bleibt unberührt
+            results[camera_id] = cap.isOpened()
+            cap.release()
+        except Exception as e: # Fehlerbehandlung
+            results[camera_id] = False
+
+
+    # Testet alle Kamera-Indizes parallel.
+    def _probe_cameras(self):
+        """
+        Testet alle Kamera-Indizes parallel, jeweils in einem eigenen Thread.
+        Indizes, die nach probe_timeout Sekunden noch nicht geantwortet haben, gelten als nicht verfügbar
+        (z. B. V4L2-Timeouts bei fehlenden Geräten). Die hängenden Threads laufen als Daemon-Threads im Hintergrund aus.
+        :return: Liste der verfügbaren Indizes.
+        """
+        results = {}
+        threads = []
+        for camera_id in range(self.probe_range):
+            if self.capture_running and self.source == "camera" and camera_id == self.camera_id:
+                results[camera_id] = True # Bereits geöffnete Kamera nicht erneut öffnen
+                continue
+            thread = threading.Thread(target=self._probe_camera, args=(camera_id, results), name=f"CameraProbe-{camera_id}", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        deadline = time.monotonic() + self.probe_timeout
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        return sorted(camera_id for camera_id, available in list(results.items()) if available)
+
+
+    # Führt die Kamerasuche aus und ruft die wartenden Callbacks auf.
+    def _probe_loop(self):
         """
-        Erkennt verfügbare Kameras und gibt eine Liste der Indizes zurück.
+        Führt die Kamerasuche aus (im Such-Thread), speichert das Ergebnis im Cache und ruft die wartenden Callbacks auf.
         """
         try:
+            available_cameras = self._probe_cameras()
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Erkennen der Kameras")
             available_cameras = []
-            for camera_id in range (3): # Testet nur die ersten drei Kameras
-                self.cap = cv2.VideoCapture(camera_id)  # Kamera mit Index camera_id öffnen
-                if self.cap.isOpened(): # Testen, ob Kamera geöffnet wurde
-                    available_cameras.append(camera_id) # Kamera ist verfügbar und wird zur Liste hinzugefügt
-                    self.cap.release()
-            return available_cameras
+        with self.probe_lock:
+            self.camera_cache = (time.monotonic(), available_cameras)
+            callbacks, self.probe_callbacks = self.probe_callbacks, []
+            self.probe_thread = None
+        for callback in callbacks:
+            try:
+                callback(list(available_cameras))
+            except Exception as e: # Fehlerbehandlung
+                print(f"Fehler im Callback der Kamerasuche: {e}")
+
+
+    # Liefert die Kameras aus dem Cache, falls das Ergebnis noch gültig ist.
+    def get_cached_cameras(self):
+        """
+        Liefert die Kameras aus dem Cache, falls das Ergebnis jünger als probe_ttl Sekunden ist.
+        :return: Liste der Indizes oder None, falls kein gültiges Ergebnis vorliegt.
+        """
+        with self.probe_lock:
+            if self.camera_cache is not None and time.monotonic() - self.camera_cache[0] < self.probe_ttl:
+                return list(self.camera_cache[1])
+        return None
+
+
+    # Startet die Kamerasuche im Hintergrund.
+    def detect_cameras_async(self, callback, force=False):
+        """
+        Startet die Kamerasuche im Hintergrund und ruft callback(Liste der Indizes) auf, sobald das Ergebnis vorliegt.
+        Liegt ein gültiges Ergebnis im Cache, wird callback sofort aufgerufen. Läuft bereits eine Suche,
+        wird callback nach deren Ende aufgerufen (keine zweite Suche).
+        Achtung: callback wird ggf. im Such-Thread aufgerufen (GUI-Elemente nur über Signale ändern).
+        :param callback: Funktion callback(available_cameras).
+        :param force: Wenn True, wird der Cache ignoriert.
+        """
+        cached = None if force else self.get_cached_cameras()
+        if cached is not None:
+            callback(cached)
+            return
+        with self.probe_lock:
+            self.probe_callbacks.append(callback)
+            if self.probe_thread is not None: # Suche läuft bereits
+                return
+            self.probe_thread = threading.Thread(target=self._probe_loop, name="CameraDiscovery", daemon=True)
+            self.probe_thread.start()
+
+
+    # Erkennt verfügbare Kameras und gibt eine Liste der Indizes zurück.
+    def detect_cameras(self, force=False):
+        """
+        Erkennt verfügbare Kameras und gibt eine Liste der Indizes zurück (blockierend, Ergebnis aus dem Cache, falls gültig).
+        Die Indizes 0 bis probe_range - 1 werden parallel getestet, höchstens probe_timeout Sekunden lang.
+        :param force: Wenn True, wird der Cache ignoriert.
+        :return: Liste der Indizes.
+        """
+        try:
+            done = threading.Event()
+            result = []
+            def on_done(available_cameras):
+                result.extend(available_cameras)
+                done.set()
+            self.detect_cameras_async(on_done, force)
+            done.wait()
+            return result
         
         except Exception as e: # Fehlerbehandlung
             print("Fehler beim Erkennen der Kameras")
             return None
 
     # Startet die Kamera mit dem angegebenen Index.
-    def start_camera(self, camera_id =0):
+    def start_camera(self, camera_id =0, threaded=False):
         """
         Startet die Kamera mit dem angegebenen Index.
+        :param camera_id: Index der Kamera.
+        :param threaded: Wenn True, liest ein eigener Thread fortlaufend Frames in den Puffer (siehe get_latest_frame).
         """
         try:
+            self.source = "camera"
+            self.camera_id = camera_id
             self.cap = cv2.VideoCapture(camera_id)  # Kamera mit Index camera_id öffnen
 
             # Testen, ob Kamera geöffnet wurde.
             if self.cap.isOpened():
                 print (f"Kamera mit ID {camera_id} wurde erfolgreich geöffnet")
+                if threaded:
+                    self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) # Treiberpuffer klein halten (nicht von allen Backends unterstützt)
+                    self.start_capture_thread()
                 return self.cap
             else:
                 print (f"Fehler: Kamera mit ID {camera_id} konnte nicht geöffnet werden")
@@ -54,16 +199,168 @@ class CameraManager:
             return None
         
 
+    # Öffnet eine Videodatei und startet den Dekodier-Thread.
+    def start_video(self, file_path, realtime=True, prefetch=32):
+        """
+        Öffnet eine Videodatei und startet den Dekodier-Thread, der die Frames vorab in eine begrenzte Warteschlange dekodiert.
+        Die Frames werden wie bei der Kamera über get_latest_frame abgeholt. Eine noch laufende Quelle wird vorher beendet.
+        :param file_path: Pfad zur Videodatei.
+        :param realtime: True: Wiedergabe in Echtzeit (verspätete Frames werden übersprungen),
+                         False: jeder Frame wird so schnell wie möglich ausgeliefert.
+        :param prefetch: Maximale Anzahl vorab dekodierter Frames.
+        :return: VideoCapture-Objekt oder None, falls die Datei nicht geöffnet werden konnte.
+        """
+        try:
+            self.stop_camera() # Vorherige Kamera bzw. vorheriges Video beenden (Dekodier-Thread und Datei freigeben)
+            self.source = "video"
+            self.cap = cv2.VideoCapture(file_path)
+            if not self.cap.isOpened():
+                print(f"Fehler: Video {file_path} konnte nicht geöffnet werden")
+                return None
+
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            self.video_fps = fps if 0 < fps < 1000 else 25.0 # Manche Container liefern keine (sinnvolle) Bildrate
+            self.video_frame_count = max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+            self.video_realtime = realtime
+            self.video_queue = queue.Queue(maxsize=max(1, prefetch))
+            self.video_finished = False
+            self.video_clock_start = None
+            self.video_next = None
+            self.video_current = None
+            self.video_skipped = 0
+
+            self.capture_running = True
+            self.capture_stop = threading.Event()
+            self.capture_thread = threading.Thread(target=self._video_loop, args=(self.cap, self.video_queue, self.capture_stop),
+                                                   name="VideoDecoder", daemon=True)
+            self.capture_thread.start()
+            print(f"Video {file_path} wurde erfolgreich geöffnet ({self.video_fps:.1f} FPS)")
+            return self.cap
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Öffnen des Videos")
+            return None
+
+
+    # Schleife des Dekodier-Threads.
+    def _video_loop(self, cap, video_queue, stop):
+        """
+        Dekodiert die Frames der Videodatei vorab in die begrenzte Warteschlange.
+        Ist die Warteschlange voll, wartet der Thread (Vorsprung höchstens prefetch Frames).
+        Beim Beenden gibt der Thread die Videodatei selbst frei (siehe stop_camera).
+        :param cap: VideoCapture-Objekt der Videodatei.
+        :param video_queue: Warteschlange für die dekodierten Frames.
+        :param stop: Event zum Beenden des Threads.
+        """
+        index = 0
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    ret, frame = cap.read()
+                except Exception as e: # Fehlerbehandlung
+                    ret, frame = False, None
+                if self.profiler is not None:
+                    self.profiler.record("video_decode", start, time.perf_counter())
+                if not ret:
+                    break # Ende der Datei (oder Lesefehler)
+
+                index += 1
+                item = (frame, (index - 1) / self.video_fps, index) # (frame, Position in Sekunden, sequence)
+                while not stop.is_set():
+                    try:
+                        video_queue.put(item, timeout=0.1) # Mit Timeout, damit stop_camera() nicht blockiert
+                        break
+                    except queue.Full:
+                        continue
+            if not stop.is_set(): # Ein beendeter Thread markiert kein neu geöffnetes Video als fertig
+                self.video_finished = True
+        finally:
+            cap.release()
+
+
+    # Liefert den fälligen Frame der Videodatei.
+    def _get_video_frame(self):
+        """
+        Liefert den fälligen Frame der Videodatei.
+        Echtzeit: der neueste Frame, dessen Position die abgelaufene Zeit nicht überschreitet (ältere werden übersprungen).
+        Sonst: der nächste Frame der Warteschlange.
+        :return: Tupel (frame, position, sequence). Falls noch kein Frame vorliegt: (None, None, 0).
+        """
+        if not self.video_realtime:
+            try:
+                self.video_current = self.video_queue.get_nowait()
+            except queue.Empty:
+                pass
+        else:
+            now = time.monotonic()
+            item = None
+            while True:
+                if self.video_next is None:
+                    try:
+                        self.video_next = self.video_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if self.video_clock_start is None: # Uhr startet mit dem ersten Frame
+                    self.video_clock_start = now - self.video_next[1]
+                if self.video_next[1] > now - self.video_clock_start: # Frame noch nicht fällig
+                    break
+                if item is not None:
+                    self.video_skipped += 1 # Verspäteter Frame wird übersprungen
+                item, self.video_next = self.video_next, None
+            if item is not None:
+                self.video_current = item
+
+        if self.video_current is None:
+            return None, None, 0
+        self.delivered_sequence = self.video_current[2]
+        return self.video_current
+
+
+    # Schaltet zwischen Echtzeit-Wiedergabe und Verarbeitung so schnell wie möglich um.
+    def set_video_realtime(self, realtime):
+        """
+        Schaltet zwischen Echtzeit-Wiedergabe und Verarbeitung so schnell wie möglich um.
+        Die Echtzeit-Uhr wird an der aktuellen Position neu ausgerichtet.
+        :param realtime: True für Echtzeit-Wiedergabe.
+        """
+        if self.video_next is not None and not realtime: # Bereits entnommenen Frame nicht verlieren
+            self.video_current, self.video_next = self.video_next, None
+        self.video_realtime = realtime
+        position = self.video_current[1] if self.video_current is not None else 0.0
+        self.video_clock_start = time.monotonic() - position
+
+
+    # Liefert Kennzahlen der Videowiedergabe.
+    def get_video_stats(self):
+        """
+        Liefert Kennzahlen der Videowiedergabe.
+        :return: Dictionary mit "source_fps", "position", "duration" (0.0, falls unbekannt), "skipped", "buffered" und "finished".
+        """
+        return {
+            "source_fps": self.video_fps,
+            "position": self.video_current[1] if self.video_current is not None else 0.0,
+            "duration": self.video_frame_count / self.video_fps if self.video_fps else 0.0,
+            "skipped": self.video_skipped,
+            "buffered": self.video_queue.qsize() if self.video_queue is not None else 0,
+            "finished": self.video_finished
+        }
+
+
     # Stoppt die Kamera und gibt Ressourcen frei.
     def stop_camera(self):
         """
         Stoppt die Kamera und gibt Ressourcen frei.
         """
         try:
-
-            if self.cap is not None and self.cap.isOpened():
+            if self.capture_thread is not None:
+                # Der Aufnahme-Thread gibt die Kamera beim Beenden selbst frei. Blockiert cap.read() länger als
+                # die Wartezeit, geschieht das später, ein release() während read() ist nicht sicher.
+                if self.stop_capture_thread():
+                    print("Kamera erfolgreich geschlossen")
+            elif self.cap is not None and self.cap.isOpened():
                 self.cap.release()
                 print("Kamera erfolgreich geschlossen")
+            self.cap = None
 
         except Exception as e: # Fehlerbehandlung
             print("Fehler beim Schließen der Kamera")
@@ -84,4 +381,129 @@ class CameraManager:
         except Exception as e: # Fehlerbehandlung
             print("Fehler beim Abrufen des Frames")
             return None, False
-    
+
+
+    # Startet den Thread, der fortlaufend Frames von der Kamera liest.
+    def start_capture_thread(self):
+        """
+        Startet den Aufnahme-Thread, der fortlaufend Frames in den begrenzten Puffer schreibt.
+        :return: True, wenn der Thread läuft, sonst False.
+        """
+        try:
+            if self.capture_running:
+                return True
+            if self.cap is None or not self.cap.isOpened():
+                print("Fehler: Keine geöffnete Kamera für den Aufnahme-Thread")
+                return False
+
+            with self.frame_lock:
+                self.frame_buffer.clear()
+                self.frame_sequence = 0
+                self.dropped_frames = 0
+                self.delivered_sequence = 0
+            self.capture_running = True
+            self.capture_stop = threading.Event()
+            self.capture_thread = threading.Thread(target=self._capture_loop, args=(self.cap, self.capture_stop),
+                                                   name="CaptureThread", daemon=True)
+            self.capture_thread.start()
+            return True
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Starten des Aufnahme-Threads")
+            self.capture_running = False
+            return False
+
+
+    # Beendet den Aufnahme-Thread.
+    def stop_capture_thread(self):
+        """
+        Beendet den Aufnahme-Thread und wartet kurz auf dessen Ende. Der Thread gibt seine Kamera beim Beenden selbst frei.
+        :return: True, wenn der Thread beendet ist; False, wenn er noch in cap.read() blockiert (die Referenz bleibt dann erhalten).
+        """
+        try:
+            self.capture_running = False
+            if self.capture_stop is not None:
+                self.capture_stop.set()
+            if self.capture_thread is not None:
+                self.capture_thread.join(timeout=1.0) # cap.read() kann blockieren, daher nur begrenzt warten
+                if self.capture_thread.is_alive():
+                    print("Warnung: Aufnahme-Thread reagiert nicht, die Kamera wird nach dem Lesen freigegeben")
+                    return False
+                self.capture_thread = None
+            return True
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Beenden des Aufnahme-Threads")
+            return False
+
+
+    # Schleife des Aufnahme-Threads.
+    def _capture_loop(self, cap, stop):
+        """
+        Liest fortlaufend Frames von der Kamera. Nicht abgeholte Frames werden durch neuere ersetzt.
+        Beim Beenden gibt der Thread die Kamera selbst frei (siehe stop_camera).
+        :param cap: VideoCapture-Objekt der Kamera.
+        :param stop: Event zum Beenden des Threads.
+        """
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    ret, frame = cap.read()
+                except Exception as e: # Fehlerbehandlung
+                    ret, frame = False, None
+                if self.profiler is not None:
+                    self.profiler.record("camera_read", start, time.perf_counter())
+                if not ret:
+                    if not stop.is_set():
+                        print("Fehler: Kamera liefert keine Frames mehr")
+                        self.capture_running = False # Signalisiert dem Verbraucher den Verlust der Kamera
+                    break
+
+                timestamp = time.monotonic() # Aufnahmezeitpunkt
+                with self.frame_lock:
+                    if stop.is_set(): # Frame eines bereits beendeten Threads nicht mehr ausliefern
+                        break
+                    if len(self.frame_buffer) == self.frame_buffer.maxlen and self.frame_buffer[0][2] > self.delivered_sequence:
+                        self.dropped_frames += 1 # Ältester, nie abgeholter Frame wird durch deque(maxlen) verworfen
+                    self.frame_sequence += 1
+                    self.frame_buffer.append((frame, timestamp, self.frame_sequence))
+        finally:
+            cap.release()
+
+
+    # Liefert den neuesten Frame aus dem Puffer des Aufnahme-Threads, ohne zu blockieren.
+    def get_latest_frame(self):
+        """
+        Liefert den neuesten Frame aus dem Puffer des Aufnahme-Threads, ohne zu blockieren.
+        :return: Tupel (frame, timestamp, sequence). Falls noch kein Frame vorliegt: (None, None, 0).
+        """
+        if self.source == "video":
+            return self._get_video_frame()
+        with self.frame_lock:
+            if self.frame_buffer:
+                self.delivered_sequence = self.frame_buffer[-1][2]
+                return self.frame_buffer[-1]
+        return None, None, 0
+
+
+    # Rechnet den Zeitstempel eines Frames in Unix-Zeit um.
+    def get_capture_time(self, timestamp):
+        """
+        Rechnet den Zeitstempel eines Frames aus get_latest_frame in Unix-Zeit um (z. B. für das Erkennungs-Log).
+        Bei Videodateien ist der Zeitstempel die Position im Video, daher gilt dort der Zeitpunkt der Auslieferung.
+        :param timestamp: Zeitstempel aus get_latest_frame.
+        :return: Aufnahmezeitpunkt in Sekunden (Unix-Zeit).
+        """
+        if self.source == "video" or timestamp is None:
+            return time.time()
+        return time.time() - (time.monotonic() - timestamp) # Aufnahmezeitpunkt wird mit time.monotonic gemessen
+
+
+    # Gibt zurück, ob der Aufnahme-Thread noch Frames liefert.
+    def is_capturing(self):
+        """
+        Gibt zurück, ob der Aufnahme-Thread läuft bzw. ob die Videodatei noch nicht vollständig ausgeliefert wurde.
+        :return: True, wenn noch Frames geliefert werden, sonst False.
+        """
+        if self.source == "video":
+            return self.capture_running and not (self.video_finished and self.video_next is None and self.video_queue.empty())
+        return self.capture_running
@@ -0,0 +1,146 @@
+import os
+import threading
+from collections import OrderedDict
+import cv2
+
+# Klasse zum einmaligen Laden und Zwischenspeichern von Haar-Cascade Klassifizierern.
+class CascadeRegistry:
+    """
+    Klasse zum einmaligen Laden und Zwischenspeichern von Haar-Cascade Klassifizierern.
+    Klassifizierer werden über Pfad und Änderungszeitpunkt (mtime) identifiziert und in einem LRU-Cache gehalten.
+    Ist ein CascadeCache gesetzt, wird statt der XML-Datei deren kompilierte Fassung geladen.
+    Da detectMultiScale nicht threadsicher ist, verwaltet die Registry je Klassifizierer einen kleinen Vorrat an
+    Instanzen, die über acquire() ausgeliehen und über release() zurückgegeben werden.
+    """
+
+    # Initialisiert die Registry.
+    def __init__(self, max_size=8, max_instances=4):
+        """
+        Initialisiert die Registry.
+        :param max_size: Maximale Anzahl zwischengespeicherter Klassifizierer (LRU).
+        :param max_instances: Maximale Anzahl vorgehaltener Instanzen je Klassifizierer.
+        """
+        try:
+            self.max_size = max(1, max_size)
+            self.max_instances = max(1, max_instances)
+            self.entries = OrderedDict() # (Pfad, mtime) -> Liste freier Instanzen
+            self.lock = threading.Lock() # Schützt entries
+            self.preload_thread = None # Thread für das Vorladen im Hintergrund
+            self.cache = None # Optionaler CascadeCache: kompilierte Dateien statt XML laden
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren der Cascade-Registry")
+
+
+    # Erstellt den Schlüssel für einen Klassifizierer-Pfad.
+    @staticmethod
+    def make_key(path):
+        """
+        Erstellt den Schlüssel für einen Klassifizierer-Pfad.
+        :param path: Pfad zur XML-Datei.
+        :return: Tupel (absoluter Pfad, mtime). mtime ist None, falls die Datei nicht existiert.
+        """
+        path = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        return path, mtime
+
+
+    # Leiht eine Instanz des Klassifizierers aus.
+    def acquire(self, path):
+        """
+        Leiht eine Instanz des Klassifizierers aus. Die XML-Datei wird nur geparst, wenn keine freie Instanz vorhanden ist.
+        :param path: Pfad zur XML-Datei.
+        :return: Tupel (key, cascade). Die Instanz muss mit release(key, cascade) zurückgegeben werden.
+        """
+        key = self.make_key(path)
+        with self.lock:
+            instances = self.entries.get(key)
+            if instances is not None:
+                self.entries.move_to_end(key) # Zuletzt verwendet
+                if instances:
+                    return key, instances.pop()
+
+        load_path = self.cache.resolve(key[0]) if self.cache is not None else key[0] # Kompilierte Datei, falls aktuell
+        cascade = cv2.CascadeClassifier(load_path) # Parsen außerhalb des Locks, damit andere Threads nicht warten
+        if cascade.empty() and load_path != key[0]: # Kompilierte Datei unbrauchbar, XML verwenden
+            cascade = cv2.CascadeClassifier(key[0])
+        with self.lock:
+            self._insert(key)
+        return key, cascade
+
+
+    # Gibt eine ausgeliehene Instanz zurück.
+    def release(self, key, cascade):
+        """
+        Gibt eine ausgeliehene Instanz zurück.
+        :param key: Schlüssel aus acquire().
+        :param cascade: Ausgeliehene Instanz.
+        """
+        with self.lock:
+            instances = self._insert(key)
+            if len(instances) < self.max_instances:
+                instances.append(cascade)
+
+
+    # Fügt einen Eintrag ein und entfernt bei Bedarf den am längsten nicht verwendeten.
+    def _insert(self, key):
+        """
+        Fügt einen Eintrag ein (Lock muss gehalten werden) und entfernt bei Bedarf den am längsten nicht verwendeten.
+        :return: Liste freier Instanzen des Eintrags.
+        """
+        instances = self.entries.get(key)
+        if instances is None:
+            # Veraltete Einträge derselben Datei (andere mtime) entfernen
+            for stale_key in [k for k in self.entries if k[0] == key[0]]:
+                del self.entries[stale_key]
+            instances = []
+            self.entries[key] = instances
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        self.entries.move_to_end(key)
+        return instances
+
+
+    # Prüft, ob ein Klassifizierer bereits geladen ist.
+    def is_loaded(self, path):
+        """
+        Prüft, ob eine freie Instanz des Klassifizierers bereits geladen ist.
+        :param path: Pfad zur XML-Datei.
+        :return: True, wenn eine Instanz vorliegt, sonst False.
+        """
+        key = self.make_key(path)
+        with self.lock:
+            return bool(self.entries.get(key))
+
+
+    # Lädt mehrere Klassifizierer (optional im Hintergrund) vor.
+    def preload(self, paths, background=True):
+        """
+        Lädt mehrere Klassifizierer vor, damit ein späterer Wechsel ohne Parsen auskommt.
+        :param paths: Liste von Pfaden zu XML-Dateien.
+        :param background: Wenn True, wird in einem eigenen Thread geladen.
+        :return: Thread des Vorladens oder None.
+        """
+        paths = list(paths)
+        if not background:
+            self._preload(paths)
+            return None
+        self.preload_thread = threading.Thread(target=self._preload, args=(paths,), name="CascadePreload", daemon=True)
+        self.preload_thread.start()
+        return self.preload_thread
+
+
+    # Lädt die angegebenen Klassifizierer.
+    def _preload(self, paths):
+        """
+        Lädt die angegebenen Klassifizierer, sofern noch keine Instanz vorliegt.
+        """
+        for path in paths:
+            try:
+                if os.path.exists(path) and not self.is_loaded(path):
+                    key, cascade = self.acquire(path)
+                    self.release(key, cascade)
+            except Exception as e: # Fehlerbehandlung
+                print(f"Fehler beim Vorladen des Klassifizierers '{path}'")
@@ -1,5 +1,16 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import cv2
+import numpy as np
 from filemanager import FileManager
+from cascaderegistry import CascadeRegistry
+from cascadecache import CascadeCache
+
+PRESETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "presets.json") # Von autotune.py ermittelte Parameter
 
 # Klasse zum Verwalten von Klassifizierern und zum Erkennen von Objekten in einem Frame.
 class ClassifierManager:
@@ -8,13 +19,20 @@ class ClassifierManager:
     """
 
     # Initialisiert den Klassifizierer-Manager.
-    def __init__(self):
+    def __init__(self, registry_size=8, preload=True):
         """
         Initialisiert den Klassifizierer-Manager.
+        :param registry_size: Maximale Anzahl zwischengespeicherter Klassifizierer (LRU).
+        :param preload: Wenn True, werden alle vordefinierten Klassifizierer im Hintergrund vorgeladen.
         """
 
         try:
-            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml") # Standard-Gesichtsklassifizierer wird geladen
+            self.registry = CascadeRegistry(max_size=registry_size, max_instances=max(4, os.cpu_count() or 4)) # Lädt jeden Klassifizierer nur einmal (eine Instanz je Kachel-Thread)
+            self.registry.cache = CascadeCache() # Kompilierte Klassifizierer laden schneller als XML
+            self.cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml" # Pfad des aktiven Klassifizierers (Standard: Gesicht)
+            self.detection_cache = OrderedDict() # Zwischengespeicherte Erkennungsergebnisse für statische Bilder
+            self.detection_cache_size = 32 # Maximale Anzahl zwischengespeicherter Ergebnisse
+            self.detection_cache_lock = threading.Lock() # Erkennung statischer Bilder läuft in einem Hintergrund-Thread
             self.file_manager = FileManager()
             self.current_classifier = "face"
 
@@ -64,9 +82,78 @@ class ClassifierManager:
                 }
             }
 
+            # Farben (BGR) zur Unterscheidung der Klassifizierer im Mehrfach-Modus
+            self.classifier_colors = {
+                "face": (0, 255, 0),
+                "eye": (255, 0, 0),
+                "smile": (0, 0, 255),
+                "upperbody": (0, 255, 255),
+                "fullbody": (255, 0, 255),
+                "profileface": (255, 255, 0),
+                "custom": (0, 165, 255)
+            }
+
+            # Mehrfach-Modus: Kind-Klassifizierer suchen nur innerhalb der Boxen ihres Eltern-Klassifizierers.
+            # Der Suchbereich ist relativ zur Eltern-Box angegeben (x, y, Breite, Höhe).
+            self.parent_classifiers = {"eye": "face", "smile": "face"}
+            self.roi_regions = {
+                "eye": (0.0, 0.0, 1.0, 0.6), # Augen in den oberen 60 % des Gesichts
+                "smile": (0.0, 0.5, 1.0, 0.5) # Lächeln in der unteren Hälfte des Gesichts
+            }
+            self.multi_classifiers = ["face", "eye", "smile"] # Klassifizierer des Mehrfach-Modus (ID "multi")
+            self.multi_executor = None # Thread-Pool für parallele Klassifizierer (wird bei Bedarf erstellt)
+            self.multi_lock = threading.Lock() # Schützt die Erstellung der Thread-Pools
+
+            # Kachel-Erkennung großer Bilder (siehe detect_tiled)
+            self.tile_size = 1024 # Abstand der Kacheln in Pixeln (Kachel = tile_size + Überlappung)
+            self.tile_size_range = 4 # Kacheln erkennen Objekte bis 4 × minSize, größere der verkleinerte Durchlauf
+            self.tile_executor = None # Thread-Pool für die Kacheln (wird bei Bedarf erstellt)
+
+            self.load_presets()
+            if preload:
+                self.preload_classifiers()
+
         except cv2.error as e:
             print(f"Fehler beim Initialisieren des Klassifizierer-Managers: {e}")
 
+
+    # Lädt alle vordefinierten Klassifizierer im Hintergrund vor.
+    def preload_classifiers(self, background=True):
+        """
+        Lädt alle vordefinierten Klassifizierer (und den aktiven) vor, damit ein Wechsel ohne Parsen der XML-Datei auskommt.
+        :param background: Wenn True, wird in einem eigenen Thread geladen.
+        :return: None
+        """
+        try:
+            paths = [self.cascade_path] + [cv2.data.haarcascades + info["file"] for info in self.classifiers.values() if info["file"]]
+            self.registry.preload(paths, background)
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Vorladen der Klassifizierer")
+
+    # Lädt gespeicherte Parameter-Presets.
+    def load_presets(self, presets_path=PRESETS_FILE):
+        """
+        Lädt gespeicherte Parameter-Presets (siehe autotune.py) und überschreibt damit die Standardwerte.
+        :param presets_path: Pfad der Preset-Datei (fehlt sie, bleiben die Standardwerte).
+        :return: None
+        """
+        try:
+            if not os.path.exists(presets_path):
+                return
+            with open(presets_path, encoding="utf-8") as file:
+                presets = json.load(file)
+            for classifier_id, preset in presets.items():
+                if classifier_id not in self.classifiers:
+                    continue
+                classifier_info = self.classifiers[classifier_id]
+                for key in ("scaleFactor", "minNeighbors"):
+                    if key in preset:
+                        classifier_info[key] = preset[key]
+                if "minSize" in preset:
+                    classifier_info["minSize"] = tuple(preset["minSize"])
+        except (OSError, ValueError, TypeError) as e: # Fehlerbehandlung
+            print(f"Fehler beim Laden der Presets: {e}")
+
     # Aktualisiert die Parameter des benutzerdefinierten Klassifizierers.
     def update_scaleFactor(self, value):
         """
@@ -116,7 +203,9 @@ class ClassifierManager:
         try:
             file_path = self.file_manager.open_file_classifier()
             if file_path:
-                self.face_cascade = cv2.CascadeClassifier(file_path)
+                key, cascade = self.registry.acquire(file_path) # Lädt die Datei (bzw. nutzt die bereits geladene Instanz)
+                self.registry.release(key, cascade)
+                self.cascade_path = file_path # Atomarer Wechsel des aktiven Klassifizierers
                 self.custom_classifier_name = file_path.split("/")[-1]
             else:
                 if hasattr(self, 'custom_classifier_name'):
@@ -148,13 +237,17 @@ class ClassifierManager:
             classifier_path = cv2.data.haarcascades + classifier_info["file"]
             print(f"Lade Klassifizierer '{classifier_info['file']}'...")
 
-            # Versuchen, den Klassifizierer zu laden
-        
-            self.face_cascade = cv2.CascadeClassifier(classifier_path)
+            # Versuchen, den Klassifizierer zu laden (vorgeladene Instanzen werden aus der Registry übernommen)
+            if not os.path.exists(classifier_path):
+                raise cv2.error(f"Datei '{classifier_path}' nicht gefunden")
+            if not self.registry.is_loaded(classifier_path):
+                key, cascade = self.registry.acquire(classifier_path)
+                self.registry.release(key, cascade)
+            self.cascade_path = classifier_path # Atomarer Wechsel des aktiven Klassifizierers
             self.current_classifier = classifier_id
     
         except cv2.error as e:
-            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+            self.cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
             self.current_classifier = "face"
             print(f"Laden des Klassifizierers '{classifier_info['file']}' fehlgeschlagen")
             return "Laden fehlgeschlagen! Standard wird zurückgesetzt"
@@ -165,28 +258,194 @@ class ClassifierManager:
 
 
 
+    # Liefert den Pfad der XML-Datei eines Klassifizierers.
+    def get_classifier_path(self, classifier_id):
+        """
+        Liefert den Pfad der XML-Datei eines Klassifizierers.
+        :param classifier_id: ID des Klassifizierers (z. B. "face"). Für "custom" wird der geladene Klassifizierer verwendet.
+        :return: Pfad zur XML-Datei.
+        """
+        classifier_info = self.classifiers[classifier_id]
+        if classifier_id == "custom" or not classifier_info["file"]:
+            return self.cascade_path
+        return cv2.data.haarcascades + classifier_info["file"]
+
+
+    # Liefert einen Schlüssel, der Klassifizierer und Parameter eindeutig beschreibt.
+    def get_classifier_key(self, classifier_id):
+        """
+        Liefert einen Schlüssel, der Klassifizierer und Parameter eindeutig beschreibt.
+        :param classifier_id: ID des Klassifizierers oder "multi" für den Mehrfach-Modus.
+        :return: Tupel (classifier_id, Pfad, scaleFactor, minNeighbors, minSize) bzw. Tupel dieser Schlüssel im Mehrfach-Modus.
+        """
+        if classifier_id == "multi":
+            return tuple(self.get_classifier_key(child_id) for child_id in self.multi_classifiers)
+        classifier_info = self.classifiers[classifier_id]
+        cascade_path = self.cascade_path if classifier_id == self.current_classifier else self.get_classifier_path(classifier_id)
+        return (classifier_id, cascade_path, classifier_info["scaleFactor"],
+                classifier_info["minNeighbors"], tuple(classifier_info["minSize"]))
+
+
+    # Berechnet einen Hash über den Bildinhalt.
+    @staticmethod
+    def image_hash(image):
+        """
+        Berechnet einen Hash über den Bildinhalt (inkl. Größe und Datentyp).
+        :param image: NumPy-Array des Bildes.
+        :return: Hash als Hex-String.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{image.shape}{image.dtype}".encode())
+        digest.update(image.data if image.flags["C_CONTIGUOUS"] else image.tobytes())
+        return digest.hexdigest()
+
+
+    # Erkennt Objekte in einem statischen Bild und speichert das Ergebnis zwischen.
+    def detect_objects_cached(self, frame, classifier_id = "face", image_key = None, cached_only = False):
+        """
+        Erkennt Objekte in einem statischen Bild und speichert das Ergebnis zwischen.
+        Eine erneute Erkennung findet nur statt, wenn sich Bild, Klassifizierer oder Parameter ändern.
+        :param frame: Frame, in dem Objekte erkannt werden sollen.
+        :param classifier_id: ID des Klassifizierers oder "multi" für den Mehrfach-Modus.
+        :param image_key: Vorberechneter Hash des Bildes (siehe image_hash), sonst wird er hier berechnet.
+        :param cached_only: Wenn True, wird nur im Cache nachgesehen (z. B. im GUI-Thread, die Erkennung läuft dann im Hintergrund).
+        :return: Dictionary {classifier_id: erkannte Objekte} (siehe detect_objects) oder None, falls cached_only und kein Ergebnis vorliegt.
+        """
+        if image_key is None:
+            image_key = self.image_hash(frame)
+        key = (image_key,) + self.get_classifier_key(classifier_id)
+
+        with self.detection_cache_lock:
+            if key in self.detection_cache:
+                self.detection_cache.move_to_end(key) # Zuletzt verwendet
+                return self.detection_cache[key]
+        if cached_only:
+            return None
+
+        objects = self.detect_objects(frame, classifier_id, tiled=True) # Große Bilder in Kacheln auf allen Kernen
+        if all(boxes is not None for boxes in objects.values()): # Fehler werden nicht zwischengespeichert
+            with self.detection_cache_lock:
+                self.detection_cache[key] = objects
+                if len(self.detection_cache) > self.detection_cache_size:
+                    self.detection_cache.popitem(last=False) # Ältesten Eintrag entfernen
+        return objects
+
+
     # Trainiert einen benutzerdefinierten Haar-Cascade Klassifizierer.
-    def train_classifier(self):
-        pass
+    def train_classifier(self, positive_dir=None, negative_dir=None, output_path=None, **options):
+        """
+        Trainiert einen benutzerdefinierten Haar-Cascade Klassifizierer (siehe haartrainer.py) und lädt ihn als aktiven Klassifizierer.
+        Fehlende Pfade werden über Dialoge abgefragt (nur im GUI-Thread). Das Training kann mehrere Minuten dauern.
+        :param positive_dir: Verzeichnis mit zugeschnittenen Objektbildern.
+        :param negative_dir: Verzeichnis mit Hintergrundbildern ohne Objekte.
+        :param output_path: Pfad der XML-Datei (ein vorhandener Checkpoint wird fortgesetzt).
+        :param options: Weitere Parameter für haartrainer.train_cascade (z. B. num_stages, width, height, mirror).
+        :return: Name des trainierten Klassifizierers oder eine Fehlermeldung.
+        """
+        try:
+            positive_dir = positive_dir or self.file_manager.open_directory("Verzeichnis mit Objektbildern auswählen")
+            negative_dir = negative_dir or self.file_manager.open_directory("Verzeichnis mit Hintergrundbildern auswählen")
+            output_path = output_path or self.file_manager.choose_classifier_path()
+            if not positive_dir or not negative_dir or not output_path:
+                return "Training abgebrochen"
+
+            from haartrainer import train_cascade # Erst bei Bedarf laden (haartrainer importiert diesen Manager)
+            if not train_cascade(positive_dir, negative_dir, output_path, **options):
+                return "Training fehlgeschlagen"
+            key, cascade = self.registry.acquire(output_path) # Lädt die neue Datei (Schlüssel enthält mtime)
+            self.registry.release(key, cascade)
+            self.cascade_path = output_path # Atomarer Wechsel des aktiven Klassifizierers
+            self.custom_classifier_name = output_path.replace("\\", "/").split("/")[-1]
+            return self.custom_classifier_name
+        except Exception as e: # Fehlerbehandlung
+            print(f"Fehler beim Trainieren des Klassifizierers: {e}")
+            return "Training fehlgeschlagen"
 
 
     # Erkennt Objekte in einem gegebenen Frame.
-    def detect_faces(self, frame, classifier_id = "face"):
+    def detect_faces(self, frame, classifier_id = "face", cascade = None, scale = 1.0, tiled = False):
         """
         Erkennt Objekte in einem gegebenen Frame.
         :param frame: Frame, in dem Objekte erkannt werden sollen.
         :param classifier_id: ID des Klassifizierers, der verwendet werden soll.
+        :param cascade: Zu verwendende Klassifizierer-Instanz (Standard: aktiver Klassifizierer aus der Registry).
+        :param scale: Skalierungsfaktor für die Erkennung (< 1.0 = verkleinertes Graustufenbild, Boxen werden zurückgerechnet).
+        :param tiled: Wenn True, werden große Bilder in Kacheln parallel bearbeitet (siehe detect_tiled, cascade wird ignoriert).
+        :return: Array der erkannten Objekte (N, 4) mit Boxen (x, y, w, h) in Koordinaten des Frames oder None, falls ein Fehler auftritt
+        """
+
+        try:
+            gray = self.downscale(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), scale)
+            if tiled:
+                objects = self.detect_tiled(gray, classifier_id, min_size=self.get_min_size(classifier_id, scale))
+            else:
+                objects = self.detect_gray(gray, classifier_id, cascade=cascade, min_size=self.get_min_size(classifier_id, scale))
+            if objects is None:
+                return None
+            # Einheitlich als Array (N, 4), unabhängig von Skalierung und Kachelung; Boxen in Koordinaten des Frames umrechnen
+            objects = np.asarray(objects, dtype=np.float64).reshape(-1, 4)
+            return np.round(objects / min(scale, 1.0)).astype(np.int32)
+        
+        except cv2.error as e:
+            #print(f"Fehler beim Erkennen von Objekten: {e}")
+            return None
+
+
+    # Verkleinert ein Graustufenbild für die Erkennung.
+    @staticmethod
+    def downscale(gray, scale):
+        """
+        Verkleinert ein Graustufenbild für die Erkennung.
+        :param gray: Graustufenbild.
+        :param scale: Skalierungsfaktor (>= 1.0 = unverändert).
+        :return: Verkleinertes Graustufenbild.
+        """
+        if scale >= 1.0:
+            return gray
+        height, width = gray.shape[:2]
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+    # Liefert minSize eines Klassifizierers für einen Skalierungsfaktor.
+    def get_min_size(self, classifier_id, scale = 1.0):
+        """
+        Liefert minSize eines Klassifizierers, umgerechnet auf ein mit scale verkleinertes Bild.
+        :param classifier_id: ID des Klassifizierers.
+        :param scale: Skalierungsfaktor des Bildes.
+        :return: Tupel (Breite, Höhe).
+        """
+        min_w, min_h = self.classifiers[classifier_id]["minSize"]
+        if scale >= 1.0:
+            return (min_w, min_h)
+        return (max(1, int(round(min_w * scale))), max(1, int(round(min_h * scale))))
+
+
+    # Erkennt Objekte in einem bereits in Graustufen umgewandelten Bild.
+    def detect_gray(self, gray, classifier_id = "face", cascade_path = None, cascade = None, min_size = None, max_size = None):
+        """
+        Erkennt Objekte in einem bereits in Graustufen umgewandelten Bild.
+        :param gray: Graustufenbild.
+        :param classifier_id: ID des Klassifizierers, dessen Parameter verwendet werden.
+        :param cascade_path: Pfad des Klassifizierers (Standard: aktiver Klassifizierer).
+        :param cascade: Zu verwendende Klassifizierer-Instanz (überschreibt cascade_path).
+        :param min_size: Überschreibt minSize des Klassifizierers (z. B. beim Tracking).
+        :param max_size: Maximale Objektgröße (Standard: keine Begrenzung).
         :return: Liste der erkannten Objekte oder None, falls ein Fehler auftritt
         """
 
+        key = None
         try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if cascade is None:
+                key, cascade = self.registry.acquire(cascade_path or self.cascade_path) # Eigene Instanz je Aufruf, daher threadsicher
             classifier_info = self.classifiers[classifier_id]
-            objects = self.face_cascade.detectMultiScale(
+            size_limits = {"maxSize": max_size} if max_size else {} # Ohne Angabe keine Begrenzung der Objektgröße
+            objects = cascade.detectMultiScale(
                 gray, 
                 scaleFactor=classifier_info["scaleFactor"], 
                 minNeighbors=classifier_info["minNeighbors"], 
-                minSize=classifier_info["minSize"]
+                minSize=min_size or classifier_info["minSize"],
+                **size_limits
             )
             #print(f"{classifier_info['scaleFactor']}, {classifier_info['minNeighbors']}, {classifier_info['minSize']}")
             return objects
@@ -194,6 +453,186 @@ class ClassifierManager:
         except cv2.error as e:
             #print(f"Fehler beim Erkennen von Objekten: {e}")
             return None
-        
-        
+        finally:
+            if key is not None:
+                self.registry.release(key, cascade)
+
 
+    # Liefert die Fenstergröße (Trainingsgröße) eines Klassifizierers.
+    def get_window_size(self, cascade_path = None):
+        """
+        Liefert die Fenstergröße (Trainingsgröße) eines Klassifizierers; kleiner sucht detectMultiScale nie.
+        :param cascade_path: Pfad des Klassifizierers (Standard: aktiver Klassifizierer).
+        :return: Tupel (Breite, Höhe).
+        """
+        key, cascade = self.registry.acquire(cascade_path or self.cascade_path)
+        try:
+            return tuple(int(v) for v in cascade.getOriginalWindowSize())
+        finally:
+            self.registry.release(key, cascade)
+
+
+    # Erkennt Objekte in einem großen Graustufenbild in überlappenden Kacheln parallel.
+    def detect_tiled(self, gray, classifier_id = "face", cascade_path = None, min_size = None):
+        """
+        Erkennt Objekte in einem großen Graustufenbild in überlappenden Kacheln parallel (ein Thread je Kern,
+        detectMultiScale gibt den GIL frei). Kleine Bilder werden wie bei detect_gray in einem Durchlauf bearbeitet.
+        Die Kacheln suchen Objekte von minSize (mindestens Fenstergröße) bis tile_size_range × minSize und überlappen
+        um diese Größe plus zwei Ränder; Boxen am Rand zu einer Nachbarkachel werden verworfen, weil das Objekt dort
+        vollständig enthalten ist. Größere Objekte sucht ein Durchlauf über das um tile_size_range verkleinerte Bild
+        (bei Bedarf selbst wieder in Kacheln). Doppelte Boxen aus den Überlappungen entfernt suppress_overlaps.
+        :param gray: Graustufenbild.
+        :param classifier_id: ID des Klassifizierers, dessen Parameter verwendet werden.
+        :param cascade_path: Pfad des Klassifizierers (Standard: aktiver Klassifizierer).
+        :param min_size: Überschreibt minSize des Klassifizierers.
+        :return: Liste der Boxen (x, y, w, h) oder None, falls ein Fehler auftritt
+        """
+        cascade_path = cascade_path or self.cascade_path
+        height, width = gray.shape[:2]
+        if width * height <= 4 * self.tile_size ** 2: # Kacheln lohnen sich erst ab etwa 4 Kacheln
+            objects = self.detect_gray(gray, classifier_id, cascade_path, min_size=min_size)
+            return [tuple(int(v) for v in box) for box in objects] if objects is not None else None
+
+        try:
+            window_w, window_h = self.get_window_size(cascade_path)
+        except cv2.error:
+            return None
+        min_w, min_h = min_size or self.classifiers[classifier_id]["minSize"]
+        min_w, min_h = max(min_w, window_w), max(min_h, window_h)
+        max_w, max_h = min_w * self.tile_size_range, min_h * self.tile_size_range # Größte Objekte in den Kacheln
+        margin_x, margin_y = min_w // 2 + 1, min_h // 2 + 1 # Boxen so nah an einer inneren Kante gehören zur Nachbarkachel
+        overlap_x, overlap_y = max_w + 2 * margin_x, max_h + 2 * margin_y
+
+        with self.multi_lock:
+            if self.tile_executor is None:
+                self.tile_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="TileCascade")
+
+        pending = []
+        for y0 in range(0, max(1, height - overlap_y), self.tile_size):
+            for x0 in range(0, max(1, width - overlap_x), self.tile_size):
+                x1, y1 = min(x0 + self.tile_size + overlap_x, width), min(y0 + self.tile_size + overlap_y, height)
+                future = self.tile_executor.submit(self.detect_gray, gray[y0:y1, x0:x1], classifier_id, cascade_path,
+                                                   min_size=(min_w, min_h), max_size=(max_w, max_h))
+                pending.append((x0, y0, x1, y1, future))
+
+        # Große Objekte im aufrufenden Thread, während die Kacheln laufen (Objekte ab max_w sind dort mindestens min_w groß)
+        small = self.downscale(gray, 1 / self.tile_size_range)
+        coarse = self.detect_tiled(small, classifier_id, cascade_path, (min_w, min_h))
+        if coarse is None:
+            return None
+        factor_x, factor_y = width / small.shape[1], height / small.shape[0] # Boxen in Koordinaten des Bildes umrechnen
+        boxes = [(int(round(x * factor_x)), int(round(y * factor_y)), int(round(w * factor_x)), int(round(h * factor_y)))
+                 for (x, y, w, h) in coarse]
+
+        for x0, y0, x1, y1, future in pending:
+            objects = future.result()
+            if objects is None:
+                return None
+            for (x, y, w, h) in objects:
+                if (x0 > 0 and x < margin_x) or (y0 > 0 and y < margin_y) or \
+                   (x1 < width and x + w > x1 - x0 - margin_x) or (y1 < height and y + h > y1 - y0 - margin_y):
+                    continue # Objekt liegt vollständig in der Nachbarkachel
+                boxes.append((int(x) + x0, int(y) + y0, int(w), int(h)))
+        return self.suppress_overlaps(boxes)
+
+
+    # Entfernt doppelte Boxen (Non-Maximum Suppression).
+    @staticmethod
+    def suppress_overlaps(boxes, iou_threshold = 0.5):
+        """
+        Entfernt doppelte Boxen (Non-Maximum Suppression ohne Konfidenz): größere Boxen zuerst, Boxen mit einer
+        Überlappung (IoU) über iou_threshold zu einer bereits behaltenen Box werden verworfen.
+        :param boxes: Liste der Boxen (x, y, w, h).
+        :param iou_threshold: Schwelle für die Überlappung (Intersection over Union).
+        :return: Liste der behaltenen Boxen.
+        """
+        if len(boxes) < 2:
+            return list(boxes)
+        array = np.array(boxes, dtype=np.float64)
+        x0, y0 = array[:, 0], array[:, 1]
+        x1, y1 = x0 + array[:, 2], y0 + array[:, 3]
+        areas = array[:, 2] * array[:, 3]
+        order = np.argsort(-areas, kind="stable")
+        keep = []
+        while order.size:
+            i = order[0]
+            keep.append(i)
+            rest = order[1:]
+            inter_w = np.clip(np.minimum(x1[i], x1[rest]) - np.maximum(x0[i], x0[rest]), 0, None)
+            inter_h = np.clip(np.minimum(y1[i], y1[rest]) - np.maximum(y0[i], y0[rest]), 0, None)
+            inter = inter_w * inter_h
+            order = rest[inter / (areas[i] + areas[rest] - inter) <= iou_threshold]
+        return [boxes[i] for i in sorted(keep)]
+
+
+    # Erkennt Objekte mit dem angegebenen Klassifizierer oder im Mehrfach-Modus.
+    def detect_objects(self, frame, classifier_id = "face", scale = 1.0, tiled = False):
+        """
+        Erkennt Objekte mit dem angegebenen Klassifizierer oder im Mehrfach-Modus.
+        :param frame: Frame im BGR-Format.
+        :param classifier_id: ID des Klassifizierers oder "multi" für den Mehrfach-Modus (siehe detect_multi).
+        :param scale: Skalierungsfaktor für die Erkennung (siehe detect_faces).
+        :param tiled: Wenn True, werden große Bilder in Kacheln parallel bearbeitet (siehe detect_tiled).
+        :return: Dictionary {classifier_id: erkannte Objekte}.
+        """
+        if classifier_id == "multi":
+            return self.detect_multi(frame, self.multi_classifiers, scale, tiled)
+        return {classifier_id: self.detect_faces(frame, classifier_id, scale=scale, tiled=tiled)}
+
+
+    # Erkennt Objekte mit mehreren Klassifizierern in einem Durchlauf.
+    def detect_multi(self, frame, classifier_ids, scale = 1.0, tiled = False):
+        """
+        Erkennt Objekte mit mehreren Klassifizierern in einem Durchlauf.
+        Das Graustufenbild wird nur einmal berechnet. Klassifizierer ohne Eltern laufen parallel über das ganze Bild,
+        Kind-Klassifizierer (z. B. "eye", "smile") nur innerhalb der Boxen ihres Eltern-Klassifizierers (z. B. "face").
+        :param frame: Frame im BGR-Format.
+        :param classifier_ids: Liste der IDs der zu verwendenden Klassifizierer.
+        :param scale: Skalierungsfaktor für die Erkennung (siehe detect_faces).
+        :param tiled: Wenn True, bearbeiten die Klassifizierer ohne Eltern große Bilder in Kacheln (siehe detect_tiled).
+        :return: Dictionary {classifier_id: Liste der Boxen (x, y, w, h) im Koordinatensystem des Frames}.
+        """
+        results = {classifier_id: [] for classifier_id in classifier_ids}
+        try:
+            gray = self.downscale(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), scale)
+            with self.multi_lock:
+                if self.multi_executor is None:
+                    self.multi_executor = ThreadPoolExecutor(max_workers=max(2, min(8, os.cpu_count() or 2)), thread_name_prefix="MultiCascade")
+
+            # Klassifizierer ohne (ausgewählten) Eltern-Klassifizierer: parallel über das ganze Bild
+            roots = [c for c in classifier_ids if self.parent_classifiers.get(c) not in classifier_ids]
+            detect_root = self.detect_tiled if tiled else self.detect_gray
+            futures = {c: self.multi_executor.submit(detect_root, gray, c, self.get_classifier_path(c),
+                                                     min_size=self.get_min_size(c, scale)) for c in roots}
+            for classifier_id, future in futures.items():
+                objects = future.result()
+                results[classifier_id] = [tuple(int(v) for v in box) for box in objects] if objects is not None else []
+
+            # Kind-Klassifizierer: nur innerhalb der Eltern-Boxen (ROI), alle ROIs parallel
+            children = [c for c in classifier_ids if c not in roots]
+            pending = []
+            for classifier_id in children:
+                min_size = self.get_min_size(classifier_id, scale)
+                min_w, min_h = min_size
+                rx, ry, rw, rh = self.roi_regions.get(classifier_id, (0.0, 0.0, 1.0, 1.0))
+                for (x, y, w, h) in results[self.parent_classifiers[classifier_id]]:
+                    x0, y0 = x + int(rx * w), y + int(ry * h)
+                    x1, y1 = min(x0 + int(rw * w), gray.shape[1]), min(y0 + int(rh * h), gray.shape[0])
+                    if x1 - x0 < min_w or y1 - y0 < min_h: # ROI kleiner als minSize
+                        continue
+                    roi = gray[y0:y1, x0:x1]
+                    future = self.multi_executor.submit(self.detect_gray, roi, classifier_id, self.get_classifier_path(classifier_id),
+                                                        min_size=min_size)
+                    pending.append((classifier_id, x0, y0, future))
+
+            for classifier_id, x0, y0, future in pending:
+                objects = future.result()
+                if objects is not None:
+                    results[classifier_id].extend((int(x) + x0, int(y) + y0, int(w), int(h)) for (x, y, w, h) in objects)
+
+            if scale < 1.0: # Boxen in Koordinaten des Frames umrechnen
+                results = {c: [tuple(int(round(v / scale)) for v in box) for box in boxes] for c, boxes in results.items()}
+
+        except cv2.error as e:
+            print(f"Fehler bei der Erkennung mit mehreren Klassifizierern: {e}")
+        return results
@@ -0,0 +1,195 @@
+import json
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+# Festes Binärformat: ein Datensatz je Box (Frames ohne Objekte als Datensatz mit w = h = 0)
+DETECTION_DTYPE = np.dtype([
+    ("frame", "<u8"), # Fortlaufende Nummer des Frames
+    ("timestamp", "<f8"), # Zeitpunkt (Unix-Zeit in Sekunden)
+    ("source", "<u2"), # ID der Quelle (0 im Einzelmodus)
+    ("classifier", "S16"), # ID des Klassifizierers
+    ("scale_factor", "<f4"),
+    ("min_neighbors", "<u2"),
+    ("min_size", "<u2"),
+    ("x", "<i4"), ("y", "<i4"), ("w", "<i4"), ("h", "<i4")
+])
+NPY_HEADER_SIZE = 512 # Feste Headergröße, damit die Anzahl der Datensätze im Header nachträglich aktualisiert werden kann
+
+
+# Klasse zum Protokollieren der Erkennungen in Dateien (JSONL oder NumPy) in einem eigenen Thread.
+class DetectionLogWriter:
+    """
+    Klasse zum Protokollieren der Erkennungen (Frame, Zeit, Klassifizierer, Parameter, Boxen) in Dateien.
+    log() legt die Einträge nur in eine Warteschlange und blockiert nicht; ein eigener Thread schreibt sie gesammelt.
+    Formate: "jsonl" (eine Zeile je Frame) oder "npy" (ein Datensatz fester Breite je Box, siehe DETECTION_DTYPE,
+    lesbar mit np.load(path, mmap_mode="r")). Überschreitet eine Datei max_bytes, wird eine neue begonnen.
+    Vorhandene Dateien werden in beiden Formaten weder überschrieben noch fortgesetzt, sondern die nächste freie Nummer verwendet.
+    """
+
+    # Initialisiert den Writer und startet den Schreib-Thread.
+    def __init__(self, file_path, log_format=None, max_bytes=100 * 1024 * 1024, batch_size=256, flush_interval=1.0, max_queue=10000):
+        """
+        Initialisiert den Writer und startet den Schreib-Thread.
+        :param file_path: Pfad der ersten Datei, weitere Dateien erhalten die Endung _0001, _0002, ...
+        :param log_format: "jsonl" oder "npy" (Standard: anhand der Dateiendung).
+        :param max_bytes: Maximale Dateigröße, danach wird eine neue Datei begonnen.
+        :param batch_size: Maximale Anzahl der Einträge je Schreibvorgang.
+        :param flush_interval: Maximale Zeit in Sekunden, bis gesammelte Einträge geschrieben werden.
+        :param max_queue: Maximale Anzahl wartender Einträge (weitere werden verworfen und gezählt).
+        """
+        try:
+            if log_format is None:
+                log_format = "npy" if file_path.lower().endswith(".npy") else "jsonl"
+            self.log_format = log_format
+            self.base_path, self.extension = os.path.splitext(file_path)
+            self.extension = self.extension or "." + log_format
+            self.max_bytes = max_bytes
+            self.batch_size = max(1, batch_size)
+            self.flush_interval = flush_interval
+            self.queue = queue.Queue(maxsize=max_queue)
+            self.file = None # Aktuelle Datei
+            self.file_index = 0 # Nummer der aktuellen Datei (für die Rotation)
+            self.records = 0 # Anzahl der Datensätze in der aktuellen NumPy-Datei
+            self.written = 0 # Anzahl geschriebener Frames
+            self.dropped = 0 # Anzahl verworfener Frames (Warteschlange voll)
+            self.running = True
+            self.thread = threading.Thread(target=self._write_loop, name="DetectionLogWriter", daemon=True)
+            self.thread.start()
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Erkennungs-Logs")
+
+
+    # Übergibt die Erkennungen eines Frames an den Schreib-Thread.
+    def log(self, frame_index, detections, parameters, timestamp=None, source=0):
+        """
+        Übergibt die Erkennungen eines Frames an den Schreib-Thread (blockiert nicht).
+        :param frame_index: Fortlaufende Nummer des Frames.
+        :param detections: Dictionary {classifier_id: Boxen (x, y, w, h)}.
+        :param parameters: Dictionary {classifier_id: {"scaleFactor", "minNeighbors", "minSize"}}.
+        :param timestamp: Aufnahmezeitpunkt des Frames als Unix-Zeit (Standard: Zeitpunkt des Aufrufs).
+        :param source: ID der Quelle.
+        :return: True, wenn der Eintrag angenommen wurde, sonst False.
+        """
+        entry = (int(frame_index), time.time() if timestamp is None else timestamp, int(source),
+                 {classifier_id: [[int(v) for v in box] for box in boxes] if boxes is not None else []
+                  for classifier_id, boxes in detections.items()},
+                 parameters)
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+
+    # Schleife des Schreib-Threads.
+    def _write_loop(self):
+        """
+        Sammelt Einträge bis batch_size erreicht oder flush_interval abgelaufen ist und schreibt sie gemeinsam.
+        """
+        while self.running or not self.queue.empty():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e: # Fehlerbehandlung
+                    print(f"Fehler beim Schreiben des Erkennungs-Logs: {e}")
+        self._close_file()
+
+
+    # Öffnet die nächste Datei.
+    def _open_file(self):
+        """
+        Öffnet die nächste Datei (erste Datei unter dem angegebenen Namen, weitere mit fortlaufender Nummer).
+        Existiert die Datei bereits, wird die nächste freie Nummer verwendet (gleiche Regel für JSONL und NumPy).
+        """
+        while True:
+            suffix = f"_{self.file_index:04d}" if self.file_index else ""
+            path = f"{self.base_path}{suffix}{self.extension}"
+            self.file_index += 1
+            if not os.path.exists(path):
+                break
+        if self.log_format == "npy":
+            self.file = open(path, "w+b")
+            self.records = 0
+            self._write_npy_header()
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+        print(f"Erkennungs-Log: {path}")
+
+
+    # Schreibt bzw. aktualisiert den Header der NumPy-Datei.
+    def _write_npy_header(self):
+        """
+        Schreibt den Header der NumPy-Datei (Format 1.0) mit der aktuellen Anzahl der Datensätze.
+        Der Header wird auf NPY_HEADER_SIZE Bytes aufgefüllt und kann daher überschrieben werden.
+        """
+        header = "{'descr': %s, 'fortran_order': False, 'shape': (%d,), }" % (
+            repr(np.lib.format.dtype_to_descr(DETECTION_DTYPE)), self.records)
+        header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + "\n" # 10 Bytes: Magic-String, Version, Headerlänge
+        position = self.file.tell()
+        self.file.seek(0)
+        self.file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+        self.file.seek(max(position, NPY_HEADER_SIZE))
+
+
+    # Schreibt gesammelte Einträge.
+    def _write_batch(self, batch):
+        """
+        Schreibt gesammelte Einträge in die aktuelle Datei und beginnt bei Bedarf eine neue Datei.
+        """
+        if self.file is None or self.file.tell() >= self.max_bytes:
+            self._close_file()
+            self._open_file()
+
+        if self.log_format == "npy":
+            rows = []
+            for frame_index, timestamp, source, detections, parameters in batch:
+                if not any(detections.values()):
+                    rows.append((frame_index, timestamp, source, b"", 0, 0, 0, 0, 0, 0, 0)) # Frame ohne Objekte
+                for classifier_id, boxes in detections.items():
+                    params = parameters.get(classifier_id, {})
+                    for x, y, w, h in boxes:
+                        rows.append((frame_index, timestamp, source, classifier_id.encode()[:16],
+                                     params.get("scaleFactor", 0), params.get("minNeighbors", 0), params.get("minSize", (0, 0))[0],
+                                     x, y, w, h))
+            self.file.write(np.array(rows, dtype=DETECTION_DTYPE).tobytes())
+            self.records += len(rows)
+            self._write_npy_header() # Datei bleibt jederzeit mit np.load lesbar
+        else:
+            lines = [json.dumps({"frame": frame_index, "timestamp": round(timestamp, 6), "source": source,
+                                 "objects": detections, "parameters": parameters}) for frame_index, timestamp, source, detections, parameters in batch]
+            self.file.write("\n".join(lines) + "\n")
+        self.file.flush()
+        self.written += len(batch)
+
+
+    # Schließt die aktuelle Datei.
+    def _close_file(self):
+        """
+        Schließt die aktuelle Datei.
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+    # Beendet den Schreib-Thread, nachdem alle wartenden Einträge geschrieben wurden.
+    def close(self, timeout=5.0):
+        """
+        Beendet den Schreib-Thread, nachdem alle wartenden Einträge geschrieben wurden.
+        :param timeout: Maximale Wartezeit in Sekunden.
+        """
+        self.running = False
+        self.thread.join(timeout=timeout)
+        if self.dropped:
+            print(f"Erkennungs-Log: {self.dropped} Frames verworfen (Warteschlange voll)")
@@ -0,0 +1,331 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Klasse für die asynchrone Objekterkennung in einem Pool von Worker-Threads.
+class DetectionPool:
+    """
+    Klasse für die asynchrone Objekterkennung in einem Pool von Worker-Threads.
+    Es werden höchstens max_in_flight Frames gleichzeitig bearbeitet, weitere Frames werden verworfen,
+    solange die Erkennung nicht hinterherkommt. OpenCV gibt während detectMultiScale den GIL frei,
+    daher laufen die Worker-Threads tatsächlich parallel.
+    """
+
+    # Initialisiert den Detection-Pool.
+    def __init__(self, detect_function, num_workers=2, max_in_flight=2):
+        """
+        Initialisiert den Detection-Pool.
+        :param detect_function: Funktion detect_function(frame, *args), die im Worker-Thread ausgeführt wird und die erkannten Objekte liefert
+                                (None = Ergebnis verwerfen, z. B. weil bereits ein neuerer Frame ausgewertet wurde).
+        :param num_workers: Anzahl der Worker-Threads.
+        :param max_in_flight: Maximale Anzahl gleichzeitig bearbeiteter Frames (Backpressure).
+        """
+        try:
+            self.detect_function = detect_function
+            self.num_workers = max(1, num_workers)
+            self.max_in_flight = max(1, max_in_flight)
+            self.executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="DetectionWorker")
+            self.lock = threading.Lock() # Schützt Zähler und Ergebnis
+            self.in_flight = 0 # Anzahl der Frames in Bearbeitung
+            self.dropped_frames = 0 # Anzahl verworfener Frames
+            self.completed = 0 # Anzahl abgeschlossener Erkennungen (für die Verarbeitungsrate)
+            self.latest_result = None # Tupel (sequence, objects, detection_time) des neuesten Ergebnisses
+            self.generation = 0 # Wird bei reset() erhöht, damit Ergebnisse alter Aufträge ignoriert werden
+            self.result_callback = None # Optionale Funktion result_callback(sequence, objects, detection_time, context) je Ergebnis (im Worker-Thread)
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Detection-Pools")
+
+
+    # Übergibt einen Frame zur Objekterkennung.
+    def submit(self, frame, sequence, *args, context=None):
+        """
+        Übergibt einen Frame zur Objekterkennung, sofern die maximale Anzahl an Frames in Bearbeitung nicht erreicht ist.
+        :param frame: Frame, in dem Objekte erkannt werden sollen.
+        :param sequence: Fortlaufende Nummer des Frames (ältere Ergebnisse überschreiben keine neueren).
+        :param args: Weitere Argumente für detect_function.
+        :param context: Optionale Daten des Frames (z. B. Aufnahmezeitpunkt), die unverändert an result_callback gehen.
+        :return: Future des Auftrags oder None, falls der Frame verworfen wurde.
+        """
+        with self.lock:
+            if self.in_flight >= self.max_in_flight:
+                self.dropped_frames += 1
+                return None
+            self.in_flight += 1
+            generation = self.generation
+
+        try:
+            future = self.executor.submit(self._run, frame, sequence, generation, args, context)
+        except RuntimeError as e: # Pool wurde bereits beendet
+            with self.lock:
+                self.in_flight -= 1
+            return None
+        future.add_done_callback(self._on_done)
+        return future
+
+
+    # Führt die Objekterkennung im Worker-Thread aus.
+    def _run(self, frame, sequence, generation, args, context):
+        """
+        Führt die Objekterkennung im Worker-Thread aus und misst die Dauer.
+        :return: Tupel (generation, (sequence, objects, detection_time), context); objects ist None, wenn das Ergebnis verworfen wird.
+        """
+        start = time.perf_counter()
+        objects = self.detect_function(frame, *args)
+        return generation, (sequence, objects, time.perf_counter() - start), context
+
+
+    # Wird aufgerufen, sobald ein Auftrag beendet ist.
+    def _on_done(self, future):
+        """
+        Übernimmt das Ergebnis eines beendeten Auftrags, sofern es neuer ist als das bisherige.
+        """
+        with self.lock:
+            self.in_flight -= 1
+        if future.cancelled(): # Auftrag wurde beim Beenden des Pools verworfen
+            return
+        try:
+            generation, result, context = future.result()
+        except Exception as e: # Fehlerbehandlung
+            print(f"Fehler bei der Objekterkennung im Worker: {e}")
+            return
+        with self.lock:
+            if generation != self.generation or result[1] is None: # Ergebnis stammt aus der Zeit vor reset() bzw. ist überholt
+                return
+            self.completed += 1
+            if self.latest_result is None or result[0] > self.latest_result[0]:
+                self.latest_result = result
+        if self.result_callback is not None:
+            self.result_callback(*result, context)
+
+
+    # Gibt zurück, ob ein weiterer Frame angenommen würde.
+    def has_capacity(self):
+        """
+        Gibt zurück, ob ein weiterer Frame angenommen würde (z. B. um bei Videodateien keine Frames zu verwerfen).
+        :return: True, wenn weniger als max_in_flight Frames in Bearbeitung sind.
+        """
+        with self.lock:
+            return self.in_flight < self.max_in_flight
+
+
+    # Liefert das neueste Ergebnis, ohne zu blockieren.
+    def get_latest_result(self):
+        """
+        Liefert das neueste Ergebnis der Objekterkennung, ohne zu blockieren.
+        :return: Tupel (sequence, objects, detection_time) oder None, falls noch kein Ergebnis vorliegt.
+        """
+        with self.lock:
+            return self.latest_result
+
+
+    # Setzt das gespeicherte Ergebnis zurück (z. B. beim Stoppen der Kamera).
+    def reset(self):
+        """
+        Setzt das gespeicherte Ergebnis und die Zähler zurück.
+        """
+        with self.lock:
+            self.generation += 1
+            self.latest_result = None
+            self.dropped_frames = 0
+            self.completed = 0
+
+
+    # Beendet den Pool.
+    def shutdown(self):
+        """
+        Beendet den Pool, ohne auf laufende Aufträge zu warten.
+        """
+        try:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Beenden des Detection-Pools")
+
+
+# Klasse für die gemeinsame Objekterkennung mehrerer Quellen mit fairer Verteilung der Worker-Threads.
+class FairDetectionPool:
+    """
+    Klasse für die gemeinsame Objekterkennung mehrerer Quellen (Kameras, Videos) mit fairer Verteilung der Worker-Threads.
+    Je Quelle wird nur der neueste wartende Frame gehalten (ältere werden verworfen). Die Worker-Threads bedienen
+    die Quellen reihum (Round-Robin), damit eine schnelle Quelle die anderen nicht verdrängt. Je Quelle laufen
+    höchstens so viele Erkennungen gleichzeitig, wie Worker auf die aktiven Quellen entfallen, sodass bei wenigen
+    Quellen trotzdem alle Kerne genutzt werden.
+    """
+
+    # Initialisiert den Pool und startet die Worker-Threads.
+    def __init__(self, detect_function, num_workers=None, fps_window=30):
+        """
+        Initialisiert den Pool und startet die Worker-Threads.
+        :param detect_function: Funktion detect_function(frame, *args), die im Worker-Thread ausgeführt wird und die erkannten Objekte liefert.
+        :param num_workers: Anzahl der Worker-Threads (Standard: Anzahl der Kerne).
+        :param fps_window: Anzahl der Erkennungen je Quelle, über die die Bildrate gemittelt wird.
+        """
+        try:
+            self.detect_function = detect_function
+            self.num_workers = max(1, num_workers or os.cpu_count() or 1)
+            self.fps_window = fps_window
+            self.condition = threading.Condition() # Schützt den Zustand aller Quellen, weckt wartende Worker
+            self.sources = {} # source_id -> Zustand der Quelle (siehe add_source)
+            self.order = deque() # Reihenfolge der Quellen für die Round-Robin-Verteilung
+            self.next_token = 0 # Kennung der nächsten Anmeldung (unterscheidet erneut angemeldete Quellen mit gleicher ID)
+            self.result_callback = None # Optionale Funktion result_callback(source_id, sequence, objects, detection_time, context) je Ergebnis (im Worker-Thread)
+            self.running = True
+            self.workers = [threading.Thread(target=self._worker_loop, name=f"FairDetectionWorker-{i}", daemon=True)
+                            for i in range(self.num_workers)]
+            for worker in self.workers:
+                worker.start()
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Detection-Pools")
+
+
+    # Meldet eine Quelle an.
+    def add_source(self, source_id):
+        """
+        Meldet eine Quelle an.
+        :param source_id: Eindeutige ID der Quelle.
+        """
+        with self.condition:
+            if source_id in self.sources:
+                return
+            self.next_token += 1
+            self.sources[source_id] = {
+                "token": self.next_token, # Kennung dieser Anmeldung, Aufträge früherer Anmeldungen werden ignoriert
+                "pending": None, # Neuester wartender Auftrag (frame, sequence, args, context)
+                "in_flight": 0, # Anzahl laufender Erkennungen
+                "latest_result": None, # Tupel (sequence, objects, detection_time)
+                "completed": deque(maxlen=self.fps_window), # Zeitpunkte der letzten abgeschlossenen Erkennungen
+                "dropped_frames": 0 # Anzahl verworfener (überholter) Frames
+            }
+            self.order.append(source_id)
+
+
+    # Meldet eine Quelle ab.
+    def remove_source(self, source_id):
+        """
+        Meldet eine Quelle ab, laufende Erkennungen der Quelle werden verworfen.
+        :param source_id: ID der Quelle.
+        """
+        with self.condition:
+            if self.sources.pop(source_id, None) is not None:
+                self.order.remove(source_id)
+
+
+    # Übergibt einen Frame einer Quelle zur Objekterkennung.
+    def submit(self, source_id, frame, sequence, *args, context=None):
+        """
+        Übergibt einen Frame einer Quelle zur Objekterkennung. Ein noch wartender älterer Frame der Quelle wird ersetzt.
+        :param source_id: ID der Quelle.
+        :param frame: Frame, in dem Objekte erkannt werden sollen.
+        :param sequence: Fortlaufende Nummer des Frames innerhalb der Quelle.
+        :param args: Weitere Argumente für detect_function.
+        :param context: Optionale Daten des Frames (z. B. Aufnahmezeitpunkt), die unverändert an result_callback gehen.
+        """
+        with self.condition:
+            source = self.sources.get(source_id)
+            if source is None:
+                return
+            if source["pending"] is not None:
+                source["dropped_frames"] += 1
+            source["pending"] = (frame, sequence, args, context)
+            self.condition.notify()
+
+
+    # Wählt reihum die nächste Quelle mit wartendem Frame.
+    def _next_job(self):
+        """
+        Wählt reihum die nächste Quelle mit wartendem Frame und freier Kapazität (Aufruf mit gehaltenem Lock).
+        :return: Tupel (source_id, token, frame, sequence, args, context) oder None.
+        """
+        active = sum(1 for source in self.sources.values() if source["pending"] is not None or source["in_flight"] > 0)
+        limit = max(1, self.num_workers // max(1, active)) # Gerechter Anteil der Worker je aktiver Quelle
+        for _ in range(len(self.order)):
+            source_id = self.order[0]
+            self.order.rotate(-1) # Nächster Aufruf beginnt bei der folgenden Quelle
+            source = self.sources[source_id]
+            if source["pending"] is not None and source["in_flight"] < limit:
+                frame, sequence, args, context = source["pending"]
+                source["pending"] = None
+                source["in_flight"] += 1
+                return source_id, source["token"], frame, sequence, args, context
+        return None
+
+
+    # Schleife eines Worker-Threads.
+    def _worker_loop(self):
+        """
+        Holt reihum Aufträge der Quellen ab und führt die Objekterkennung aus.
+        """
+        while True:
+            with self.condition:
+                job = None
+                while self.running and job is None:
+                    job = self._next_job()
+                    if job is None:
+                        self.condition.wait()
+                if not self.running:
+                    return
+            source_id, token, frame, sequence, args, context = job
+
+            start = time.perf_counter()
+            try:
+                objects = self.detect_function(frame, *args)
+            except Exception as e: # Fehlerbehandlung
+                print(f"Fehler bei der Objekterkennung im Worker: {e}")
+                objects = None
+            detection_time = time.perf_counter() - start
+
+            with self.condition:
+                source = self.sources.get(source_id)
+                if source is None or source["token"] != token: # Quelle wurde inzwischen abgemeldet (und ggf. neu angemeldet)
+                    continue
+                source["in_flight"] -= 1
+                if objects is not None:
+                    source["completed"].append(time.perf_counter())
+                    if source["latest_result"] is None or sequence > source["latest_result"][0]:
+                        source["latest_result"] = (sequence, objects, detection_time)
+                self.condition.notify_all() # Kapazität wurde frei
+            if objects is not None and self.result_callback is not None:
+                self.result_callback(source_id, sequence, objects, detection_time, context)
+
+
+    # Liefert das neueste Ergebnis einer Quelle, ohne zu blockieren.
+    def get_latest_result(self, source_id):
+        """
+        Liefert das neueste Ergebnis der Objekterkennung einer Quelle, ohne zu blockieren.
+        :param source_id: ID der Quelle.
+        :return: Tupel (sequence, objects, detection_time) oder None, falls noch kein Ergebnis vorliegt.
+        """
+        with self.condition:
+            source = self.sources.get(source_id)
+            return source["latest_result"] if source is not None else None
+
+
+    # Liefert die Bildrate der Erkennung einer Quelle.
+    def get_fps(self, source_id):
+        """
+        Liefert die Bildrate der Erkennung einer Quelle über die letzten fps_window Erkennungen.
+        :param source_id: ID der Quelle.
+        :return: Erkennungen pro Sekunde (0.0, falls zu wenige Erkennungen).
+        """
+        with self.condition:
+            source = self.sources.get(source_id)
+            if source is None or len(source["completed"]) < 2:
+                return 0.0
+            completed = source["completed"]
+            if time.perf_counter() - completed[-1] > 2.0: # Quelle liefert keine Frames mehr
+                return 0.0
+            elapsed = completed[-1] - completed[0]
+            return (len(completed) - 1) / elapsed if elapsed > 0 else 0.0
+
+
+    # Beendet die Worker-Threads.
+    def shutdown(self):
+        """
+        Beendet die Worker-Threads, ohne auf laufende Erkennungen zu warten.
+        """
+        with self.condition:
+            self.running = False
+            self.sources.clear()
+            self.order.clear()
+            self.condition.notify_all()
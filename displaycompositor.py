@@ -0,0 +1,164 @@
+import threading
+import cv2
+from PySide6.QtGui import QImage
+
+# Klasse zum Erstellen der anzeigefertigen Bilder in einem eigenen Thread.
+class DisplayCompositor:
+    """
+    Klasse zum Erstellen der anzeigefertigen Bilder in einem eigenen Thread.
+    Jeder Frame wird direkt auf die Größe des Anzeigebereichs skaliert (INTER_AREA beim Verkleinern, INTER_LINEAR beim Vergrößern),
+    die erkannten Objekte werden in Anzeigegröße eingezeichnet und das Ergebnis als QImage bereitgestellt.
+    Der GUI-Thread muss das QImage nur noch in eine QPixmap umwandeln und anzeigen.
+    Es wird immer nur der neueste Frame bearbeitet, ältere wartende Frames werden verworfen.
+    """
+
+    # Initialisiert den Compositor und startet den Worker-Thread.
+    def __init__(self, color_function, profiler=None):
+        """
+        Initialisiert den Compositor und startet den Worker-Thread.
+        :param color_function: Funktion color_function(classifier_id, detections), die die Farbe (BGR) der Rechtecke liefert.
+        :param profiler: FrameProfiler für die Zeitmessung (optional).
+        """
+        try:
+            self.color_function = color_function
+            self.profiler = profiler
+            self.condition = threading.Condition() # Schützt Auftrag und Ergebnis, weckt den Worker-Thread
+            self.pending = None # Wartender Auftrag (frame, detections, sequence, target_size, generation)
+            self.latest_result = None # Tupel (sequence, q_image, count, buffer) des neuesten Bildes
+            self.generation = 0 # Wird bei reset() erhöht, damit Bilder alter Aufträge ignoriert werden
+            self.geometry_key = None # (Framegröße, Anzeigegröße) der zwischengespeicherten Geometrie
+            self.geometry = None # Tupel (Breite, Höhe, Interpolation) in Anzeigegröße
+            self.dropped_frames = 0 # Anzahl verworfener (überholter) Frames
+            self.running = True
+            self.thread = threading.Thread(target=self._loop, name="DisplayCompositor", daemon=True)
+            self.thread.start()
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Compositors")
+
+
+    # Übergibt einen Frame zur Aufbereitung für die Anzeige.
+    def submit(self, frame, detections, sequence, target_size):
+        """
+        Übergibt einen Frame zur Aufbereitung für die Anzeige. Ein noch wartender älterer Frame wird ersetzt.
+        :param frame: Frame im BGR-Format (wird nicht verändert).
+        :param detections: Dictionary {classifier_id: Boxen} in Frame-Koordinaten.
+        :param sequence: Fortlaufende Nummer des Frames.
+        :param target_size: Größe des Anzeigebereichs (Breite, Höhe), im GUI-Thread ermittelt.
+        """
+        with self.condition:
+            if self.pending is not None:
+                self.dropped_frames += 1
+            self.pending = (frame, detections, sequence, target_size, self.generation)
+            self.condition.notify()
+
+
+    # Liefert das neueste anzeigefertige Bild, ohne zu blockieren.
+    def get_latest_result(self):
+        """
+        Liefert das neueste anzeigefertige Bild, ohne zu blockieren.
+        :return: Tupel (sequence, q_image, count, buffer) oder None, falls noch kein Bild vorliegt.
+                 buffer ist das NumPy-Array hinter q_image und muss bis zur Umwandlung in eine QPixmap gehalten werden.
+        """
+        with self.condition:
+            return self.latest_result
+
+
+    # Berechnet die Anzeigegröße eines Frames (zwischengespeichert bis sich Frame- oder Anzeigegröße ändert).
+    def get_geometry(self, width, height, target_width, target_height):
+        """
+        Berechnet die Anzeigegröße eines Frames unter Beibehaltung des Seitenverhältnisses.
+        Das Ergebnis wird zwischengespeichert, bis sich Frame- oder Anzeigegröße ändert.
+        :return: Tupel (Breite, Höhe, Interpolation).
+        """
+        key = (width, height, target_width, target_height)
+        if key != self.geometry_key:
+            i_h = target_height
+            i_w = int(i_h * (width/height)) # Breite basierend auf Höhe und Seitenverhältnis
+            if i_w > target_width:
+                i_w = target_width
+                i_h = int(i_w * height/width)
+            i_w, i_h = max(1, i_w), max(1, i_h)
+            interpolation = cv2.INTER_AREA if i_w < width else cv2.INTER_LINEAR # INTER_AREA vermeidet Aliasing beim Verkleinern
+            self.geometry_key = key
+            self.geometry = (i_w, i_h, interpolation)
+        return self.geometry
+
+
+    # Bereitet einen Frame für die Anzeige auf.
+    def compose(self, frame, detections, target_size):
+        """
+        Skaliert einen Frame auf die Anzeigegröße und zeichnet die erkannten Objekte ein.
+        :return: Tupel (q_image, count, buffer).
+        """
+        height, width = frame.shape[:2]
+        i_w, i_h, interpolation = self.get_geometry(width, height, *target_size)
+        if (i_w, i_h) == (width, height):
+            image = frame.copy() # Frame des Aufrufers bleibt unverändert
+        else:
+            image = cv2.resize(frame, (i_w, i_h), interpolation=interpolation)
+
+        scale_x, scale_y = i_w / width, i_h / height
+        count = 0
+        for classifier_id, objects in detections.items():
+            if objects is None:
+                continue
+            color = self.color_function(classifier_id, detections)
+            for (x, y, w, h) in objects:
+                cv2.rectangle(image, (int(x * scale_x), int(y * scale_y)), (int((x + w) * scale_x), int((y + h) * scale_y)), color, 2)
+                count += 1
+
+        q_image = QImage(image.data, i_w, i_h, image.strides[0], QImage.Format.Format_BGR888) # Verweist ohne Kopie auf image
+        return q_image, count, image
+
+
+    # Schleife des Worker-Threads.
+    def _loop(self):
+        """
+        Wartet auf Aufträge und bereitet jeweils den neuesten Frame für die Anzeige auf.
+        """
+        while True:
+            with self.condition:
+                while self.pending is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                frame, detections, sequence, target_size, generation = self.pending
+                self.pending = None
+
+            if target_size[0] <= 0 or target_size[1] <= 0: # Anzeigebereich (noch) nicht sichtbar
+                continue
+            try:
+                if self.profiler is not None:
+                    with self.profiler.stage("composite"):
+                        q_image, count, buffer = self.compose(frame, detections, target_size)
+                else:
+                    q_image, count, buffer = self.compose(frame, detections, target_size)
+            except Exception as e: # Fehlerbehandlung
+                print(f"Fehler beim Aufbereiten des Frames: {e}")
+                continue
+
+            with self.condition:
+                if generation == self.generation:
+                    self.latest_result = (sequence, q_image, count, buffer)
+
+
+    # Setzt das gespeicherte Bild zurück (z. B. beim Stoppen der Kamera).
+    def reset(self):
+        """
+        Verwirft wartende Aufträge und das gespeicherte Bild.
+        """
+        with self.condition:
+            self.generation += 1
+            self.pending = None
+            self.latest_result = None
+            self.dropped_frames = 0
+
+
+    # Beendet den Worker-Thread.
+    def shutdown(self):
+        """
+        Beendet den Worker-Thread.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify()
@@ -1,8 +1,18 @@
 import os
-from tkinter import filedialog
+import time
 import cv2
 
 
+# Importiert tkinter erst beim ersten Dialog (spart Importzeit beim Programmstart).
+def _filedialog():
+    """
+    Importiert tkinter erst beim ersten Dialog (spart Importzeit beim Programmstart).
+    :return: Modul tkinter.filedialog.
+    """
+    from tkinter import filedialog
+    return filedialog
+
+
 # FileManager-Klasse zum Verwalten von Dateioperationen.
 # Unterstützt die Auswahl von Bild- und XML-Dateien.
 class FileManager:
@@ -20,6 +30,7 @@ class FileManager:
         try:        
             self.filetypes_pictures = [("Bilder", "*.jpg *.png *.jpeg"), ("Alle Dateien", "*.*")]
             self.filetypes_classifier = [("XML-Dateien", "*.xml"), ("Alle Dateien", "*.*")]
+            self.filetypes_videos = [("Videos", "*.mp4 *.avi *.mkv *.mov *.webm"), ("Alle Dateien", "*.*")]
         except Exception as e: # Fehlerbehandlung
             print("Fehler beim Initialisieren des Datei-Managers")
 
@@ -38,6 +49,18 @@ class FileManager:
     
     
 
+    # Öffnet ein Dialogfeld zur Auswahl einer Videodatei.
+    def open_file_video(self, title="Video auswählen"):
+        """
+        Öffnet ein Dialogfeld zur Auswahl einer Videodatei.
+
+        :param title: Titel des Dialogfelds (Standard: "Video auswählen").
+        :return: Pfad zur ausgewählten Datei oder None, falls abgebrochen.
+        """
+
+        return self._open_file(title, self.filetypes_videos)
+
+
     # Öffnet ein Dialogfeld zur Auswahl einer Klassifizierungsdatei (XML).
     def open_file_classifier(self, title="Klassifizierungsdatei auswählen"):
         """
@@ -63,7 +86,7 @@ class FileManager:
         :return: Pfad zur ausgewählten Datei oder None, falls abgebrochen.
         """
         try:
-            file_path = filedialog.askopenfilename(title=title, filetypes=filetypes)
+            file_path = _filedialog().askopenfilename(title=title, filetypes=filetypes)
             if file_path:
                 print(f"Datei ausgewählt: {file_path}")
                 return file_path
@@ -104,6 +127,87 @@ class FileManager:
            
         
         
+    # Öffnet ein Dialogfeld zur Auswahl eines Speicherorts.
+    def save_file_dialog(self, title, defaultextension, filetypes):
+        """
+        Öffnet ein Dialogfeld zur Auswahl eines Speicherorts.
+
+        :param title: Titel des Dialogfelds.
+        :param defaultextension: Standard-Dateiendung (z. B. ".json").
+        :param filetypes: Dateitypenfilter für das Dialogfeld.
+        :return: Pfad zur ausgewählten Datei oder None, falls abgebrochen.
+        """
+        try:
+            file_path = _filedialog().asksaveasfilename(title=title, defaultextension=defaultextension, filetypes=filetypes)
+            if file_path:
+                return file_path
+            print("Speichern abgebrochen.")
+            return None
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Auswählen des Speicherorts")
+            return None
+
+
+    # Öffnet ein Dialogfeld zur Auswahl eines Verzeichnisses.
+    def open_directory(self, title="Verzeichnis auswählen"):
+        """
+        Öffnet ein Dialogfeld zur Auswahl eines Verzeichnisses.
+
+        :param title: Titel des Dialogfelds.
+        :return: Pfad zum ausgewählten Verzeichnis oder None, falls abgebrochen.
+        """
+        try:
+            directory = _filedialog().askdirectory(title=title)
+            if directory:
+                return directory
+            print("Auswahl abgebrochen.")
+            return None
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Auswählen des Verzeichnisses")
+            return None
+
+
+    # Öffnet ein Dialogfeld zur Auswahl des Speicherorts eines Screenshots.
+    def choose_screenshot_path(self):
+        """
+        Öffnet ein Dialogfeld zur Auswahl des Speicherorts eines Screenshots.
+
+        :return: Pfad zur ausgewählten Datei oder None, falls abgebrochen.
+        """
+        return self.save_file_dialog("Speicherort für Screenshot auswählen", ".png",
+                                     [("PNG Dateien", "*.png"), ("JPEG Dateien", "*.jpg *.jpeg"), ("Alle Dateien", "*.*")])
+
+
+    # Öffnet ein Dialogfeld zur Auswahl des Speicherorts eines Klassifizierers.
+    def choose_classifier_path(self):
+        """
+        Öffnet ein Dialogfeld zur Auswahl des Speicherorts eines trainierten Klassifizierers (XML).
+
+        :return: Pfad zur ausgewählten Datei oder None, falls abgebrochen.
+        """
+        return self.save_file_dialog("Speicherort für Klassifizierer auswählen", ".xml", self.filetypes_classifier)
+
+
+    # Erzeugt einen eindeutigen Dateinamen mit Zeitstempel in einem Verzeichnis.
+    def make_auto_save_path(self, directory, prefix="screenshot", extension=".png"):
+        """
+        Erzeugt einen eindeutigen Dateinamen mit Zeitstempel in einem Verzeichnis (ohne Dialog).
+
+        :param directory: Zielverzeichnis.
+        :param prefix: Anfang des Dateinamens.
+        :param extension: Dateiendung (bestimmt das Format).
+        :return: Pfad, z. B. "<directory>/screenshot_20240101_120000_123.png".
+        """
+        now = time.time()
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(now)) + f"_{int(now * 1000) % 1000:03d}"
+        file_path = os.path.join(directory, f"{prefix}_{stamp}{extension}")
+        counter = 1
+        while os.path.exists(file_path): # Mehrere Screenshots in derselben Millisekunde
+            file_path = os.path.join(directory, f"{prefix}_{stamp}_{counter}{extension}")
+            counter += 1
+        return file_path
+
+
     # Speichert einen Screenshot des aktuellen Frames mit grünen Rechtecken.
     def save_screenshot(self, image):
         """
@@ -114,7 +218,7 @@ class FileManager:
 
         try:            
             # Wähle den Dateipfad aus
-            file_path = filedialog.asksaveasfilename(
+            file_path = _filedialog().asksaveasfilename(
                 title="Speicherort für Screenshot auswählen",
                 defaultextension=".png",
                 filetypes=[("PNG Dateien", "*.png"), ("JPEG Dateien", "*.jpg *.jpeg"), ("Alle Dateien", "*.*")]
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Klasse zur Zeitmessung der einzelnen Stufen der Frame-Pipeline.
+class FrameProfiler:
+    """
+    Klasse zur Zeitmessung der einzelnen Stufen der Frame-Pipeline (Aufnahme, Konvertierung, Erkennung, Zeichnen, Anzeige).
+    Je Stufe werden die letzten window Messwerte gehalten (gleitendes Fenster für Perzentile und Histogramme).
+    Zusätzlich werden die Messungen als Ereignisse gespeichert und können im Chrome Trace-Event-Format
+    exportiert werden (Anzeige z. B. in chrome://tracing oder https://ui.perfetto.dev).
+    """
+
+    # Initialisiert den Profiler.
+    def __init__(self, window=300, max_events=50000):
+        """
+        Initialisiert den Profiler.
+        :param window: Anzahl der Messwerte je Stufe im gleitenden Fenster.
+        :param max_events: Maximale Anzahl gespeicherter Ereignisse für den Trace-Export.
+        """
+        try:
+            self.window = window
+            self.samples = {} # Stufe -> deque der Dauern in ms
+            self.events = deque(maxlen=max_events) # (Name, Start in µs, Dauer in µs, Thread-ID)
+            self.thread_names = {} # Thread-ID -> Thread-Name
+            self.frame_times = deque(maxlen=window) # Zeitpunkte angezeigter Frames (für FPS)
+            self.lock = threading.Lock() # Messungen kommen aus GUI-, Aufnahme- und Worker-Threads
+            self.origin = time.perf_counter() # Nullpunkt der Trace-Zeitachse
+            self.enabled = True
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Profilers")
+
+
+    # Misst die Dauer eines Codeblocks als Stufe.
+    @contextmanager
+    def stage(self, name):
+        """
+        Misst die Dauer eines Codeblocks als Stufe, z. B. "with profiler.stage('detect'): ...".
+        :param name: Name der Stufe.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+
+    # Speichert eine Messung.
+    def record(self, name, start, end):
+        """
+        Speichert eine Messung.
+        :param name: Name der Stufe.
+        :param start: Startzeitpunkt (time.perf_counter()).
+        :param end: Endzeitpunkt (time.perf_counter()).
+        """
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append((end - start) * 1000)
+            self.events.append((name, (start - self.origin) * 1e6, (end - start) * 1e6, thread.ident))
+            self.thread_names[thread.ident] = thread.name
+
+
+    # Markiert einen angezeigten Frame (für die FPS-Berechnung).
+    def mark_frame(self):
+        """
+        Markiert einen angezeigten Frame (für die FPS-Berechnung).
+        """
+        with self.lock:
+            self.frame_times.append(time.perf_counter())
+
+
+    # Liefert die aktuelle Bildrate.
+    def get_fps(self):
+        """
+        Liefert die Bildrate über das gleitende Fenster.
+        :return: Frames pro Sekunde (0.0, falls zu wenige Frames).
+        """
+        with self.lock:
+            if len(self.frame_times) < 2:
+                return 0.0
+            elapsed = self.frame_times[-1] - self.frame_times[0]
+            return (len(self.frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+
+    # Liefert Statistiken je Stufe.
+    def get_stats(self):
+        """
+        Liefert Statistiken je Stufe über das gleitende Fenster.
+        :return: Dictionary {Stufe: {"count", "mean_ms", "p50_ms", "p99_ms", "max_ms"}}.
+        """
+        with self.lock:
+            snapshot = {name: sorted(samples) for name, samples in self.samples.items() if samples}
+        stats = {}
+        for name, values in snapshot.items():
+            stats[name] = {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": values[int(0.50 * (len(values) - 1))],
+                "p99_ms": values[int(0.99 * (len(values) - 1))],
+                "max_ms": values[-1]
+            }
+        return stats
+
+
+    # Liefert ein Histogramm der Dauern einer Stufe.
+    def get_histogram(self, name, bin_edges=(1, 2, 5, 10, 20, 50, 100, 200, 500)):
+        """
+        Liefert ein Histogramm der Dauern einer Stufe über das gleitende Fenster.
+        :param name: Name der Stufe.
+        :param bin_edges: Obere Grenzen der Klassen in ms (die letzte Klasse nimmt alle größeren Werte auf).
+        :return: Liste von Tupeln (Obergrenze in ms oder None, Anzahl).
+        """
+        with self.lock:
+            values = list(self.samples.get(name, ()))
+        counts = [0] * (len(bin_edges) + 1)
+        for value in values:
+            index = next((i for i, edge in enumerate(bin_edges) if value <= edge), len(bin_edges))
+            counts[index] += 1
+        return list(zip(list(bin_edges) + [None], counts))
+
+
+    # Liefert eine kurze Zusammenfassung für die Statusleiste.
+    def summary_text(self, stages=None):
+        """
+        Liefert eine kurze Zusammenfassung (FPS sowie p50/p99 je Stufe in ms) für die Statusleiste.
+        :param stages: Reihenfolge der anzuzeigenden Stufen (Standard: alle).
+        :return: Text, z. B. "29.8 FPS | capture 0.1/0.3 | detect 24.0/41.2".
+        """
+        stats = self.get_stats()
+        names = [name for name in (stages or sorted(stats)) if name in stats]
+        parts = [f"{self.get_fps():.1f} FPS"]
+        parts += [f"{name} {stats[name]['p50_ms']:.1f}/{stats[name]['p99_ms']:.1f}" for name in names]
+        return " | ".join(parts) + " (p50/p99 ms)"
+
+
+    # Exportiert die gespeicherten Ereignisse im Chrome Trace-Event-Format.
+    def export_chrome_trace(self, file_path):
+        """
+        Exportiert die gespeicherten Ereignisse im Chrome Trace-Event-Format (JSON).
+        :param file_path: Pfad der Ausgabedatei.
+        :return: True, wenn die Datei geschrieben wurde, sonst False.
+        """
+        try:
+            with self.lock:
+                events = list(self.events)
+                thread_names = dict(self.thread_names)
+            pid = os.getpid()
+            trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                     for tid, name in thread_names.items()]
+            trace += [{"name": name, "cat": "pipeline", "ph": "X", "ts": round(ts, 1), "dur": round(dur, 1), "pid": pid, "tid": tid}
+                      for name, ts, dur, tid in events]
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, file)
+            print(f"Trace gespeichert: {file_path}")
+            return True
+        except Exception as e: # Fehlerbehandlung
+            print(f"Fehler beim Exportieren des Traces: {e}")
+            return False
+
+
+    # Setzt alle Messungen zurück.
+    def reset(self):
+        """
+        Setzt alle Messungen zurück.
+        """
+        with self.lock:
+            self.samples.clear()
+            self.events.clear()
+            self.frame_times.clear()
+            self.origin = time.perf_counter()
@@ -0,0 +1,243 @@
+import math
+import time
+from collections import deque
+from PySide6.QtCore import QTimer, Qt
+
+# Klasse zur gemeinsamen Taktung aller periodischen Aufgaben im GUI-Thread.
+class FrameScheduler:
+    """
+    Klasse zur gemeinsamen Taktung aller periodischen Aufgaben im GUI-Thread (Frame-Aktualisierung, Animation).
+    Ein einziger QTimer weckt jeweils zur nächsten fälligen Aufgabe. Der Takt einer Aufgabe richtet sich nach der
+    gemessenen Bildrate der Quelle (Abfrage mit doppelter Bildrate statt fester 5-10 ms) und nach der gemessenen
+    Rechenzeit (höchstens max_duty Anteil der Zeit im GUI-Thread). Aufgaben ohne Arbeit (z. B. statisches Bild bereits
+    angezeigt) ruhen bis zum nächsten wake(), Aufgaben mit nicht erfüllter Bedingung (z. B. Fenster minimiert) werden
+    nicht ausgeführt. Ruhen alle Aufgaben, läuft kein Timer.
+    """
+
+    # Initialisiert den Scheduler.
+    def __init__(self, parent=None, max_duty=0.6, min_interval_ms=4, max_interval_ms=100, recheck_ms=500, window=2.0, smoothing=0.2):
+        """
+        Initialisiert den Scheduler.
+        :param parent: Eltern-Objekt des QTimers (z. B. das Hauptfenster).
+        :param max_duty: Maximaler Anteil der Zeit, den eine Aufgabe den GUI-Thread belegen darf (0..1).
+        :param min_interval_ms: Kürzester Takt in ms.
+        :param max_interval_ms: Längster aus der Quell-Bildrate abgeleiteter Takt in ms.
+        :param recheck_ms: Abstand in ms, in dem die Bedingungen wartender Aufgaben geprüft werden.
+        :param window: Zeitfenster in Sekunden für die Auslastung (Duty Cycle).
+        :param smoothing: Gewicht neuer Messwerte im gleitenden Mittelwert (0..1).
+        """
+        try:
+            self.max_duty = max_duty
+            self.min_interval_ms = min_interval_ms
+            self.max_interval_ms = max_interval_ms
+            self.recheck_ms = recheck_ms
+            self.window = window
+            self.smoothing = smoothing
+            self.tasks = {} # Name -> Dictionary mit Callback, Takt, Zustand und Messwerten
+            self.busy = deque() # (Ende, Dauer, Name) der Ausführungen im Zeitfenster
+            self.in_run = False # True, während Aufgaben ausgeführt werden (Neuplanung erst danach)
+            self.timer = QTimer(parent)
+            self.timer.setSingleShot(True)
+            self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self.timer.timeout.connect(self._run)
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Schedulers")
+
+
+    # Meldet eine Aufgabe an.
+    def add_task(self, name, callback, interval_ms, condition=None):
+        """
+        Meldet eine Aufgabe an (sie läuft erst nach start()).
+        :param name: Name der Aufgabe.
+        :param callback: Funktion ohne Parameter. Rückgabe False bedeutet "nichts zu tun" (kein neuer Inhalt).
+        :param interval_ms: Standardtakt in ms, solange keine Quell-Bildrate gemessen wurde.
+        :param condition: Optionale Funktion; liefert sie False, wird die Aufgabe nicht ausgeführt (z. B. Fenster verborgen).
+        """
+        self.tasks[name] = {"callback": callback, "interval": interval_ms, "condition": condition,
+                            "pause_when_idle": False, "active": False, "waiting": False, "next_due": math.inf,
+                            "generation": 0, "cost": None, "source_interval": None, "last_source": None, "runs": 0}
+
+
+    # Startet eine Aufgabe.
+    def start(self, name, interval_ms=None, pause_when_idle=False):
+        """
+        Startet eine Aufgabe (sofort fällig) und setzt die Messung der Quell-Bildrate zurück.
+        :param name: Name der Aufgabe.
+        :param interval_ms: Neuer Standardtakt in ms (None = unverändert).
+        :param pause_when_idle: Wenn True, ruht die Aufgabe nach einer Ausführung ohne Arbeit bis zum nächsten wake().
+        """
+        task = self.tasks[name]
+        if interval_ms is not None:
+            task["interval"] = interval_ms
+        task["pause_when_idle"] = pause_when_idle
+        task["active"] = True
+        task["generation"] += 1 # Laufende Ausführung (z. B. Neustart aus dem Callback) plant nicht mehr selbst
+        task["source_interval"] = task["last_source"] = task["cost"] = None
+        task["next_due"] = time.perf_counter()
+        self._schedule()
+
+
+    # Stoppt eine Aufgabe.
+    def stop(self, name):
+        """
+        Stoppt eine Aufgabe.
+        :param name: Name der Aufgabe.
+        """
+        task = self.tasks[name]
+        task["active"] = False
+        task["generation"] += 1
+        task["next_due"] = math.inf
+        self._schedule()
+
+
+    # Weckt eine ruhende Aufgabe.
+    def wake(self, name):
+        """
+        Führt eine gestartete Aufgabe so bald wie möglich aus (z. B. nach Änderung der Parameter bei statischem Bild).
+        :param name: Name der Aufgabe.
+        """
+        task = self.tasks[name]
+        if task["active"]:
+            task["next_due"] = min(task["next_due"], time.perf_counter())
+            self._schedule()
+
+
+    # Gibt zurück, ob eine Aufgabe gestartet ist.
+    def is_active(self, name):
+        """
+        Gibt zurück, ob eine Aufgabe gestartet ist (auch wenn sie gerade ruht oder wartet).
+        """
+        return self.tasks[name]["active"]
+
+
+    # Meldet einen neuen Frame der Quelle einer Aufgabe.
+    def observe_source(self, name):
+        """
+        Meldet einen neuen Frame der Quelle einer Aufgabe; aus den Abständen wird die Bildrate der Quelle geschätzt.
+        :param name: Name der Aufgabe.
+        """
+        task = self.tasks[name]
+        now = time.perf_counter()
+        if task["last_source"] is not None:
+            interval = (now - task["last_source"]) * 1000
+            if task["source_interval"] is None:
+                task["source_interval"] = interval
+            else:
+                task["source_interval"] += self.smoothing * (interval - task["source_interval"])
+        task["last_source"] = now
+
+
+    # Liefert den aktuellen Takt einer Aufgabe.
+    def get_interval(self, name):
+        """
+        Liefert den aktuellen Takt einer Aufgabe in ms: halber Frame-Abstand der Quelle (sonst Standardtakt),
+        mindestens so lang, dass die Aufgabe höchstens max_duty Anteil des GUI-Threads belegt.
+        """
+        task = self.tasks[name]
+        interval = task["interval"]
+        if task["source_interval"] is not None:
+            interval = min(self.max_interval_ms, task["source_interval"] / 2) # Abtastung mit doppelter Bildrate der Quelle
+        if task["cost"] is not None:
+            interval = max(interval, task["cost"] / self.max_duty)
+        return max(self.min_interval_ms, interval)
+
+
+    # Prüft die Bedingungen wartender Aufgaben sofort.
+    def update(self):
+        """
+        Prüft die Bedingungen wartender Aufgaben sofort (z. B. nach Minimieren/Wiederherstellen des Fensters),
+        ohne auf die regelmäßige Prüfung im Abstand recheck_ms zu warten.
+        """
+        now = time.perf_counter()
+        for task in self.tasks.values():
+            if task["active"] and task["waiting"]:
+                task["next_due"] = min(task["next_due"], now)
+        self._schedule()
+
+
+    # Plant den Timer neu.
+    def _schedule(self):
+        """
+        Startet den Timer zur nächsten fälligen Aufgabe; ruhen alle Aufgaben, wird er gestoppt.
+        """
+        if self.in_run:
+            return # _run plant nach den Ausführungen neu
+        now = time.perf_counter()
+        next_due = math.inf
+        for task in self.tasks.values():
+            if task["active"]:
+                next_due = min(next_due, task["next_due"])
+        if next_due == math.inf:
+            self.timer.stop() # Alle Aufgaben ruhen
+        else:
+            self.timer.start(max(0, int(round((next_due - now) * 1000))))
+
+
+    # Führt die fälligen Aufgaben aus.
+    def _run(self):
+        """
+        Führt die fälligen Aufgaben aus (Timer-Ereignis), misst ihre Rechenzeit und plant den nächsten Aufruf.
+        """
+        self.in_run = True
+        try:
+            for name, task in list(self.tasks.items()):
+                now = time.perf_counter()
+                if not task["active"] or task["next_due"] > now + 0.001:
+                    continue
+                if task["condition"] is not None and not task["condition"]():
+                    task["waiting"] = True
+                    task["next_due"] = now + self.recheck_ms / 1000
+                    continue
+                task["waiting"] = False
+                generation = task["generation"]
+                try:
+                    result = task["callback"]()
+                except Exception as e: # Fehlerbehandlung
+                    print(f"Fehler in der Aufgabe {name}: {str(e)}") # Debug-Ausgabe in Konsole
+                    result = None
+                end = time.perf_counter()
+                cost = (end - now) * 1000
+                self.busy.append((end, cost, name))
+                task["runs"] += 1
+                if task["generation"] != generation: # Im Callback gestoppt oder neu gestartet
+                    continue
+                task["cost"] = cost if task["cost"] is None else task["cost"] + self.smoothing * (cost - task["cost"])
+                if result is False and task["pause_when_idle"]:
+                    task["next_due"] = math.inf # Ruhen bis wake()
+                else:
+                    task["next_due"] = now + self.get_interval(name) / 1000
+        finally:
+            self.in_run = False
+        self._schedule()
+
+
+    # Liefert die Auslastung des GUI-Threads durch die Aufgaben.
+    def get_duty_cycle(self, name=None):
+        """
+        Liefert den Anteil der Zeit im Zeitfenster, den die Aufgaben den GUI-Thread belegt haben.
+        :param name: Name einer Aufgabe (None = alle Aufgaben).
+        :return: Anteil zwischen 0 und 1.
+        """
+        now = time.perf_counter()
+        while self.busy and self.busy[0][0] < now - self.window:
+            self.busy.popleft()
+        return min(1.0, sum(cost for _, cost, task in self.busy if name is None or task == name) / (self.window * 1000))
+
+
+    # Liefert den Zustand aller Aufgaben als Text.
+    def summary_text(self):
+        """
+        Liefert den Zustand aller Aufgaben als Text (Takt bzw. Ruhezustand und Auslastung), z. B. für die Statusleiste.
+        """
+        parts = []
+        for name, task in self.tasks.items():
+            if not task["active"]:
+                continue
+            if task["waiting"]:
+                state = "wartet"
+            elif task["next_due"] == math.inf:
+                state = "ruht"
+            else:
+                state = f"{self.get_interval(name):.0f} ms"
+            parts.append(f"{name} {state} {self.get_duty_cycle(name):.0%}")
+        return f"Takt: {', '.join(parts) or 'ruht'} | Auslastung {self.get_duty_cycle():.0%}"
@@ -0,0 +1,588 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+from batchdetect import collect_images
+
+# Training eigener Haar-Cascade Klassifizierer (Gentle AdaBoost mit Entscheidungsstümpfen, wie opencv_traincascade).
+# Integralbilder und Merkmalswerte werden blockweise mit NumPy berechnet (ein Merkmalsblock = eine Matrixmultiplikation),
+# die Suche nach dem besten Merkmal läuft parallel über alle Kerne. Nach jeder Stufe werden ein Checkpoint und die
+# XML-Datei (neues OpenCV-Format, ladbar mit cv2.CascadeClassifier bzw. "Klassifizierer auswählen") geschrieben.
+#
+# Positive Beispiele: Verzeichnis mit zugeschnittenen Objektbildern (werden auf die Fenstergröße skaliert).
+# Negative Beispiele: Verzeichnis mit Hintergrundbildern ohne Objekte (Fenster werden daraus ausgeschnitten)
+# oder NumPy-Datei mit gesammelten Fehlalarmen aus negativeminer.py.
+#
+# Beispiele:
+#   python haartrainer.py positiv/ hintergrund/ --output meine_cascade.xml
+#   python haartrainer.py positiv/ hintergrund/ --output meine_cascade.xml --stages 15 --width 20 --height 20 --mirror
+
+CHECKPOINT_VERSION = 1
+
+
+# Erzeugt alle Haar-Merkmale eines Fensters.
+def generate_features(width, height, step=1):
+    """
+    Erzeugt alle Haar-Merkmale (Modus BASIC) eines Fensters. Jedes Merkmal besteht aus bis zu drei gewichteten
+    Rechtecken (x, y, w, h, Gewicht); das erste Rechteck umfasst das ganze Merkmal mit Gewicht -1, die Gewichte
+    summieren sich flächengewichtet zu 0 (wie in den Cascades von OpenCV).
+    :param width: Fensterbreite.
+    :param height: Fensterhöhe.
+    :param step: Schrittweite für Position und Größe (1 = alle Merkmale, 2 = etwa ein Sechzehntel).
+    :return: NumPy-Array (Anzahl, 3, 5) mit int32 (fehlende Rechtecke haben Gewicht 0).
+    """
+    features = []
+    for y in range(0, height, step):
+        for x in range(0, width, step):
+            for dy in range(1, height - y + 1, step):
+                for dx in range(1, width - x + 1, step):
+                    if x + 2 * dx <= width:
+                        features.append([(x, y, 2 * dx, dy, -1), (x + dx, y, dx, dy, 2), (0, 0, 0, 0, 0)])
+                    if y + 2 * dy <= height:
+                        features.append([(x, y, dx, 2 * dy, -1), (x, y + dy, dx, dy, 2), (0, 0, 0, 0, 0)])
+                    if x + 3 * dx <= width:
+                        features.append([(x, y, 3 * dx, dy, -1), (x + dx, y, dx, dy, 3), (0, 0, 0, 0, 0)])
+                    if y + 3 * dy <= height:
+                        features.append([(x, y, dx, 3 * dy, -1), (x, y + dy, dx, dy, 3), (0, 0, 0, 0, 0)])
+                    if x + 2 * dx <= width and y + 2 * dy <= height:
+                        features.append([(x, y, 2 * dx, 2 * dy, -1), (x, y, dx, dy, 2), (x + dx, y + dy, dx, dy, 2)])
+    return np.array(features, dtype=np.int32)
+
+
+# Berechnet die Indizes und Vorzeichen der Eckpunkte eines Rechtecks im Integralbild.
+def corner_offsets(rects, row):
+    """
+    Berechnet die Offsets der vier Eckpunkte jedes Rechtecks in einem flach gespeicherten Integralbild.
+    :param rects: Array (..., 5) mit Rechtecken (x, y, w, h, Gewicht).
+    :param row: Zeilenlänge des Integralbilds (Bildbreite + 1).
+    :return: Liste von Tupeln (Offset-Array, Vorzeichen) für die Eckpunkte oben links, oben rechts, unten links, unten rechts.
+    """
+    x, y, w, h = (rects[..., i].astype(np.int64) for i in range(4))
+    return [(y * row + x, 1), (y * row + x + w, -1), ((y + h) * row + x, -1), ((y + h) * row + x + w, 1)]
+
+
+# Baut die Koeffizientenmatrix eines Merkmalsblocks.
+def feature_matrix(features, width, height):
+    """
+    Baut die Koeffizientenmatrix eines Merkmalsblocks: Merkmalswerte = Integralbilder @ Matrix.T.
+    :param features: Array (Anzahl, 3, 5) aus generate_features().
+    :return: float32-Array (Anzahl, (height + 1) * (width + 1)).
+    """
+    matrix = np.zeros((len(features), (height + 1) * (width + 1)), dtype=np.float32)
+    rows = np.arange(len(features))
+    for k in range(features.shape[1]):
+        weight = features[:, k, 4].astype(np.float32)
+        for offsets, sign in corner_offsets(features[:, k], width + 1):
+            np.add.at(matrix, (rows, offsets), sign * weight)
+    return matrix
+
+
+# Berechnet die Integralbilder und Normierungsfaktoren einer Menge von Fenstern.
+def window_integrals(windows):
+    """
+    Berechnet die Integralbilder und Normierungsfaktoren (1 / Standardabweichung · Fläche, wie OpenCV) von Fenstern.
+    :param windows: uint8-Array (Anzahl, Höhe, Breite).
+    :return: Tupel (Integralbilder float64 (Anzahl, (Höhe + 1) * (Breite + 1)), Normierungsfaktoren float64 (Anzahl,)).
+    """
+    count, height, width = windows.shape
+    integral = np.zeros((count, height + 1, width + 1), dtype=np.float64)
+    integral[:, 1:, 1:] = windows.cumsum(axis=1, dtype=np.float64).cumsum(axis=2)
+    inner = windows[:, 1:-1, 1:-1].astype(np.float64) # Normierung über das um 1 Pixel verkleinerte Fenster (wie OpenCV)
+    area = (width - 2) * (height - 2)
+    total = inner.sum(axis=(1, 2))
+    variance = area * (inner * inner).sum(axis=(1, 2)) - total * total
+    norm = 1.0 / np.where(variance > 0, np.sqrt(np.maximum(variance, 0)), 1.0)
+    return integral.reshape(count, -1), norm
+
+
+# Berechnet Merkmalswerte direkt aus flach gespeicherten Integralbildern.
+def rect_features(integral, base, rects, row):
+    """
+    Berechnet die Werte eines Merkmals für viele Fenster (ohne Normierung).
+    :param integral: Flach gespeichertes Integralbild (bzw. mehrere hintereinander).
+    :param base: Offsets der linken oberen Ecke jedes Fensters im Integralbild.
+    :param rects: Rechtecke des Merkmals [(x, y, w, h, Gewicht), ...].
+    :param row: Zeilenlänge des Integralbilds.
+    :return: float64-Array der Merkmalswerte.
+    """
+    value = np.zeros(len(base), dtype=np.float64)
+    for rect in np.asarray(rects, dtype=np.int64):
+        if rect[4] == 0:
+            continue
+        rect_sum = 0
+        for offset, sign in corner_offsets(rect, row):
+            rect_sum = rect_sum + sign * integral[base + offset]
+        value += rect[4] * rect_sum
+    return value
+
+
+# Wendet eine Cascade auf viele Fenster gleichzeitig an.
+def evaluate_cascade(stages, integral, square_integral, base, row, width, height):
+    """
+    Wendet eine Cascade auf viele Fenster gleichzeitig an (wie cv2.CascadeClassifier auf einer Skalierungsstufe).
+    Fenster, die eine Stufe ablehnt, werden in den folgenden Stufen nicht mehr berechnet.
+    :param stages: Liste der Stufen (siehe train_stage).
+    :param integral: Flach gespeichertes Integralbild.
+    :param square_integral: Flach gespeichertes Integralbild der quadrierten Pixel (für die Normierung).
+    :param base: Offsets der linken oberen Ecke jedes Fensters.
+    :param row: Zeilenlänge der Integralbilder.
+    :return: Boolesches Array, True für Fenster, die alle Stufen passieren.
+    """
+    base = np.asarray(base, dtype=np.int64)
+    norm_rect = np.array([1, 1, width - 2, height - 2, 1])
+    area = (width - 2) * (height - 2)
+    total = rect_features(integral, base, [norm_rect], row)
+    variance = area * rect_features(square_integral, base, [norm_rect], row) - total * total
+    norm = 1.0 / np.where(variance > 0, np.sqrt(np.maximum(variance, 0)), 1.0)
+
+    alive = np.arange(len(base))
+    for stage in stages:
+        if not len(alive):
+            break
+        stage_sum = np.zeros(len(alive), dtype=np.float64)
+        for weak in stage["weak"]:
+            value = rect_features(integral, base[alive], weak["rects"], row) * norm[alive]
+            stage_sum += np.where(value < weak["threshold"], weak["left"], weak["right"])
+        alive = alive[stage_sum >= stage["threshold"]]
+    passed = np.zeros(len(base), dtype=bool)
+    passed[alive] = True
+    return passed
+
+
+# Wendet eine Cascade auf zugeschnittene Fenster an.
+def evaluate_windows(stages, windows):
+    """
+    Wendet eine Cascade auf zugeschnittene Fenster der Fenstergröße an.
+    :param windows: uint8-Array (Anzahl, Höhe, Breite).
+    :return: Boolesches Array, True für Fenster, die alle Stufen passieren.
+    """
+    count, height, width = windows.shape
+    if not stages:
+        return np.ones(count, dtype=bool)
+    integral, _ = window_integrals(windows)
+    square_integral = np.zeros((count, height + 1, width + 1), dtype=np.float64)
+    square_integral[:, 1:, 1:] = (windows.astype(np.float64) ** 2).cumsum(axis=1).cumsum(axis=2)
+    base = np.arange(count, dtype=np.int64) * (height + 1) * (width + 1)
+    return evaluate_cascade(stages, integral.ravel(), square_integral.ravel(), base, width + 1, width, height)
+
+
+# Lädt die positiven Beispiele.
+def load_positives(directory, width, height, mirror=False):
+    """
+    Lädt die positiven Beispiele (zugeschnittene Objektbilder) in Fenstergröße.
+    :param directory: Verzeichnis mit Bildern.
+    :param mirror: Wenn True, werden zusätzlich horizontal gespiegelte Beispiele verwendet.
+    :return: uint8-Array (Anzahl, Höhe, Breite).
+    """
+    windows = []
+    for path in collect_images([directory]):
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            print(f"Fehler: Datei {path} konnte nicht geladen werden.")
+            continue
+        window = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        windows.append(window)
+        if mirror:
+            windows.append(cv2.flip(window, 1))
+    return np.array(windows, dtype=np.uint8).reshape(-1, height, width)
+
+
+# Klasse zum Sammeln negativer Beispiele aus Hintergrundbildern.
+class NegativeSampler:
+    """
+    Klasse zum Sammeln negativer Beispiele aus Hintergrundbildern.
+    Ab der zweiten Stufe werden nur Fenster verwendet, die die bisherige Cascade fälschlich akzeptiert (Bootstrapping).
+    Dazu wird die Cascade dicht über zufällig skalierte Hintergrundbilder geschoben (evaluate_cascade).
+    """
+
+    # Lädt die Hintergrundbilder.
+    def __init__(self, directory, width, height, stride=2, max_per_image=20, seed=0):
+        """
+        Lädt die Hintergrundbilder (Graustufen).
+        :param directory: Verzeichnis mit Hintergrundbildern ohne Objekte oder NumPy-Datei mit Ausschnitten (negativeminer.py).
+        :param stride: Schrittweite der Fensterpositionen.
+        :param max_per_image: Maximale Anzahl übernommener Fenster je Bild und Skalierung (für mehr Vielfalt).
+        :param seed: Startwert des Zufallsgenerators.
+        """
+        self.width = width
+        self.height = height
+        self.stride = max(1, stride)
+        self.max_per_image = max_per_image
+        self.rng = np.random.default_rng(seed)
+        self.images = []
+        self.from_store = os.path.isfile(directory) and directory.lower().endswith(".npy")
+        if self.from_store: # Ausschnitte aus negativeminer.py: jedes Fenster genau einmal je Durchlauf
+            self.stride = 1
+            self.images = [cv2.resize(np.asarray(window), (width, height), interpolation=cv2.INTER_AREA)
+                           if window.shape != (height, width) else np.asarray(window)
+                           for window in np.load(directory, mmap_mode="r")]
+        for path in collect_images([directory]) if not self.from_store else []:
+            image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if image is not None and image.shape[0] >= height and image.shape[1] >= width:
+                self.images.append(image)
+        if not self.images:
+            raise ValueError(f"Keine verwendbaren Hintergrundbilder in '{directory}'")
+
+
+    # Sammelt negative Beispiele.
+    def collect(self, stages, count, max_passes=None):
+        """
+        Sammelt Fenster, die die bisherige Cascade akzeptiert (bei leerer Cascade: beliebige Fenster).
+        :param stages: Bisherige Stufen.
+        :param count: Gewünschte Anzahl.
+        :param max_passes: Maximale Anzahl Durchläufe über alle Hintergrundbilder (Standard: 20, bei Ausschnitten 1).
+        :return: Tupel (uint8-Array (Anzahl, Höhe, Breite), Akzeptanzrate der Cascade auf den untersuchten Fenstern).
+        """
+        windows = []
+        tested = 0
+        accepted = 0
+        for _ in range(max_passes or (1 if self.from_store else 20)):
+            for index in self.rng.permutation(len(self.images)):
+                image = self.images[index]
+                max_scale = min(image.shape[1] / self.width, image.shape[0] / self.height)
+                scale = float(np.exp(self.rng.uniform(0, np.log(max_scale)))) if max_scale > 1 else 1.0
+                if scale > 1:
+                    size = (max(self.width, int(image.shape[1] / scale)), max(self.height, int(image.shape[0] / scale)))
+                    image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+                integral, square_integral = cv2.integral2(image, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+                row = image.shape[1] + 1
+                offset_y, offset_x = self.rng.integers(0, self.stride, size=2) # Zufälliger Versatz des Rasters
+                ys, xs = np.mgrid[offset_y:image.shape[0] - self.height + 1:self.stride, offset_x:image.shape[1] - self.width + 1:self.stride]
+                ys, xs = ys.ravel(), xs.ravel()
+                if not len(ys):
+                    continue
+                passed = evaluate_cascade(stages, integral.ravel(), square_integral.ravel(), ys * row + xs, row, self.width, self.height)
+                hits = np.flatnonzero(passed)
+                tested += len(ys)
+                accepted += len(hits)
+                if len(hits) > self.max_per_image:
+                    hits = self.rng.choice(hits, self.max_per_image, replace=False)
+                for hit in hits:
+                    y, x = ys[hit], xs[hit]
+                    windows.append(image[y:y + self.height, x:x + self.width])
+                if len(windows) >= count:
+                    return np.array(windows[:count], dtype=np.uint8), accepted / tested
+        rate = accepted / tested if tested else 0.0
+        return np.array(windows, dtype=np.uint8).reshape(-1, self.height, self.width), rate
+
+
+# Klasse zum Trainieren der Stufen einer Cascade.
+class StageTrainer:
+    """
+    Klasse zum Trainieren einer Stufe mit Gentle AdaBoost und Entscheidungsstümpfen.
+    Die Merkmale werden in Blöcke aufgeteilt, die parallel in einem Thread-Pool durchsucht werden (NumPy gibt den GIL
+    bei großen Arrays frei). Passt der Speicher (cache_mb), werden die sortierten Merkmalswerte je Stufe einmal
+    berechnet und für alle Runden wiederverwendet, da sich zwischen den Runden nur die Gewichte ändern.
+    """
+
+    # Initialisiert den Trainer.
+    def __init__(self, features, width, height, num_workers=None, chunk_size=2048, cache_mb=1024):
+        """
+        Initialisiert den Trainer.
+        :param features: Array aus generate_features().
+        :param num_workers: Anzahl der Threads (Standard: Anzahl der Kerne).
+        :param chunk_size: Anzahl der Merkmale je Block.
+        :param cache_mb: Maximaler Speicher für die sortierten Merkmalswerte einer Stufe.
+        """
+        self.features = features
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.cache_mb = cache_mb
+        self.executor = ThreadPoolExecutor(max_workers=num_workers or os.cpu_count(), thread_name_prefix="HaarTrainer")
+        self.chunks = [(start, min(start + chunk_size, len(features))) for start in range(0, len(features), chunk_size)]
+        self.matrices = list(self.executor.map(lambda chunk: feature_matrix(features[chunk[0]:chunk[1]], width, height), self.chunks))
+        self.integral = None
+        self.norm = None
+        self.cache = None
+
+
+    # Berechnet die sortierten Merkmalswerte eines Blocks.
+    def _sorted_values(self, chunk_index):
+        """
+        Berechnet die Merkmalswerte eines Blocks für alle Beispiele und sortiert sie je Merkmal.
+        :return: Tupel (sortierte Werte float32 (Beispiele, Merkmale), Reihenfolge int32).
+        """
+        if self.cache is not None:
+            return self.cache[chunk_index]
+        values = (self.integral @ self.matrices[chunk_index].T) * self.norm[:, None]
+        order = np.argsort(values, axis=0, kind="stable").astype(np.int32)
+        return np.take_along_axis(values, order, axis=0), order
+
+
+    # Sucht den besten Entscheidungsstumpf eines Blocks.
+    def _best_stump(self, chunk_index, weights, labels):
+        """
+        Sucht den besten Entscheidungsstumpf eines Blocks (minimaler gewichteter quadratischer Fehler).
+        :return: Tupel (Güte, Merkmalsindex, Schwellwert, linker Wert, rechter Wert).
+        """
+        sorted_values, order = self._sorted_values(chunk_index)
+        sorted_weights = weights[order]
+        cumulative_w = np.cumsum(sorted_weights, axis=0)
+        cumulative_wy = np.cumsum(sorted_weights * labels[order], axis=0)
+        left_w, left_wy = cumulative_w[:-1], cumulative_wy[:-1]
+        right_w, right_wy = cumulative_w[-1] - left_w, cumulative_wy[-1] - left_wy
+        score = left_wy ** 2 / np.maximum(left_w, 1e-12) + right_wy ** 2 / np.maximum(right_w, 1e-12)
+        score[sorted_values[1:] <= sorted_values[:-1]] = -np.inf # Nur zwischen verschiedenen Werten trennen
+        split = np.argmax(score, axis=0)
+        columns = np.arange(score.shape[1])
+        best = int(np.argmax(score[split, columns]))
+        i = split[best]
+        if not np.isfinite(score[i, best]):
+            return -np.inf, None, 0.0, 0.0, 0.0
+        threshold = (float(sorted_values[i, best]) + float(sorted_values[i + 1, best])) / 2
+        left = left_wy[i, best] / max(left_w[i, best], 1e-12)
+        right = right_wy[i, best] / max(right_w[i, best], 1e-12)
+        return float(score[i, best]), self.chunks[chunk_index][0] + best, threshold, float(left), float(right)
+
+
+    # Trainiert eine Stufe.
+    def train_stage(self, positives, negatives, min_hit_rate=0.995, max_false_alarm=0.5, max_weak_count=100):
+        """
+        Trainiert eine Stufe: Stümpfe werden hinzugefügt, bis die Stufe bei einer Trefferrate von min_hit_rate
+        höchstens max_false_alarm der negativen Beispiele akzeptiert (oder max_weak_count erreicht ist).
+        :param positives: uint8-Array der positiven Fenster.
+        :param negatives: uint8-Array der negativen Fenster.
+        :return: Dictionary {"threshold", "weak": [{"rects", "threshold", "left", "right"}], "hit_rate", "false_alarm"}.
+        """
+        windows = np.concatenate([positives, negatives])
+        labels = np.concatenate([np.ones(len(positives)), -np.ones(len(negatives))])
+        integral, norm = window_integrals(windows)
+        self.integral = integral.astype(np.float32)
+        self.norm = norm.astype(np.float32)
+        self.cache = None
+        if len(windows) * len(self.features) * 8 <= self.cache_mb * 1024 * 1024:
+            self.cache = list(self.executor.map(self._sorted_values, range(len(self.chunks))))
+
+        weights = np.where(labels > 0, 0.5 / len(positives), 0.5 / len(negatives))
+        stage_sum = np.zeros(len(windows))
+        stage = {"threshold": 0.0, "weak": [], "hit_rate": 0.0, "false_alarm": 1.0}
+        while len(stage["weak"]) < max_weak_count:
+            results = self.executor.map(lambda index: self._best_stump(index, weights, labels), range(len(self.chunks)))
+            score, feature_index, threshold, left, right = max(results, key=lambda result: result[0])
+            if feature_index is None:
+                break
+            rects = self.features[feature_index]
+            values = rect_features(integral.ravel(), np.arange(len(windows)) * integral.shape[1], rects, self.width + 1) * norm
+            response = np.where(values < threshold, left, right)
+            stage_sum += response
+            weights *= np.exp(-labels * response)
+            weights /= weights.sum()
+            stage["weak"].append({"rects": [[int(v) for v in rect] for rect in rects if rect[4] != 0],
+                                  "threshold": threshold, "left": left, "right": right})
+
+            # Schwellwert der Stufe so wählen, dass min_hit_rate der positiven Beispiele akzeptiert werden
+            positive_sums = np.sort(stage_sum[labels > 0])
+            stage["threshold"] = float(positive_sums[int((1.0 - min_hit_rate) * len(positive_sums))]) - 1e-5
+            stage["hit_rate"] = float(np.mean(stage_sum[labels > 0] >= stage["threshold"]))
+            stage["false_alarm"] = float(np.mean(stage_sum[labels < 0] >= stage["threshold"]))
+            print(f"  Stumpf {len(stage['weak']):3d}: Trefferrate {stage['hit_rate']:.4f}  Fehlalarmrate {stage['false_alarm']:.4f}")
+            if stage["false_alarm"] <= max_false_alarm:
+                break
+        self.cache = None
+        return stage
+
+
+    # Beendet den Thread-Pool.
+    def shutdown(self):
+        """
+        Beendet den Thread-Pool.
+        """
+        self.executor.shutdown(wait=True)
+
+
+# Schreibt eine Cascade als OpenCV XML-Datei.
+def write_cascade_xml(path, stages, width, height, params=None):
+    """
+    Schreibt eine Cascade im neuen OpenCV-Format (wie opencv_traincascade), ladbar mit cv2.CascadeClassifier.
+    :param path: Pfad der XML-Datei.
+    :param stages: Liste der Stufen (siehe StageTrainer.train_stage).
+    :param params: Trainingsparameter für den Abschnitt stageParams (optional).
+    """
+    params = params or {}
+    features = [] # Jedes verwendete Merkmal nur einmal
+    feature_index = {}
+    lines = ['<?xml version="1.0"?>', "<opencv_storage>", "<cascade>",
+             "  <stageType>BOOST</stageType>", "  <featureType>HAAR</featureType>",
+             f"  <height>{height}</height>", f"  <width>{width}</width>",
+             "  <stageParams>", "    <boostType>GAB</boostType>",
+             f"    <minHitRate>{params.get('min_hit_rate', 0.995):.10e}</minHitRate>",
+             f"    <maxFalseAlarm>{params.get('max_false_alarm', 0.5):.10e}</maxFalseAlarm>",
+             "    <weightTrimRate>1.</weightTrimRate>", "    <maxDepth>1</maxDepth>",
+             f"    <maxWeakCount>{params.get('max_weak_count', 100)}</maxWeakCount></stageParams>",
+             "  <featureParams>", "    <maxCatCount>0</maxCatCount>", "    <featSize>1</featSize>",
+             "    <mode>BASIC</mode></featureParams>",
+             f"  <stageNum>{len(stages)}</stageNum>", "  <stages>"]
+    for number, stage in enumerate(stages):
+        lines += [f"    <!-- stage {number} -->", "    <_>",
+                  f"      <maxWeakCount>{len(stage['weak'])}</maxWeakCount>",
+                  f"      <stageThreshold>{stage['threshold']:.10e}</stageThreshold>", "      <weakClassifiers>"]
+        for weak in stage["weak"]:
+            key = tuple(tuple(rect) for rect in weak["rects"])
+            if key not in feature_index:
+                feature_index[key] = len(features)
+                features.append(weak["rects"])
+            lines += ["        <_>", "          <internalNodes>",
+                      f"            0 -1 {feature_index[key]} {weak['threshold']:.10e}</internalNodes>",
+                      "          <leafValues>",
+                      f"            {weak['left']:.10e} {weak['right']:.10e}</leafValues></_>"]
+        lines.append("      </weakClassifiers></_>")
+    lines += ["  </stages>", "  <features>"]
+    for rects in features:
+        lines += ["    <_>", "      <rects>"]
+        lines += [f"        <_>{x} {y} {w} {h} {weight}.</_>" for x, y, w, h, weight in rects]
+        lines.append("      </rects></_>")
+    lines += ["  </features>", "</cascade>", "</opencv_storage>", ""]
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines))
+
+
+# Liest den Checkpoint eines Trainings.
+def load_checkpoint(checkpoint_path, params):
+    """
+    Liest den Checkpoint eines Trainings, sofern er mit denselben Parametern erstellt wurde.
+    :param checkpoint_path: Pfad der Checkpoint-Datei (JSON).
+    :param params: Aktuelle Trainingsparameter.
+    :return: Liste der bereits trainierten Stufen (leer, falls kein passender Checkpoint vorliegt).
+    """
+    if not os.path.exists(checkpoint_path):
+        return []
+    try:
+        with open(checkpoint_path, encoding="utf-8") as file:
+            checkpoint = json.load(file)
+        if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("params") != params:
+            print("Checkpoint passt nicht zu den Parametern, Training beginnt neu")
+            return []
+        return checkpoint["stages"]
+    except (OSError, ValueError, KeyError) as e: # Fehlerbehandlung
+        print(f"Fehler beim Lesen des Checkpoints: {e}")
+        return []
+
+
+# Schreibt den Checkpoint eines Trainings.
+def save_checkpoint(checkpoint_path, params, stages):
+    """
+    Schreibt den Checkpoint eines Trainings (atomar über eine temporäre Datei).
+    """
+    temporary = checkpoint_path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump({"version": CHECKPOINT_VERSION, "params": params, "stages": stages}, file)
+    os.replace(temporary, checkpoint_path)
+
+
+# Trainiert eine Cascade.
+def train_cascade(positive_dir, negative_dir, output_path, width=24, height=24, num_stages=20, num_negatives=None,
+                  min_hit_rate=0.995, max_false_alarm=0.5, max_weak_count=100, feature_step=2, mirror=False,
+                  num_workers=None, cache_mb=1024, seed=0, resume=True, progress_callback=None):
+    """
+    Trainiert eine Cascade und schreibt sie nach jeder Stufe als XML-Datei. Ein Checkpoint (<output>.checkpoint.json)
+    erlaubt das Fortsetzen eines abgebrochenen Trainings mit denselben Parametern.
+    :param positive_dir: Verzeichnis mit zugeschnittenen Objektbildern.
+    :param negative_dir: Verzeichnis mit Hintergrundbildern ohne Objekte oder NumPy-Datei aus negativeminer.py.
+    :param output_path: Pfad der XML-Datei.
+    :param width: Fensterbreite der Cascade.
+    :param height: Fensterhöhe der Cascade.
+    :param num_stages: Maximale Anzahl der Stufen.
+    :param num_negatives: Anzahl negativer Beispiele je Stufe (Standard: doppelte Anzahl positiver Beispiele).
+    :param min_hit_rate: Mindest-Trefferrate je Stufe.
+    :param max_false_alarm: Maximale Fehlalarmrate je Stufe.
+    :param max_weak_count: Maximale Anzahl der Stümpfe je Stufe.
+    :param feature_step: Schrittweite der Merkmale (siehe generate_features).
+    :param mirror: Positive Beispiele zusätzlich gespiegelt verwenden.
+    :param num_workers: Anzahl der Threads (Standard: Anzahl der Kerne).
+    :param cache_mb: Maximaler Speicher für vorsortierte Merkmalswerte.
+    :param seed: Startwert des Zufallsgenerators.
+    :param resume: Wenn True, wird ein passender Checkpoint fortgesetzt.
+    :param progress_callback: Optionale Funktion progress_callback(stage, num_stages), wird nach jeder Stufe aufgerufen.
+    :return: Anzahl der Stufen der geschriebenen Cascade.
+    """
+    start = time.perf_counter()
+    positives = load_positives(positive_dir, width, height, mirror)
+    if len(positives) < 10:
+        raise ValueError(f"Zu wenige positive Beispiele in '{positive_dir}' ({len(positives)})")
+    num_negatives = num_negatives or 2 * len(positives)
+    sampler = NegativeSampler(negative_dir, width, height, seed=seed)
+    features = generate_features(width, height, feature_step)
+    print(f"{len(positives)} positive Beispiele, {len(sampler.images)} Hintergrundbilder, {len(features)} Merkmale")
+
+    params = {"positives": len(positives), "width": width, "height": height, "num_negatives": num_negatives,
+              "min_hit_rate": min_hit_rate, "max_false_alarm": max_false_alarm, "max_weak_count": max_weak_count,
+              "feature_step": feature_step, "mirror": mirror, "seed": seed}
+    checkpoint_path = output_path + ".checkpoint.json"
+    stages = load_checkpoint(checkpoint_path, params) if resume else []
+    if stages:
+        print(f"Checkpoint mit {len(stages)} Stufen geladen")
+        sampler.rng = np.random.default_rng(seed + len(stages)) # Andere Fenster als im abgebrochenen Lauf
+
+    trainer = StageTrainer(features, width, height, num_workers=num_workers, cache_mb=cache_mb)
+    try:
+        while len(stages) < num_stages:
+            stage_start = time.perf_counter()
+            # Positive Beispiele, die die bisherige Cascade verwirft, werden nicht mehr verwendet (wie opencv_traincascade)
+            stage_positives = positives[evaluate_windows(stages, positives)]
+            negatives, acceptance = sampler.collect(stages, num_negatives)
+            print(f"Stufe {len(stages)}: {len(stage_positives)} positive, {len(negatives)} negative Beispiele, "
+                  f"Akzeptanzrate der Cascade {acceptance:.2e}")
+            if len(negatives) < max(10, num_negatives // 10):
+                print("Zu wenige Fehlalarme auf den Hintergrundbildern, Training beendet")
+                break
+            if acceptance <= max_false_alarm ** num_stages:
+                print("Gewünschte Fehlalarmrate erreicht, Training beendet")
+                break
+
+            stages.append(trainer.train_stage(stage_positives, negatives, min_hit_rate, max_false_alarm, max_weak_count))
+            save_checkpoint(checkpoint_path, params, stages)
+            write_cascade_xml(output_path, stages, width, height, params)
+            print(f"Stufe {len(stages) - 1} fertig: {len(stages[-1]['weak'])} Stümpfe, {time.perf_counter() - stage_start:.1f} s")
+            if progress_callback is not None:
+                progress_callback(len(stages), num_stages)
+    finally:
+        trainer.shutdown()
+
+    if stages:
+        write_cascade_xml(output_path, stages, width, height, params)
+    print(f"Cascade mit {len(stages)} Stufen gespeichert: {output_path} ({time.perf_counter() - start:.1f} s)")
+    return len(stages)
+
+
+# Liest die Kommandozeilenparameter.
+def parse_args(argv=None):
+    """
+    Liest die Kommandozeilenparameter.
+    :param argv: Argumentliste (Standard: sys.argv).
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Training eines Haar-Cascade Klassifizierers (Gentle AdaBoost, OpenCV XML).")
+    parser.add_argument("positives", help="Verzeichnis mit zugeschnittenen Objektbildern")
+    parser.add_argument("negatives", help="Verzeichnis mit Hintergrundbildern ohne Objekte oder NumPy-Datei aus negativeminer.py")
+    parser.add_argument("--output", "-o", default="cascade.xml", help="Pfad der XML-Datei")
+    parser.add_argument("--width", type=int, default=24, help="Fensterbreite")
+    parser.add_argument("--height", type=int, default=24, help="Fensterhöhe")
+    parser.add_argument("--stages", type=int, default=20, help="Maximale Anzahl der Stufen")
+    parser.add_argument("--negatives-per-stage", type=int, default=None, help="Negative Beispiele je Stufe (Standard: 2 × positive)")
+    parser.add_argument("--min-hit-rate", type=float, default=0.995, help="Mindest-Trefferrate je Stufe")
+    parser.add_argument("--max-false-alarm", type=float, default=0.5, help="Maximale Fehlalarmrate je Stufe")
+    parser.add_argument("--max-weak-count", type=int, default=100, help="Maximale Anzahl der Stümpfe je Stufe")
+    parser.add_argument("--feature-step", type=int, default=2, help="Schrittweite der Merkmale (1 = alle, langsamer)")
+    parser.add_argument("--mirror", action="store_true", help="Positive Beispiele zusätzlich gespiegelt verwenden")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl der Threads (Standard: alle Kerne)")
+    parser.add_argument("--cache-mb", type=int, default=1024, help="Speicher für vorsortierte Merkmalswerte je Stufe")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert des Zufallsgenerators")
+    parser.add_argument("--no-resume", action="store_true", help="Vorhandenen Checkpoint ignorieren")
+    return parser.parse_args(argv)
+
+
+# Hauptprogramm
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        train_cascade(args.positives, args.negatives, args.output, args.width, args.height, args.stages,
+                      args.negatives_per_stage, args.min_hit_rate, args.max_false_alarm, args.max_weak_count,
+                      args.feature_step, args.mirror, args.workers, args.cache_mb, args.seed, not args.no_resume)
+    except ValueError as e: # Fehlerbehandlung
+        print(f"Fehler: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -1,10 +1,21 @@
+import time
+START_TIME = time.perf_counter() # Zeitpunkt des Programmstarts (vor den aufwendigen Importen, für den Startbericht)
+
+import argparse
 from PySide6.QtWidgets import QApplication 
+from startupreport import StartupReport
 from app import App
 
 # Hauptprogramm
 if __name__ == "__main__":
-        
+    parser = argparse.ArgumentParser(description="Objekterkennung mit Haarcascades")
+    parser.add_argument("--startup-report", default=None, metavar="DATEI", help="Startzeiten zusätzlich als JSON speichern (zum Vergleich zwischen Versionen)")
+    args = parser.parse_args()
+
+    startup_report = StartupReport(START_TIME, args.startup_report) # Startzeiten werden ausgegeben, sobald Klassifizierer und Kamerasuche fertig sind
+    startup_report.mark("Importe")
     app = QApplication([]) # PySide6-Anwendung erstellen
-    window = App() # App-Objekt erstellen
+    window = App(startup_report) # App-Objekt erstellen
     window.show() # Fenster (GUI) anzeigen 
-    app.exec()  # Hauptschleife starten
\ No newline at end of file
+    startup_report.mark("Fenster angezeigt")
+    app.exec()  # Hauptschleife starten
@@ -0,0 +1,205 @@
+import queue
+import threading
+import time
+import cv2
+
+# Klasse zum Speichern von Screenshots in einem eigenen Thread.
+class ScreenshotEncoder:
+    """
+    Klasse zum Speichern von Screenshots in einem eigenen Thread.
+    Das Kodieren (PNG/JPEG) großer Frames dauert lange und läuft daher nicht im GUI-Thread.
+    """
+
+    # Initialisiert den Encoder und startet den Thread.
+    def __init__(self, max_queue=16):
+        """
+        Initialisiert den Encoder und startet den Thread.
+        :param max_queue: Maximale Anzahl wartender Screenshots.
+        """
+        try:
+            self.queue = queue.Queue(maxsize=max_queue)
+            self.thread = threading.Thread(target=self._encode_loop, name="ScreenshotEncoder", daemon=True)
+            self.thread.start()
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Screenshot-Encoders")
+
+
+    # Übergibt einen Screenshot zum Speichern.
+    def save(self, image, file_path, callback=None):
+        """
+        Übergibt einen Screenshot zum Speichern (blockiert nicht).
+        :param image: NumPy-Array des Bildes (BGR), darf danach nicht mehr verändert werden.
+        :param file_path: Zielpfad, das Format ergibt sich aus der Dateiendung.
+        :param callback: Optionale Funktion callback(success, file_path), wird im Encoder-Thread aufgerufen.
+        :return: True, wenn der Screenshot angenommen wurde, sonst False (Warteschlange voll).
+        """
+        try:
+            self.queue.put_nowait((image, file_path, callback))
+            return True
+        except queue.Full:
+            print("Fehler: Zu viele Screenshots in der Warteschlange")
+            return False
+
+
+    # Schleife des Encoder-Threads.
+    def _encode_loop(self):
+        """
+        Speichert die Screenshots der Warteschlange nacheinander.
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            image, file_path, callback = item
+            try:
+                success = cv2.imwrite(file_path, image)
+            except Exception as e: # Fehlerbehandlung
+                success = False
+            if success:
+                print(f"Bild erfolgreich gespeichert: {file_path}")
+            else:
+                print(f"Fehler: Bild konnte nicht gespeichert werden: {file_path}")
+            if callback is not None:
+                callback(success, file_path)
+
+
+    # Beendet den Thread, nachdem alle wartenden Screenshots gespeichert wurden.
+    def shutdown(self, timeout=5.0):
+        """
+        Beendet den Thread, nachdem alle wartenden Screenshots gespeichert wurden.
+        :param timeout: Maximale Wartezeit in Sekunden.
+        """
+        self.queue.put(None)
+        self.thread.join(timeout=timeout)
+
+
+# Klasse zur Aufnahme des annotierten Videostroms in einem eigenen Thread.
+class VideoRecorder:
+    """
+    Klasse zur Aufnahme des annotierten Videostroms in eine Videodatei.
+    Frames werden über eine begrenzte Warteschlange an den Encoder-Thread übergeben, der die Rechtecke einzeichnet
+    und schreibt. Kommt der Encoder nicht hinterher, werden Frames verworfen (und protokolliert), statt den
+    Frame-Loop aufzuhalten.
+    """
+
+    # Initialisiert den Recorder.
+    def __init__(self, annotate_function=None, max_queue=32):
+        """
+        Initialisiert den Recorder.
+        :param annotate_function: Funktion annotate_function(frame, detections), die die Rechtecke in frame zeichnet (im Encoder-Thread).
+        :param max_queue: Maximale Anzahl wartender Frames.
+        """
+        try:
+            self.annotate_function = annotate_function
+            self.max_queue = max_queue
+            self.queue = None
+            self.thread = None
+            self.file_path = None
+            self.recording = False
+            self.written = 0 # Anzahl geschriebener Frames
+            self.dropped = 0 # Anzahl verworfener Frames
+            self.last_drop_report = 0.0 # Zeitpunkt der letzten Meldung verworfener Frames
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Video-Recorders")
+
+
+    # Startet die Aufnahme.
+    def start(self, file_path, fps=25.0, fourcc=None):
+        """
+        Startet die Aufnahme. Die Videodatei wird mit der Größe des ersten Frames geöffnet.
+        :param file_path: Pfad der Videodatei (.mp4 oder .avi).
+        :param fps: Bildrate der Videodatei.
+        :param fourcc: FourCC-Code des Codecs (Standard: "mp4v" für .mp4, sonst "MJPG").
+        :return: True, wenn die Aufnahme gestartet wurde.
+        """
+        try:
+            if self.recording:
+                self.stop()
+            if fourcc is None:
+                fourcc = "mp4v" if file_path.lower().endswith(".mp4") else "MJPG"
+            self.file_path = file_path
+            self.queue = queue.Queue(maxsize=max(1, self.max_queue))
+            self.written = 0
+            self.dropped = 0
+            self.recording = True
+            self.thread = threading.Thread(target=self._record_loop, args=(file_path, fps, fourcc), name="VideoRecorder", daemon=True)
+            self.thread.start()
+            print(f"Aufnahme gestartet: {file_path}")
+            return True
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Starten der Aufnahme")
+            self.recording = False
+            return False
+
+
+    # Übergibt einen Frame zur Aufnahme.
+    def write(self, frame, detections=None):
+        """
+        Übergibt einen Frame zur Aufnahme (blockiert nicht). Ist die Warteschlange voll, wird der Frame verworfen.
+        :param frame: Frame im BGR-Format (wird nicht verändert, die Rechtecke werden auf einer Kopie gezeichnet).
+        :param detections: Dictionary {classifier_id: Boxen} oder None.
+        :return: True, wenn der Frame angenommen wurde, sonst False.
+        """
+        if not self.recording:
+            return False
+        try:
+            self.queue.put_nowait((frame, detections))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            now = time.monotonic()
+            if now - self.last_drop_report >= 5.0: # Höchstens alle 5 Sekunden melden
+                self.last_drop_report = now
+                print(f"Aufnahme: Encoder kommt nicht hinterher, bisher {self.dropped} Frames verworfen")
+            return False
+
+
+    # Schleife des Encoder-Threads.
+    def _record_loop(self, file_path, fps, fourcc):
+        """
+        Zeichnet die Rechtecke ein und schreibt die Frames in die Videodatei.
+        """
+        writer = None
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                frame, detections = item
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(file_path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+                    if not writer.isOpened():
+                        print(f"Fehler: Videodatei konnte nicht geöffnet werden: {file_path}")
+                        self.recording = False
+                        return
+                if detections and self.annotate_function is not None:
+                    frame = frame.copy()
+                    self.annotate_function(frame, detections)
+                writer.write(frame)
+                self.written += 1
+        except Exception as e: # Fehlerbehandlung
+            print(f"Fehler bei der Aufnahme: {e}")
+            self.recording = False
+        finally:
+            if writer is not None:
+                writer.release()
+
+
+    # Beendet die Aufnahme.
+    def stop(self, timeout=5.0):
+        """
+        Beendet die Aufnahme, nachdem alle wartenden Frames geschrieben wurden.
+        :param timeout: Maximale Wartezeit in Sekunden.
+        """
+        try:
+            if self.thread is None:
+                return
+            self.recording = False
+            if self.thread.is_alive():
+                self.queue.put(None, timeout=timeout) # Endmarke (Warteschlange wird vom Thread geleert)
+                self.thread.join(timeout=timeout)
+            self.thread = None
+            print(f"Aufnahme beendet: {self.file_path} ({self.written} Frames, {self.dropped} verworfen)")
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Beenden der Aufnahme")
@@ -0,0 +1,265 @@
+import threading
+import cv2
+import numpy as np
+
+# Klasse zum Überspringen der Erkennung in unveränderten Bildbereichen.
+class MotionGate:
+    """
+    Klasse zum Überspringen der Erkennung in unveränderten Bildbereichen.
+    Jeder Frame wird stark verkleinert (z. B. 160 Pixel breit) und mit dem zuletzt zur Erkennung übergebenen Frame verglichen.
+    Ohne nennenswerte Änderung werden die bisherigen Boxen weiterverwendet, bei örtlich begrenzter Änderung läuft der
+    Klassifizierer nur in den geänderten Bereichen (vergrößert um die Objektgröße und die dort bekannten Boxen),
+    bei großflächiger Änderung (z. B. Licht, Kamerabewegung) und spätestens alle refresh_interval Frames im ganzen Bild.
+    Der Vergleich (update) läuft in Frame-Reihenfolge vor dem Detection-Pool, die Erkennung (detect) in dessen Worker-Threads.
+    """
+
+    # Initialisiert den Bewegungsfilter.
+    def __init__(self, classifier_manager, width=160, pixel_threshold=12, min_changed=0.002, max_changed=0.3, refresh_interval=150):
+        """
+        Initialisiert den Bewegungsfilter.
+        :param classifier_manager: Instanz des ClassifierManagers.
+        :param width: Breite des verkleinerten Vergleichsbildes in Pixeln.
+        :param pixel_threshold: Mindeständerung eines Pixels (Grauwert 0..255), damit er als geändert gilt.
+        :param min_changed: Anteil geänderter Pixel, unterhalb dessen die Erkennung übersprungen wird.
+        :param max_changed: Anteil geänderter Pixel bzw. Fläche der Bereiche, ab dem das ganze Bild durchsucht wird.
+        :param refresh_interval: Spätestens nach dieser Anzahl Frames wird das ganze Bild durchsucht (gegen schleichende Änderungen).
+        """
+        try:
+            self.classifier_manager = classifier_manager
+            self.width = width
+            self.pixel_threshold = pixel_threshold
+            self.min_changed = min_changed
+            self.max_changed = max_changed
+            self.refresh_interval = max(1, refresh_interval)
+            self.lock = threading.Lock() # Schützt den Zustand (nur kurz gehalten, die Erkennung läuft außerhalb)
+            self.reset()
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Bewegungsfilters")
+
+
+    # Setzt den Bewegungsfilter zurück.
+    def reset(self, sequence=0):
+        """
+        Setzt den Bewegungsfilter zurück, der nächste Frame wird vollständig durchsucht.
+        :param sequence: Nummer des letzten Auftrags vor dem Zurücksetzen; noch laufende Aufträge bis einschließlich
+                         dieser Nummer werden nicht mehr übernommen.
+        """
+        with self.lock:
+            self.reference = None # Verkleinertes Graustufenbild des zuletzt zur Erkennung übergebenen Frames
+            self.boxes = {} # Zuletzt übernommene Objekte {classifier_id: Liste der Boxen}
+            self.classifier_key = None # Klassifizierer und Parameter der letzten vollständigen Erkennung
+            self.frames_since_full = 0 # Frames seit der letzten vollständigen Erkennung
+            self.sequence = sequence # Nummer des zuletzt übernommenen Auftrags (ältere Ergebnisse werden verworfen)
+            self.floor = sequence # Aufträge bis einschließlich dieser Nummer stammen aus der Zeit vor reset()
+            self.full_sequence = sequence # Nummer der zuletzt übernommenen vollständigen Erkennung
+            self.full_issued = sequence # Nummer der zuletzt angeforderten vollständigen Erkennung
+            self.full_done = sequence # Höchste Nummer einer beendeten (übernommenen oder verworfenen) vollständigen Erkennung
+            self.dirty = [] # Bereiche verworfener Teilerkennungen, die erneut durchsucht werden müssen
+            self.stats = {"skipped": 0, "partial": 0, "full": 0, "pixels": 0, "total_pixels": 0} # Statistik
+
+
+    # Verkleinert einen Frame für den Vergleich.
+    def _small_gray(self, frame):
+        """
+        Verkleinert einen Frame für den Vergleich (Graustufen, leicht geglättet gegen Sensorrauschen).
+        :param frame: Frame im BGR-Format.
+        :return: Verkleinertes Graustufenbild.
+        """
+        height, width = frame.shape[:2]
+        factor = min(1.0, self.width / width)
+        small = cv2.resize(frame, (max(1, int(round(width * factor))), max(1, int(round(height * factor)))), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (3, 3), 0)
+
+
+    # Entscheidet, ob und wo ein Frame durchsucht werden muss.
+    def update(self, frame, classifier_id, sequence):
+        """
+        Vergleicht den Frame mit dem zuletzt zur Erkennung übergebenen Frame und entscheidet, ob und wo er durchsucht
+        werden muss. Muss in Frame-Reihenfolge aus einem einzigen Thread aufgerufen werden (z. B. im GUI-Thread vor dem
+        Detection-Pool); die Erkennung selbst übernimmt detect() in einem Worker-Thread.
+        Solange eine vollständige Erkennung läuft, werden keine Teilerkennungen angefordert, da sie auf deren Ergebnis
+        aufbauen. Bereiche verworfener Teilerkennungen werden beim nächsten Frame erneut durchsucht.
+        :param frame: Frame im BGR-Format.
+        :param classifier_id: ID des Klassifizierers oder "multi".
+        :param sequence: Fortlaufende Nummer des Auftrags, mit der anschließend detect() aufgerufen wird.
+        :return: Tupel (mode, regions): mode ist "skipped" (bisherige Boxen weiterverwenden, siehe get_boxes),
+                 "partial" (nur regions durchsuchen, Liste der Bereiche (x0, y0, x1, y1)) oder "full" (ganzes Bild, regions None).
+        """
+        height, width = frame.shape[:2]
+        small = self._small_gray(frame)
+        classifier_key = self.classifier_manager.get_classifier_key(classifier_id)
+        with self.lock: # Nur der Vergleich mit dem Referenzbild, keine Erkennung
+            self.stats["total_pixels"] += width * height
+            full = (self.reference is None or self.reference.shape != small.shape or classifier_key != self.classifier_key
+                    or self.frames_since_full >= self.refresh_interval - 1)
+
+            if not full:
+                changed = cv2.absdiff(small, self.reference) > self.pixel_threshold
+                changed_fraction = float(np.count_nonzero(changed)) / changed.size
+                # Keine nennenswerte Änderung: bisherige Boxen weiterverwenden. Läuft noch eine vollständige Erkennung,
+                # wird ebenfalls gewartet (Referenzbild bleibt, die Änderung wird danach als Teilerkennung nachgeholt).
+                if (changed_fraction < self.min_changed and not self.dirty) or self.full_issued > self.full_done:
+                    self.frames_since_full += 1
+                    self.stats["skipped"] += 1
+                    return "skipped", None
+                regions = None if changed_fraction > self.max_changed else self._changed_regions(changed, width, height, classifier_id, self.dirty)
+                if regions is not None:
+                    self.reference = small
+                    self.dirty = []
+                    self.frames_since_full += 1
+                    self.stats["partial"] += 1
+                    self.stats["pixels"] += sum((x1 - x0) * (y1 - y0) for (x0, y0, x1, y1) in regions)
+                    return "partial", regions
+
+            self.reference = small
+            self.dirty = []
+            self.classifier_key = classifier_key
+            self.frames_since_full = 0
+            self.full_issued = sequence
+            self.stats["full"] += 1
+            self.stats["pixels"] += width * height
+            return "full", None
+
+
+    # Bestimmt die zu durchsuchenden Bereiche aus der Änderungsmaske.
+    def _changed_regions(self, changed, width, height, classifier_id, extra=()):
+        """
+        Bestimmt die zu durchsuchenden Bereiche aus der Änderungsmaske: zusammenhängende geänderte Flächen,
+        vergrößert um die größte minSize (ein Objekt muss vollständig im Bereich liegen) und um alle dort bekannten Boxen;
+        überlappende Bereiche werden zusammengefasst.
+        :param changed: Änderungsmaske (verkleinert, bool).
+        :param width: Breite des Frames.
+        :param height: Höhe des Frames.
+        :param classifier_id: ID des Klassifizierers oder "multi".
+        :param extra: Weitere Bereiche (x0, y0, x1, y1) in Frame-Koordinaten, die durchsucht werden müssen.
+        :return: Liste der Bereiche (x0, y0, x1, y1) in Frame-Koordinaten oder None, wenn sie zusammen mehr als max_changed
+                 des Frames bedecken (dann ist eine vollständige Erkennung günstiger).
+        """
+        classifier_ids = self.classifier_manager.multi_classifiers if classifier_id == "multi" else [classifier_id]
+        pad = max(max(self.classifier_manager.classifiers[c]["minSize"]) for c in classifier_ids)
+        factor_x, factor_y = width / changed.shape[1], height / changed.shape[0]
+
+        mask = cv2.dilate(changed.astype(np.uint8), np.ones((3, 3), np.uint8)) # Benachbarte Änderungen verbinden
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        regions = list(extra)
+        for x, y, w, h, _ in stats[1:]: # Komponente 0 ist der Hintergrund
+            regions.append((max(0, int(x * factor_x) - pad), max(0, int(y * factor_y) - pad),
+                            min(width, int((x + w) * factor_x) + pad), min(height, int((y + h) * factor_y) + pad)))
+
+        boxes = [box for boxes in self.boxes.values() for box in boxes]
+        merged = True
+        while merged: # Bereiche um berührte Boxen erweitern und überlappende Bereiche zusammenfassen, bis nichts mehr wächst
+            merged = False
+            for (bx, by, bw, bh) in boxes:
+                for i, (x0, y0, x1, y1) in enumerate(regions):
+                    if bx < x1 and bx + bw > x0 and by < y1 and by + bh > y0 and \
+                       not (x0 <= bx and y0 <= by and bx + bw <= x1 and by + bh <= y1):
+                        regions[i] = (min(x0, bx), min(y0, by), max(x1, bx + bw), max(y1, by + bh))
+                        merged = True
+            i = 0
+            while i < len(regions):
+                x0, y0, x1, y1 = regions[i]
+                for j in range(len(regions) - 1, i, -1):
+                    a0, b0, a1, b1 = regions[j]
+                    if a0 < x1 and a1 > x0 and b0 < y1 and b1 > y0:
+                        x0, y0, x1, y1 = min(x0, a0), min(y0, b0), max(x1, a1), max(y1, b1)
+                        del regions[j]
+                        merged = True
+                regions[i] = (x0, y0, x1, y1)
+                i += 1
+
+        if sum((x1 - x0) * (y1 - y0) for (x0, y0, x1, y1) in regions) > self.max_changed * width * height:
+            return None
+        return regions
+
+
+    # Erkennt Objekte im ganzen Frame bzw. in den geänderten Bereichen und übernimmt das Ergebnis.
+    def detect(self, frame, classifier_id, sequence, mode, regions=None, scale=1.0, detect=None):
+        """
+        Erkennt Objekte im ganzen Frame bzw. in den geänderten Bereichen (ohne Lock, im Worker-Thread) und übernimmt
+        das Ergebnis, sofern kein neuerer Auftrag übernommen wurde. Bei "partial" werden nur die Boxen innerhalb der
+        Bereiche ersetzt, Boxen außerhalb bleiben erhalten.
+        :param frame: Frame im BGR-Format.
+        :param classifier_id: ID des Klassifizierers oder "multi".
+        :param sequence: Fortlaufende Nummer des Auftrags (in der Reihenfolge der Aufrufe von update()).
+        :param mode: "full" oder "partial" (Rückgabe von update()).
+        :param regions: Bereiche (x0, y0, x1, y1) bei "partial" (Rückgabe von update()).
+        :param scale: Skalierungsfaktor für die Erkennung (siehe ClassifierManager.detect_objects).
+        :param detect: Funktion (frame, classifier_id, scale) für die Erkennung im ganzen Bild
+                       (Standard: ClassifierManager.detect_objects, z. B. ObjectTracker.update im Tracking-Modus).
+        :return: Dictionary {classifier_id: Liste der Boxen (x, y, w, h)} oder None, falls das Ergebnis überholt ist.
+        """
+        applied = False
+        try:
+            found = {}
+            if mode == "full":
+                detections = (detect or self.classifier_manager.detect_objects)(frame, classifier_id, scale)
+                if detections is None: # Ergebnis überholt (z. B. ObjectTracker.update mit älterem Frame)
+                    return None
+                found = {c: [tuple(int(v) for v in box) for box in boxes] if boxes is not None else []
+                         for c, boxes in detections.items()}
+            else:
+                for (x0, y0, x1, y1) in regions:
+                    detections = self.classifier_manager.detect_objects(frame[y0:y1, x0:x1], classifier_id, scale)
+                    for c, objects in detections.items():
+                        boxes = found.setdefault(c, [])
+                        if objects is not None:
+                            boxes.extend((int(x) + x0, int(y) + y0, int(w), int(h)) for (x, y, w, h) in objects)
+
+            with self.lock:
+                if sequence <= self.sequence: # Ein neuerer Auftrag wurde bereits übernommen
+                    return None
+                self.sequence = sequence
+                if mode == "partial":
+                    boxes = {c: [box for box in boxes if not any(x0 <= box[0] and y0 <= box[1] and box[0] + box[2] <= x1 and box[1] + box[3] <= y1
+                                                                 for (x0, y0, x1, y1) in regions)]
+                             for c, boxes in self.boxes.items()}
+                    for c, objects in found.items():
+                        boxes.setdefault(c, []).extend(objects)
+                    found = boxes
+                else:
+                    self.full_sequence = sequence
+                self.boxes = found
+                applied = True
+                return {c: list(boxes) for c, boxes in found.items()}
+        finally:
+            with self.lock:
+                if sequence > self.floor: # Aufträge aus der Zeit vor reset() ändern den Zustand nicht
+                    if mode == "full":
+                        self.full_done = max(self.full_done, sequence)
+                    elif not applied and sequence > self.full_sequence: # Verworfene Teilerkennung, nicht durch eine neuere vollständige abgedeckt
+                        self.dirty.extend(regions)
+
+
+    # Gibt zurück, ob eine vollständige Erkennung läuft.
+    def is_full_pending(self):
+        """
+        Gibt zurück, ob eine vollständige Erkennung läuft (geänderte Frames werden bis zu deren Ende übersprungen).
+        :return: True, wenn eine angeforderte vollständige Erkennung noch nicht beendet ist.
+        """
+        with self.lock:
+            return self.full_issued > self.full_done
+
+
+    # Liefert die zuletzt übernommenen Objekte.
+    def get_boxes(self):
+        """
+        Liefert die zuletzt übernommenen Objekte.
+        :return: Dictionary {classifier_id: Liste der Boxen (x, y, w, h)}.
+        """
+        with self.lock:
+            return {c: list(boxes) for c, boxes in self.boxes.items()}
+
+
+    # Liefert die Statistik des Bewegungsfilters.
+    def get_stats(self):
+        """
+        Liefert die Statistik des Bewegungsfilters.
+        :return: Dictionary mit "skipped", "partial", "full" (Anzahl Frames) und "searched" (Anteil der durchsuchten Pixel, 0..1).
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        searched = stats.pop("pixels") / stats["total_pixels"] if stats["total_pixels"] else 1.0
+        stats.pop("total_pixels")
+        stats["searched"] = searched
+        return stats
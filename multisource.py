@@ -0,0 +1,160 @@
+import time
+from collections import deque
+from cameramanager import CameraManager
+from detectionpool import FairDetectionPool
+
+# Klasse zur gleichzeitigen Aufnahme und Objekterkennung mehrerer Quellen (Kameras und Videos).
+class MultiSourceManager:
+    """
+    Klasse zur gleichzeitigen Aufnahme und Objekterkennung mehrerer Quellen (Kameras und Videos).
+    Jede Quelle hat einen eigenen CameraManager mit Aufnahme- bzw. Dekodier-Thread. Die Frames aller Quellen
+    gehen an einen gemeinsamen FairDetectionPool, der die Worker-Threads reihum auf die Quellen verteilt.
+    """
+
+    # Initialisiert den Manager.
+    def __init__(self, detect_function, num_workers=None):
+        """
+        Initialisiert den Manager.
+        :param detect_function: Funktion detect_function(frame, *args), die im Worker-Thread ausgeführt wird.
+        :param num_workers: Anzahl der Worker-Threads (Standard: Anzahl der Kerne).
+        """
+        try:
+            self.detect_function = detect_function
+            self.num_workers = num_workers
+            self.detection_pool = None # Wird beim Start der ersten Quelle erstellt
+            self.sources = {} # source_id -> Zustand der Quelle (siehe _add_source)
+            self.next_id = 0
+            self.profiler = None # Optionaler FrameProfiler für die Lesedauer der Quellen
+            self.result_callback = None # Optionale Funktion result_callback(source_id, sequence, objects, detection_time, context) je Ergebnis
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Multi-Source-Managers")
+
+
+    # Meldet eine geöffnete Quelle an.
+    def _add_source(self, name, camera_manager):
+        """
+        Meldet eine geöffnete Quelle beim Detection-Pool an.
+        :return: ID der Quelle.
+        """
+        if self.detection_pool is None:
+            self.detection_pool = FairDetectionPool(self.detect_function, self.num_workers)
+            self.detection_pool.result_callback = self.result_callback
+        source_id = self.next_id
+        self.next_id += 1
+        self.sources[source_id] = {
+            "name": name,
+            "camera_manager": camera_manager,
+            "last_sequence": 0, # Nummer des zuletzt übergebenen Frames
+            "frame_times": deque(maxlen=30), # Zeitpunkte der letzten neuen Frames (für die Aufnahme-FPS)
+            "objects": {} # Zuletzt erkannte Objekte {classifier_id: Boxen}
+        }
+        self.detection_pool.add_source(source_id)
+        return source_id
+
+
+    # Öffnet eine Kamera als Quelle.
+    def add_camera(self, camera_id):
+        """
+        Öffnet eine Kamera als Quelle (Aufnahme im eigenen Thread).
+        :param camera_id: Index der Kamera.
+        :return: ID der Quelle oder None, falls die Kamera nicht geöffnet werden konnte.
+        """
+        camera_manager = CameraManager()
+        camera_manager.profiler = self.profiler
+        if camera_manager.start_camera(camera_id, threaded=True) is None:
+            return None
+        return self._add_source(f"Kamera {camera_id}", camera_manager)
+
+
+    # Öffnet eine Videodatei als Quelle.
+    def add_video(self, file_path, realtime=True):
+        """
+        Öffnet eine Videodatei als Quelle (Dekodierung im eigenen Thread).
+        :param file_path: Pfad zur Videodatei.
+        :param realtime: True: Wiedergabe in Echtzeit, False: so schnell wie möglich.
+        :return: ID der Quelle oder None, falls die Datei nicht geöffnet werden konnte.
+        """
+        camera_manager = CameraManager()
+        camera_manager.profiler = self.profiler
+        if camera_manager.start_video(file_path, realtime=realtime) is None:
+            return None
+        name = file_path.replace("\\", "/").split("/")[-1]
+        return self._add_source(name, camera_manager)
+
+
+    # Holt die neuesten Frames aller Quellen und übergibt sie der Objekterkennung.
+    def poll(self, *args, context=None):
+        """
+        Holt die neuesten Frames aller Quellen (ohne zu blockieren) und übergibt neue Frames der Objekterkennung.
+        Quellen, die keine Frames mehr liefern, werden entfernt.
+        :param args: Weitere Argumente für detect_function (z. B. classifier_id).
+        :param context: Optionales Dictionary, das je Frame um "timestamp" (Aufnahmezeitpunkt als Unix-Zeit) ergänzt
+                        und an result_callback übergeben wird (None = keine Daten).
+        :return: Liste von Tupeln (source_id, frame, sequence, objects) für Quellen mit neuem Frame.
+        """
+        updates = []
+        for source_id, source in list(self.sources.items()):
+            camera_manager = source["camera_manager"]
+            frame, timestamp, sequence = camera_manager.get_latest_frame()
+            if not camera_manager.is_capturing():
+                self.remove_source(source_id)
+                continue
+
+            result = self.detection_pool.get_latest_result(source_id)
+            if result is not None:
+                source["objects"] = result[1]
+            if frame is None or sequence == source["last_sequence"]:
+                continue
+            source["last_sequence"] = sequence
+            source["frame_times"].append(time.perf_counter())
+            frame_context = None if context is None else dict(context, timestamp=camera_manager.get_capture_time(timestamp))
+            self.detection_pool.submit(source_id, frame, sequence, *args, context=frame_context)
+            updates.append((source_id, frame, sequence, source["objects"]))
+        return updates
+
+
+    # Liefert Kennzahlen einer Quelle.
+    def get_source_stats(self, source_id):
+        """
+        Liefert Kennzahlen einer Quelle.
+        :param source_id: ID der Quelle.
+        :return: Dictionary mit "name", "capture_fps", "detection_fps" und "count" oder None, falls die Quelle unbekannt ist.
+        """
+        source = self.sources.get(source_id)
+        if source is None:
+            return None
+        frame_times = source["frame_times"]
+        elapsed = frame_times[-1] - frame_times[0] if len(frame_times) > 1 else 0.0
+        return {
+            "name": source["name"],
+            "capture_fps": (len(frame_times) - 1) / elapsed if elapsed > 0 else 0.0,
+            "detection_fps": self.detection_pool.get_fps(source_id),
+            "count": sum(len(objects) for objects in source["objects"].values() if objects is not None)
+        }
+
+
+    # Entfernt eine Quelle.
+    def remove_source(self, source_id):
+        """
+        Schließt eine Quelle und meldet sie beim Detection-Pool ab.
+        :param source_id: ID der Quelle.
+        """
+        source = self.sources.pop(source_id, None)
+        if source is not None:
+            source["camera_manager"].stop_camera()
+            self.detection_pool.remove_source(source_id)
+
+
+    # Schließt alle Quellen.
+    def stop_all(self):
+        """
+        Schließt alle Quellen und beendet den Detection-Pool.
+        """
+        try:
+            for source_id in list(self.sources):
+                self.remove_source(source_id)
+            if self.detection_pool is not None:
+                self.detection_pool.shutdown()
+                self.detection_pool = None
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Schließen der Quellen")
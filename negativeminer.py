@@ -0,0 +1,253 @@
+import argparse
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from batchdetect import collect_images, create_classifier_manager
+
+# Suche nach Fehlalarmen (Hard Negatives) für das nächste Training eines eigenen Klassifizierers.
+# Die aktuelle Cascade läuft parallel (ein Prozess je Kern) über Hintergrundbilder ohne Objekte; jede Erkennung ist
+# ein Fehlalarm. Die Ausschnitte werden auf die Fenstergröße der Cascade skaliert, über einen Average-Hash von
+# nahezu identischen Ausschnitten befreit und in eine NumPy-Datei (Memory-Map) geschrieben, die haartrainer.py
+# anstelle eines Verzeichnisses mit Hintergrundbildern verwenden kann.
+#
+# Beispiele:
+#   python negativeminer.py hintergrund/ --classifier meine_cascade.xml --target 5000 --output negative.npy
+#   python negativeminer.py hintergrund/ --classifier meine_cascade.xml --min-neighbors 0 --max-distance 6 --output negative.npy
+
+# Zustand je Worker-Prozess (wird im Initializer gesetzt)
+worker_classifier_manager = None
+worker_classifier_id = None
+worker_window = None # Fenstergröße (Breite, Höhe) der Cascade
+
+# Anzahl gesetzter Bits je Byte (np.bitwise_count erst ab NumPy 2.0)
+BIT_COUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+# Liefert die Fenstergröße einer Cascade.
+def get_window_size(classifier_manager, classifier_id):
+    """
+    Liefert die Fenstergröße (Trainingsgröße) einer Cascade.
+    :return: Tupel (Breite, Höhe).
+    """
+    key, cascade = classifier_manager.registry.acquire(classifier_manager.get_classifier_path(classifier_id))
+    try:
+        return tuple(int(v) for v in cascade.getOriginalWindowSize())
+    finally:
+        classifier_manager.registry.release(key, cascade)
+
+
+# Berechnet den Average-Hash eines Ausschnitts.
+def average_hash(window):
+    """
+    Berechnet den Average-Hash eines Ausschnitts (8 × 8 Pixel, Bit gesetzt, wenn heller als der Mittelwert).
+    Nahezu identische Ausschnitte unterscheiden sich nur in wenigen Bits.
+    :param window: Graustufenbild.
+    :return: Hash als uint64.
+    """
+    small = cv2.resize(window, (8, 8), interpolation=cv2.INTER_AREA)
+    bits = (small > small.mean()).ravel()
+    return np.packbits(bits).view(">u8")[0].astype(np.uint64)
+
+
+# Berechnet die Hamming-Abstände eines Hashes zu mehreren Hashes.
+def hamming_distances(hashes, hash_value):
+    """
+    Berechnet die Hamming-Abstände eines Hashes zu mehreren Hashes (Anzahl unterschiedlicher Bits).
+    :param hashes: uint64-Array der Hashes.
+    :param hash_value: Hash als uint64.
+    :return: Array der Abstände (0..64).
+    """
+    differences = np.ascontiguousarray(hashes ^ np.uint64(hash_value))
+    return BIT_COUNT[differences.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+# Initialisiert einen Worker-Prozess.
+def init_worker(classifier, scale_factor, min_neighbors, min_size):
+    """
+    Initialisiert einen Worker-Prozess: Klassifizierer einmal je Prozess laden.
+    """
+    global worker_classifier_manager, worker_classifier_id, worker_window
+    sys.stdout = open(os.devnull, "w") # Statusausgaben der Manager unterdrücken
+    cv2.setNumThreads(1) # Parallelität über die Prozesse
+    worker_classifier_manager, worker_classifier_id = create_classifier_manager(classifier, scale_factor, min_neighbors, min_size)
+    worker_window = get_window_size(worker_classifier_manager, worker_classifier_id)
+
+
+# Sucht Fehlalarme in einem Hintergrundbild.
+def mine_image(path):
+    """
+    Sucht Fehlalarme in einem Hintergrundbild (im Worker-Prozess).
+    :param path: Pfad des Bildes.
+    :return: Dictionary mit "path", "megapixels", "windows" (uint8-Array), "hashes" (uint64-Array) und "error".
+    """
+    width, height = worker_window
+    result = {"path": path, "megapixels": 0.0, "windows": np.empty((0, height, width), np.uint8),
+              "hashes": np.empty(0, np.uint64), "error": None}
+    try:
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            result["error"] = "Bild konnte nicht geladen werden"
+            return result
+        result["megapixels"] = gray.size / 1e6
+        objects = worker_classifier_manager.detect_gray(gray, worker_classifier_id,
+                                                        worker_classifier_manager.get_classifier_path(worker_classifier_id))
+        if objects is None:
+            result["error"] = "Fehler bei der Objekterkennung"
+            return result
+        windows = [cv2.resize(gray[y:y + h, x:x + w], (width, height), interpolation=cv2.INTER_AREA) for (x, y, w, h) in objects]
+        if windows:
+            result["windows"] = np.array(windows, dtype=np.uint8)
+            result["hashes"] = np.array([average_hash(window) for window in windows], dtype=np.uint64)
+    except Exception as e: # Fehlerbehandlung
+        result["error"] = str(e)
+    return result
+
+
+# Klasse zum Speichern der Ausschnitte in einer NumPy-Datei.
+class SampleStore:
+    """
+    Klasse zum Speichern der Ausschnitte in einer NumPy-Datei (Memory-Map, Speicher wird nicht im RAM gehalten).
+    Nahezu identische Ausschnitte (Hamming-Abstand der Average-Hashes <= max_distance) werden verworfen.
+    """
+
+    # Legt die Datei an.
+    def __init__(self, file_path, capacity, width, height, max_distance=4):
+        """
+        Legt die Datei an.
+        :param file_path: Pfad der NumPy-Datei.
+        :param capacity: Maximale Anzahl der Ausschnitte.
+        :param max_distance: Maximaler Hamming-Abstand für Duplikate (0 = nur identische Hashes).
+        """
+        self.file_path = file_path
+        self.samples = np.lib.format.open_memmap(file_path + ".tmp", mode="w+", dtype=np.uint8, shape=(capacity, height, width))
+        self.hashes = np.empty(capacity, dtype=np.uint64)
+        self.count = 0
+        self.duplicates = 0
+        self.max_distance = max_distance
+
+
+    # Übernimmt neue Ausschnitte.
+    def add(self, windows, hashes):
+        """
+        Übernimmt neue Ausschnitte, sofern sie keine Duplikate sind und noch Platz ist.
+        :return: Anzahl der übernommenen Ausschnitte.
+        """
+        added = 0
+        for window, hash_value in zip(windows, hashes):
+            if self.count >= len(self.samples):
+                break
+            distances = hamming_distances(self.hashes[:self.count], hash_value) # Abstand zu allen bisherigen Ausschnitten
+            if self.count and distances.min() <= self.max_distance:
+                self.duplicates += 1
+                continue
+            self.samples[self.count] = window
+            self.hashes[self.count] = hash_value
+            self.count += 1
+            added += 1
+        return added
+
+
+    # Schließt die Datei.
+    def close(self):
+        """
+        Schließt die Datei; ist sie nicht voll, wird sie auf die tatsächliche Anzahl gekürzt.
+        """
+        self.samples.flush()
+        if self.count < len(self.samples):
+            np.save(self.file_path, np.asarray(self.samples[:self.count]))
+            del self.samples
+            os.remove(self.file_path + ".tmp")
+        else:
+            del self.samples
+            os.replace(self.file_path + ".tmp", self.file_path)
+
+
+# Führt die Suche nach Fehlalarmen aus.
+def run_mining(args):
+    """
+    Führt die Suche nach Fehlalarmen aus und gibt Fortschritt und Bericht auf stderr aus.
+    :param args: Argumente aus parse_args().
+    :return: Dictionary mit Kennzahlen (Bilder, Megapixel, Fehlalarme, je Megapixel, gespeichert, Duplikate).
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        classifier_manager, classifier_id = create_classifier_manager(args.classifier) # Klassifizierer vorab prüfen
+        width, height = get_window_size(classifier_manager, classifier_id)
+    if args.output.lower().endswith(".npy"):
+        args.output = args.output[:-4]
+    output_path = args.output + ".npy"
+    store = SampleStore(output_path, args.target, width, height, args.max_distance)
+
+    images = 0
+    megapixels = 0.0
+    false_positives = 0
+    errors = 0
+    start = time.perf_counter()
+    last_report = start
+    # Beim Verlassen des with-Blocks werden noch laufende Worker beendet (Ziel erreicht)
+    with multiprocessing.Pool(processes=args.workers, initializer=init_worker,
+                              initargs=(args.classifier, args.scale_factor, args.min_neighbors, args.min_size)) as pool:
+        try:
+            for result in pool.imap_unordered(mine_image, collect_images(args.inputs), chunksize=args.chunksize):
+                images += 1
+                if result["error"] is not None:
+                    errors += 1
+                    continue
+                megapixels += result["megapixels"]
+                false_positives += len(result["windows"])
+                store.add(result["windows"], result["hashes"])
+                now = time.perf_counter()
+                if now - last_report >= args.report_interval:
+                    print(f"{images} Bilder, {false_positives} Fehlalarme, {store.count} gespeichert", file=sys.stderr)
+                    last_report = now
+                if store.count >= args.target:
+                    print("Zielanzahl erreicht", file=sys.stderr)
+                    break
+        finally:
+            store.close()
+
+    report = {
+        "images": images,
+        "errors": errors,
+        "megapixels": round(megapixels, 2),
+        "false_positives": false_positives,
+        "false_positives_per_megapixel": round(false_positives / megapixels, 4) if megapixels else None,
+        "stored": store.count,
+        "duplicates": store.duplicates,
+        "output": output_path,
+        "duration_s": round(time.perf_counter() - start, 1)
+    }
+    print(f"Fertig: {images} Bilder ({report['megapixels']} MP) in {report['duration_s']} s, {errors} Fehler", file=sys.stderr)
+    print(f"Fehlalarme: {false_positives} ({report['false_positives_per_megapixel']} je Megapixel), "
+          f"{store.count} gespeichert, {store.duplicates} Duplikate verworfen: {output_path}", file=sys.stderr)
+    return report
+
+
+# Liest die Kommandozeilenparameter.
+def parse_args(argv=None):
+    """
+    Liest die Kommandozeilenparameter.
+    :param argv: Argumentliste (Standard: sys.argv).
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Sammelt Fehlalarme einer Haar-Cascade auf Hintergrundbildern ohne Objekte.")
+    parser.add_argument("inputs", nargs="+", help="Verzeichnisse, Bilddateien oder Glob-Muster mit Hintergrundbildern")
+    parser.add_argument("--classifier", required=True, help="Pfad zur XML-Datei oder ID eines vordefinierten Klassifizierers")
+    parser.add_argument("--scale-factor", type=float, default=None, help="Überschreibt scaleFactor")
+    parser.add_argument("--min-neighbors", type=int, default=None, help="Überschreibt minNeighbors (0 = alle einzelnen Fenster)")
+    parser.add_argument("--min-size", type=int, default=None, help="Überschreibt minSize (quadratisch, in Pixeln)")
+    parser.add_argument("--target", type=int, default=5000, help="Zielanzahl gespeicherter Ausschnitte")
+    parser.add_argument("--max-distance", type=int, default=4, help="Maximaler Hamming-Abstand (von 64 Bit) für Duplikate")
+    parser.add_argument("--output", "-o", default="negative.npy", help="NumPy-Datei der Ausschnitte")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Anzahl der Worker-Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--chunksize", type=int, default=4, help="Anzahl Bilder je Auftrag an einen Worker")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Sekunden zwischen Fortschrittsmeldungen")
+    return parser.parse_args(argv)
+
+
+# Hauptprogramm
+if __name__ == "__main__":
+    run_mining(parse_args())
@@ -0,0 +1,130 @@
+import threading
+import cv2
+
+# Klasse für die Verfolgung erkannter Objekte zwischen vollständigen Erkennungen (Keyframes).
+class ObjectTracker:
+    """
+    Klasse für die Verfolgung erkannter Objekte zwischen vollständigen Erkennungen (Keyframes).
+    Nur alle keyframe_interval Frames (oder wenn zu viele Objekte verloren gehen) wird das ganze Bild durchsucht.
+    Dazwischen wird der Klassifizierer nur in einem vergrößerten Fenster um jedes bekannte Objekt ausgeführt.
+    """
+
+    # Initialisiert den Tracker.
+    def __init__(self, classifier_manager, keyframe_interval=10, padding=0.5, min_confidence=0.5):
+        """
+        Initialisiert den Tracker.
+        :param classifier_manager: Instanz des ClassifierManagers.
+        :param keyframe_interval: Anzahl der Frames zwischen zwei vollständigen Erkennungen.
+        :param padding: Vergrößerung des Suchfensters um jedes Objekt, relativ zur Objektgröße (0.5 = 50 % je Seite).
+        :param min_confidence: Anteil wiedergefundener Objekte, unterhalb dessen sofort eine vollständige Erkennung erfolgt.
+        """
+        try:
+            self.classifier_manager = classifier_manager
+            self.keyframe_interval = max(1, keyframe_interval)
+            self.padding = max(0.0, padding)
+            self.min_confidence = min_confidence
+            self.lock = threading.Lock() # Schützt den Zustand (nur kurz gehalten, die Erkennung läuft außerhalb)
+            self.reset()
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Trackers")
+
+
+    # Setzt den Tracker zurück.
+    def reset(self, sequence=0):
+        """
+        Setzt den Tracker zurück, der nächste Frame wird vollständig durchsucht.
+        :param sequence: Nummer des letzten Auftrags vor dem Zurücksetzen; noch laufende Aufträge bis einschließlich
+                         dieser Nummer werden nicht mehr übernommen.
+        """
+        with self.lock:
+            self.tracks = {} # Verfolgte Objekte {classifier_id: Liste der Boxen}
+            self.frames_since_keyframe = 0 # Frames seit der letzten vollständigen Erkennung
+            self.classifier_key = None # Klassifizierer und Parameter der aktuellen Verfolgung
+            self.confidence = 1.0 # Anteil der im letzten Frame wiedergefundenen Objekte
+            self.keyframes = 0 # Anzahl vollständiger Erkennungen (Statistik)
+            self.sequence = sequence # Nummer des zuletzt übernommenen Auftrags (ältere Ergebnisse werden verworfen)
+
+
+    # Erkennt bzw. verfolgt Objekte im aktuellen Frame.
+    def update(self, frame, classifier_id, scale=1.0, sequence=None):
+        """
+        Erkennt bzw. verfolgt Objekte im aktuellen Frame. Die Erkennung läuft ohne Lock (mehrere Worker-Threads parallel),
+        nur das Übernehmen des Ergebnisses in den Zustand ist geschützt.
+        :param frame: Frame im BGR-Format.
+        :param classifier_id: ID des Klassifizierers oder "multi".
+        :param scale: Skalierungsfaktor für die vollständige Erkennung in Keyframes (siehe ClassifierManager.detect_objects).
+        :param sequence: Fortlaufende Nummer des Auftrags (None = Ergebnis immer übernehmen).
+        :return: Dictionary {classifier_id: Liste der Boxen (x, y, w, h)} oder None, falls inzwischen ein neuerer Frame übernommen wurde.
+        """
+        with self.lock:
+            classifier_key = self.classifier_manager.get_classifier_key(classifier_id)
+            keyframe = (classifier_key != self.classifier_key
+                        or self.frames_since_keyframe >= self.keyframe_interval - 1
+                        or self.confidence < self.min_confidence)
+            tracks = self.tracks
+
+        confidence = 1.0
+        if not keyframe:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            tracks, found, total = self._track(gray, tracks)
+            confidence = found / total if total else 1.0
+            keyframe = confidence < self.min_confidence
+        if keyframe: # Vollständige Erkennung
+            detections = self.classifier_manager.detect_objects(frame, classifier_id, scale)
+            tracks = {c: [tuple(int(v) for v in box) for box in boxes] if boxes is not None else []
+                      for c, boxes in detections.items()}
+
+        with self.lock:
+            if sequence is not None:
+                if sequence <= self.sequence: # Älterer Auftrag, ein neueres Ergebnis liegt bereits vor
+                    return None
+                self.sequence = sequence
+            self.tracks = tracks
+            if keyframe:
+                self.classifier_key = classifier_key
+                self.frames_since_keyframe = 0
+                self.keyframes += 1
+            else:
+                self.frames_since_keyframe += 1
+            self.confidence = 1.0 if keyframe else confidence
+            return {c: list(boxes) for c, boxes in tracks.items()}
+
+
+    # Sucht jedes bekannte Objekt in einem Fenster um seine letzte Position.
+    def _track(self, gray, tracks):
+        """
+        Sucht jedes bekannte Objekt in einem vergrößerten Fenster um seine letzte Position.
+        :param gray: Graustufenbild des aktuellen Frames.
+        :param tracks: Bisher verfolgte Objekte {classifier_id: Liste der Boxen}.
+        :return: Tupel (neue Boxen {classifier_id: Liste}, Anzahl wiedergefundener Objekte, Anzahl verfolgter Objekte).
+        """
+        height, width = gray.shape[:2]
+        previous, tracks = tracks, {}
+        found = 0
+        total = 0
+        for classifier_id, boxes in previous.items():
+            cascade_path = self.classifier_manager.get_classifier_path(classifier_id)
+            min_w, min_h = self.classifier_manager.classifiers[classifier_id]["minSize"]
+            tracks[classifier_id] = []
+            for (x, y, w, h) in boxes:
+                total += 1
+                pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+                x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+                x1, y1 = min(width, x + w + pad_x), min(height, y + h + pad_y)
+                if x1 - x0 < min_w or y1 - y0 < min_h:
+                    continue
+
+                # Nur Skalen nahe der bisherigen Objektgröße durchsuchen
+                min_size = (max(min_w, int(w * 0.7)), max(min_h, int(h * 0.7)))
+                max_size = (max(min_size[0], min(x1 - x0, int(w * 1.4) + 1)), max(min_size[1], min(y1 - y0, int(h * 1.4) + 1)))
+                objects = self.classifier_manager.detect_gray(gray[y0:y1, x0:x1], classifier_id, cascade_path,
+                                                              min_size=min_size, max_size=max_size)
+                if objects is None or len(objects) == 0:
+                    continue # Objekt verloren
+
+                # Kandidat, dessen Mittelpunkt am nächsten an der bisherigen Position liegt
+                cx, cy = x + w / 2 - x0, y + h / 2 - y0
+                bx, by, bw, bh = min(objects, key=lambda b: (b[0] + b[2] / 2 - cx) ** 2 + (b[1] + b[3] / 2 - cy) ** 2)
+                tracks[classifier_id].append((int(bx) + x0, int(by) + y0, int(bw), int(bh)))
+                found += 1
+        return tracks, found, total
@@ -0,0 +1,81 @@
+import math
+import threading
+
+# Klasse zur automatischen Wahl der Erkennungsauflösung anhand der gemessenen Erkennungszeit.
+class ResolutionController:
+    """
+    Klasse zur automatischen Wahl der Erkennungsauflösung anhand der gemessenen Erkennungszeit.
+    Die Erkennungszeit wächst etwa mit der Pixelanzahl, also quadratisch mit dem Skalierungsfaktor.
+    Der Regler verkleinert das Bild daher um sqrt(Budget / Zeit), sobald das Zeitbudget der Ziel-FPS
+    überschritten wird, und vergrößert es schrittweise wieder, wenn deutlich Reserve vorhanden ist.
+    """
+
+    # Initialisiert den Regler.
+    def __init__(self, target_fps=25, min_scale=0.25, max_scale=1.0, smoothing=0.3):
+        """
+        Initialisiert den Regler.
+        :param target_fps: Ziel-Bildrate der Erkennung.
+        :param min_scale: Kleinster erlaubter Skalierungsfaktor.
+        :param max_scale: Größter erlaubter Skalierungsfaktor (1.0 = volle Auflösung).
+        :param smoothing: Gewicht neuer Messwerte im gleitenden Mittelwert (0..1).
+        """
+        try:
+            self.target_fps = target_fps
+            self.min_scale = min_scale
+            self.max_scale = max_scale
+            self.smoothing = smoothing
+            self.lock = threading.Lock() # Messwerte kommen aus mehreren Worker-Threads
+            self.scale = max_scale # Aktueller Skalierungsfaktor
+            self.average_time = None # Gleitender Mittelwert der Erkennungszeit (bezogen auf den aktuellen Faktor)
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Auflösungsreglers")
+
+
+    # Liefert den aktuellen Skalierungsfaktor.
+    def get_scale(self):
+        """
+        Liefert den aktuellen Skalierungsfaktor.
+        :return: Skalierungsfaktor zwischen min_scale und max_scale.
+        """
+        return self.scale
+
+
+    # Übernimmt eine gemessene Erkennungszeit und passt den Skalierungsfaktor an.
+    def update(self, detection_time, scale):
+        """
+        Übernimmt eine gemessene Erkennungszeit und passt den Skalierungsfaktor an.
+        :param detection_time: Dauer der Erkennung in Sekunden.
+        :param scale: Skalierungsfaktor, mit dem gemessen wurde.
+        :return: Neuer Skalierungsfaktor.
+        """
+        with self.lock:
+            if scale != self.scale: # Messung mit veraltetem Faktor, auf aktuellen Faktor umrechnen
+                detection_time *= (self.scale / scale) ** 2
+            if self.average_time is None:
+                self.average_time = detection_time
+            else:
+                self.average_time += self.smoothing * (detection_time - self.average_time)
+
+            budget = 1.0 / self.target_fps
+            if self.average_time > budget * 1.1: # Budget überschritten: verkleinern
+                new_scale = self.scale * math.sqrt(budget / self.average_time)
+            elif self.average_time < budget * 0.6: # Deutliche Reserve: vorsichtig vergrößern
+                new_scale = self.scale * 1.1
+            else:
+                return self.scale
+
+            new_scale = min(self.max_scale, max(self.min_scale, round(new_scale * 20) / 20)) # Auf 0.05 runden gegen Flattern
+            if new_scale != self.scale:
+                self.average_time *= (new_scale / self.scale) ** 2 # Erwartete Zeit beim neuen Faktor
+                self.scale = new_scale
+            return self.scale
+
+
+    # Setzt den Regler zurück.
+    def reset(self):
+        """
+        Setzt den Regler auf volle Auflösung zurück.
+        """
+        with self.lock:
+            self.scale = self.max_scale
+            self.average_time = None
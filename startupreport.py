@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+
+# Klasse zur Zeitmessung des Programmstarts.
+class StartupReport:
+    """
+    Klasse zur Zeitmessung des Programmstarts (Importe, Aufbau des Fensters, erstes Zeichnen, Hintergrundaufgaben).
+    Zeitpunkte werden relativ zum Programmstart gespeichert. Sobald alle angemeldeten Hintergrundaufgaben
+    (z. B. Vorladen der Klassifizierer, Kamerasuche) fertig sind, wird der Bericht ausgegeben.
+    """
+
+    # Initialisiert den Bericht.
+    def __init__(self, start_time=None, output_path=None):
+        """
+        Initialisiert den Bericht.
+        :param start_time: Zeitpunkt des Programmstarts (time.perf_counter(), Standard: jetzt).
+        :param output_path: Optionale JSON-Datei, in die der Bericht zusätzlich geschrieben wird (für Vergleiche zwischen Versionen).
+        """
+        try:
+            self.start_time = time.perf_counter() if start_time is None else start_time
+            self.output_path = output_path
+            self.marks = [] # Liste von Tupeln (Name, ms seit Programmstart)
+            self.pending = set() # Noch laufende Hintergrundaufgaben
+            self.reported = False
+            self.lock = threading.Lock() # Marken kommen aus GUI- und Hintergrund-Threads
+        except Exception as e: # Fehlerbehandlung
+            print("Fehler beim Initialisieren des Startberichts")
+
+
+    # Speichert einen Zeitpunkt.
+    def mark(self, name):
+        """
+        Speichert einen Zeitpunkt.
+        :param name: Name des Zeitpunkts (z. B. "Fenster angezeigt").
+        """
+        with self.lock:
+            self.marks.append((name, (time.perf_counter() - self.start_time) * 1000))
+
+
+    # Meldet eine Hintergrundaufgabe an.
+    def begin_task(self, name):
+        """
+        Meldet eine Hintergrundaufgabe an; der Bericht wartet auf ihr Ende.
+        :param name: Name der Aufgabe.
+        """
+        with self.lock:
+            self.pending.add(name)
+
+
+    # Meldet das Ende einer Hintergrundaufgabe.
+    def end_task(self, name):
+        """
+        Meldet das Ende einer Hintergrundaufgabe und gibt den Bericht aus, wenn keine Aufgabe mehr läuft.
+        :param name: Name der Aufgabe (wird auch als Zeitpunkt gespeichert).
+        """
+        with self.lock:
+            if name not in self.pending:
+                return
+            self.pending.discard(name)
+        self.mark(name)
+        self.report_if_done()
+
+
+    # Gibt den Bericht aus, wenn alle Hintergrundaufgaben fertig sind.
+    def report_if_done(self):
+        """
+        Gibt den Bericht einmalig aus, wenn alle Hintergrundaufgaben fertig sind.
+        """
+        with self.lock:
+            if self.pending or self.reported:
+                return
+            self.reported = True
+            marks = list(self.marks)
+        print(self.summary_text(marks))
+        if self.output_path:
+            try:
+                with open(self.output_path, "w", encoding="utf-8") as file:
+                    json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                               "marks": [{"name": name, "ms": round(ms, 1)} for name, ms in marks]}, file, indent=2)
+            except OSError as e: # Fehlerbehandlung
+                print(f"Fehler beim Speichern des Startberichts: {e}")
+
+
+    # Liefert den Bericht als Text.
+    def summary_text(self, marks=None):
+        """
+        Liefert den Bericht als Text (je Zeitpunkt die Zeit seit Programmstart und seit dem vorherigen Zeitpunkt).
+        :param marks: Zeitpunkte (Standard: alle bisherigen).
+        :return: Mehrzeiliger Text.
+        """
+        if marks is None:
+            with self.lock:
+                marks = list(self.marks)
+        lines = ["Startzeiten (ms seit Programmstart / seit vorherigem Schritt):"]
+        previous = 0.0
+        for name, ms in sorted(marks, key=lambda mark: mark[1]):
+            lines.append(f"  {ms:8.1f}  +{ms - previous:7.1f}  {name}")
+            previous = ms
+        return "\n".join(lines)